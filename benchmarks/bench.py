@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+'''Time every pysos plugin and test against synthetic reports.
+
+Reports are written by synthetic.py, once per scale, and kept in --dir
+so later runs reuse them. Each plugin is run against a cold cache
+--repeat times with the profiler from pysos --profile, and the fastest
+run is kept. Results are written as JSON, and if a baseline from an
+earlier run is given, anything that got slower by more than --threshold
+is reported and the exit status is 1.
+'''
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..'))
+
+from pysosutils.plugins import PLUGINS
+from pysosutils.utilities.cache import drop_cache
+from pysosutils.utilities.output import OutputWriter
+from pysosutils.utilities.profile import enable_profiler
+from pysosutils.utilities.runner import load_plugins, run_plugin
+from pysosutils.utilities.sostests import SosChecker
+
+from synthetic import SCALES, generate
+
+# what pysos -a turns on, without the tests and the RHV database
+OPTIONS = ['netdev', 'ethtool', 'bonding', 'ip', 'ethstats', 'netns',
+           'network', 'vnet', 'fso', 'docker', 'sysctl', 'net']
+
+
+def plugin_args(tests=True, db=False):
+    '''The options pysos -a would pass to every plugin'''
+    args = dict((name, True) for name in PLUGINS)
+    args.update((name, True) for name in OPTIONS)
+    args.update({'tests': tests, 'db': db, 'verbose': False, 'jobs': 1,
+                 'format': 'text', 'cache': False, 'cache_dir': None,
+                 'workers': None, 'color': 'never', 'profile': True,
+                 'getall': True, 'route': ['8.8.8.8', '10.0.9.7',
+                                           '2001:db8::1'],
+                 'route_src': None})
+    return args
+
+
+def report_path(directory, scale, seed):
+    '''Generate the report for scale in directory, unless it is there'''
+    root = os.path.join(directory, '%s-%d' % (scale, seed))
+    marker = os.path.join(root, '.complete')
+    if not os.path.exists(marker):
+        sys.stderr.write('Writing %s report to %s\n' % (scale, root))
+        generate(root, scale, seed)
+        open(marker, 'w').close()
+    return root + '/'
+
+
+def run_once(target, args):
+    '''Run every plugin, then the tests, against a cold cache and return
+    the profile records'''
+    drop_cache(target)
+    profiler = enable_profiler()
+    stdout = sys.stdout
+    devnull = open(os.devnull, 'w')
+    # rendering is part of what is timed, the output itself isn't wanted
+    sys.stdout = OutputWriter(devnull)
+    try:
+        for plugin in load_plugins(target, args):
+            run_plugin(plugin)
+        if args['tests']:
+            SosChecker(target, args).run_all_tests()
+    finally:
+        sys.stdout.flush()
+        sys.stdout = stdout
+        devnull.close()
+    drop_cache(target)
+    return profiler.records
+
+
+def best_of(runs):
+    '''Keep the fastest run of each plugin and test, by wall time'''
+    best = OrderedDict()
+    for records in runs:
+        for record in records:
+            name = '%s %s' % (record['kind'], record['name'])
+            if name not in best or record['wall'] < best[name]['wall']:
+                best[name] = record
+    return best
+
+
+def compare(results, baseline, threshold):
+    '''Return a line for everything in results slower than in baseline
+    by more than threshold, as a fraction'''
+    slower = []
+    for scale, records in results.items():
+        old = baseline.get('results', {}).get(scale, {})
+        for name, record in records.items():
+            if name not in old or not old[name]['wall']:
+                continue
+            ratio = record['wall'] / old[name]['wall']
+            if ratio > 1 + threshold:
+                slower.append('%-8s %-32s %8.4fs -> %8.4fs (%+.0f%%)' % (
+                    scale, name, old[name]['wall'], record['wall'],
+                    (ratio - 1) * 100))
+    return slower
+
+
+parser = argparse.ArgumentParser(description="Benchmark pysos plugins "
+                                 "against synthetic sosreports")
+parser.add_argument('--scale', choices=list(SCALES), action='append',
+                    help="Report sizes to run against, may be given more "
+                         "than once. Defaults to small")
+parser.add_argument('--dir', default=None,
+                    help="Where reports are written and reused from, "
+                         "defaults to a directory under %s" %
+                         tempfile.gettempdir())
+parser.add_argument('--seed', type=int, default=0,
+                    help="Random seed the reports are written with")
+parser.add_argument('-r', '--repeat', type=int, default=3,
+                    help="Runs per scale, the fastest is kept")
+parser.add_argument('--no-tests', action='store_true',
+                    help="Don't time the SosChecker tests")
+parser.add_argument('--db', action='store_true',
+                    help="Also parse the RHV database dump in the reports")
+parser.add_argument('-o', '--output', default='bench_output.json',
+                    help="File to write the results to")
+parser.add_argument('--baseline', default=None,
+                    help="Results from an earlier run to compare against")
+parser.add_argument('--threshold', type=float, default=0.25,
+                    help="Slowdown over the baseline, as a fraction, "
+                         "reported as a regression")
+
+
+if __name__ == '__main__':
+    opts = parser.parse_args()
+    directory = opts.dir or os.path.join(tempfile.gettempdir(),
+                                         'pysos-bench')
+    args = plugin_args(not opts.no_tests, opts.db)
+    results = OrderedDict()
+    for scale in opts.scale or ['small']:
+        target = report_path(directory, scale, opts.seed)
+        start = time.time()
+        runs = [run_once(target, args) for i in range(opts.repeat)]
+        results[scale] = best_of(runs)
+        sys.stderr.write('%s: %d runs in %.2fs\n' % (scale, opts.repeat,
+                                                    time.time() - start))
+        for name, record in sorted(results[scale].items(),
+                                   key=lambda r: -r[1]['wall']):
+            sys.stdout.write('%-8s %-32s %8.4fs %8.4fs cpu %10d bytes%s\n' % (
+                scale, name, record['wall'], record['cpu'],
+                record['bytes_read'],
+                ' FAILED' if record.get('failed') else ''))
+
+    doc = OrderedDict()
+    doc['python'] = platform.python_version()
+    doc['platform'] = platform.platform()
+    doc['time'] = int(time.time())
+    doc['repeat'] = opts.repeat
+    doc['results'] = results
+    with open(opts.output, 'w') as f:
+        json.dump(doc, f, indent=2)
+
+    if opts.baseline:
+        with open(opts.baseline) as f:
+            slower = compare(results, json.load(f), opts.threshold)
+        for line in slower:
+            sys.stdout.write('SLOWER %s\n' % line)
+        if slower:
+            sys.exit(1)
@@ -0,0 +1,658 @@
+#!/usr/bin/env python
+'''Write synthetic sosreport trees for benchmarking pysos.
+
+The files written are the ones pysos reads, in the format sosreport
+collects them in, with their sizes set by a scale. Output is the same
+for a given scale and seed, so timings from different runs are taken
+against identical reports.
+'''
+
+import argparse
+import os
+import random
+import sys
+import tarfile
+from collections import OrderedDict
+
+# Preset sizes of every part of a report. 'large' is what the biggest
+# reports we get look like.
+SCALES = OrderedDict()
+SCALES['small'] = {
+    'procs': 500,
+    'threads': 4,
+    'interfaces': 16,
+    'lvs': 20,
+    'packages': 800,
+    'cpus': 8,
+    'mounts': 20,
+    'dimms': 8,
+    'hypervisors': 0,
+    'namespaces': 4,
+    'routes': 100,
+    }
+SCALES['medium'] = {
+    'procs': 10000,
+    'threads': 8,
+    'interfaces': 400,
+    'lvs': 1000,
+    'packages': 2000,
+    'cpus': 64,
+    'mounts': 200,
+    'dimms': 24,
+    'hypervisors': 100,
+    'namespaces': 100,
+    'routes': 10000,
+    }
+SCALES['large'] = {
+    'procs': 100000,
+    'threads': 8,
+    'interfaces': 4000,
+    'lvs': 10000,
+    'packages': 5000,
+    'cpus': 512,
+    'mounts': 2000,
+    'dimms': 96,
+    'hypervisors': 2000,
+    'namespaces': 500,
+    'routes': 150000,
+    }
+
+USERS = ['root', 'qemu', 'postgres', 'apache', 'nobody', 'vdsm', 'mysql',
+         'oracle', 'java', 'nginx', 'polkitd', 'dbus', 'chrony']
+COMMANDS = ['/usr/sbin/httpd -DFOREGROUND', '/usr/bin/java -Xmx4g -jar app.jar',
+            'postgres: writer process', '[kworker/0:1]', '/usr/sbin/sshd -D',
+            '/usr/lib/systemd/systemd-journald', 'nginx: worker process',
+            '/usr/bin/python /usr/bin/tuned -l -P', '[migration/3]',
+            '/usr/sbin/crond -n', 'bash', '/usr/bin/dockerd-current',
+            '/usr/libexec/qemu-kvm -name guest=vm%d,debug-threads=on -m 4096',
+            'sleep 60', '[jbd2/dm-0-8]']
+STATES = ['S', 'S', 'S', 'Ss', 'S<', 'R', 'R+', 'Sl', 'D', 'Z', 'I']
+PACKAGES = ['kernel', 'kexec-tools', 'vdsm', 'qemu-kvm-rhev', 'libvirt',
+            'rhevm', 'ovirt-hosted-engine-ha', 'docker', 'glibc', 'bash',
+            'openssh-server', 'systemd', 'lvm2', 'NetworkManager']
+
+
+class Report():
+    '''Writes one synthetic report under root'''
+
+    def __init__(self, root, sizes, seed=0):
+        self.root = root.rstrip('/') + '/'
+        self.sizes = sizes
+        self.rand = random.Random(seed)
+
+    def path(self, fname):
+        path = self.root + fname
+        parent = os.path.dirname(path)
+        if not os.path.isdir(parent):
+            os.makedirs(parent)
+        return path
+
+    def write(self, fname, lines):
+        '''Write an iterable of lines to fname, relative to the root'''
+        with open(self.path(fname), 'w') as f:
+            for line in lines:
+                f.write(line)
+                f.write('\n')
+
+    def generate(self):
+        for name in sorted(dir(self)):
+            if name.startswith('gen_'):
+                getattr(self, name)()
+        return self.root
+
+    def gen_opsys(self):
+        self.write('sos_commands/general/hostname', ['bench.example.com'])
+        self.write('etc/redhat-release',
+                   ['Red Hat Enterprise Linux Server release 7.9 (Maipo)'])
+        self.write('sos_commands/startup/runlevel', ['N 3'])
+        self.write('sos_commands/general/uptime',
+                   [' 10:12:01 up 412 days,  3:07,  2 users,  '
+                    'load average: 31.05, 29.80, 28.12'])
+        self.write('sos_commands/kernel/uname_-a',
+                   ['Linux bench.example.com 3.10.0-1160.el7.x86_64 #1 SMP '
+                    'Tue Aug 18 14:50:17 EDT 2020 x86_64 x86_64 x86_64 '
+                    'GNU/Linux'])
+        self.write('proc/cmdline',
+                   ['BOOT_IMAGE=/vmlinuz-3.10.0-1160.el7.x86_64 '
+                    'root=/dev/mapper/rhel-root ro crashkernel=auto '
+                    'rd.lvm.lv=rhel/root rhgb quiet'])
+        self.write('proc/sys/kernel/tainted', ['0'])
+        self.write('date', ['Mon Oct  5 10:12:01 UTC 2020'])
+        self.write('sos_commands/selinux/sestatus_-b',
+                   ['SELinux status:                 enabled',
+                    'SELinuxfs mount:                /sys/fs/selinux',
+                    'SELinux root directory:         /etc/selinux',
+                    'Loaded policy name:             targeted',
+                    'Current mode:                   enforcing',
+                    'Mode from config file:          enforcing'])
+        self.write('proc/stat',
+                   ['cpu  %d 0 %d %d 0 0 0 0 0 0' % (
+                       self.sizes['cpus'] * 1000, self.sizes['cpus'] * 200,
+                       self.sizes['cpus'] * 90000),
+                    'btime 1566000000',
+                    'processes %d' % (self.sizes['procs'] * 40),
+                    'procs_running 12',
+                    'procs_blocked 1'])
+
+    def gen_cpuinfo(self):
+        cores = max(1, self.sizes['cpus'] // 4)
+        lines = []
+        for cpu in range(self.sizes['cpus']):
+            lines.extend([
+                'processor\t: %d' % cpu,
+                'vendor_id\t: GenuineIntel',
+                'cpu family\t: 6',
+                'model\t\t: 85',
+                'model name\t: Intel(R) Xeon(R) Platinum 8280 CPU @ 2.70GHz',
+                'physical id\t: %d' % (cpu // (cores * 2)),
+                'siblings\t: %d' % (cores * 2),
+                'core id\t\t: %d' % (cpu % cores),
+                'cpu cores\t: %d' % cores,
+                'flags\t\t: fpu vme de pse tsc msr pae mce cx8 apic sep mtrr '
+                'pge mca cmov pat pse36 clflush mmx fxsr sse sse2 ss ht tm pbe '
+                'syscall nx pdpe1gb rdtscp lm constant_tsc vmx smx est tm2 '
+                'ssse3 fma cx16 sse4_1 sse4_2 x2apic movbe popcnt aes xsave '
+                'avx f16c rdrand avx2 avx512f avx512dq',
+                'bogomips\t: 5400.00',
+                ''])
+        self.write('proc/cpuinfo', lines)
+
+    def gen_memory(self):
+        total = 1024 * 1024 * 1024
+        self.write('proc/meminfo', [
+            'MemTotal:       %d kB' % total,
+            'MemFree:        %d kB' % (total // 8),
+            'MemAvailable:   %d kB' % (total // 3),
+            'Buffers:        %d kB' % (total // 64),
+            'Cached:         %d kB' % (total // 4),
+            'SwapCached:     0 kB',
+            'Active:         %d kB' % (total // 2),
+            'Inactive:       %d kB' % (total // 5),
+            'Unevictable:    0 kB',
+            'SwapTotal:      8388604 kB',
+            'SwapFree:       8000000 kB',
+            'Dirty:          2048 kB',
+            'Slab:           %d kB' % (total // 32),
+            'HugePages_Total:       0',
+            'HugePages_Free:        0',
+            'Hugepagesize:       2048 kB'])
+
+    def gen_packages(self):
+        rand = self.rand
+        names = list(PACKAGES)
+        names.extend('pkg%05d-%s' % (i, rand.choice(['libs', 'devel', 'tools',
+                                                      'common', 'python']))
+                     for i in range(max(0, self.sizes['packages'] -
+                                        len(PACKAGES))))
+        lines = []
+        for name in names:
+            if name == 'rhevm':
+                ver = '4.1.9-0.1'
+                if not self.sizes['hypervisors']:
+                    continue
+            elif name == 'ovirt-hosted-engine-ha':
+                ver = '2.1.8-1'
+            else:
+                ver = '%d.%d.%d-%d' % (rand.randint(0, 9), rand.randint(0, 30),
+                                       rand.randint(0, 99),
+                                       rand.randint(1, 900))
+            lines.append('%-60s Mon Sep 28 09:12:44 2020' % (
+                '%s-%s.el7.%s' % (name, ver, rand.choice(['x86_64',
+                                                          'noarch']))))
+        self.write('installed-rpms', lines)
+
+    def gen_kernel(self):
+        self.write('etc/kdump.conf', ['# kdump config', 'path /var/crash',
+                                      'core_collector makedumpfile -l '
+                                      '--message-level 1 -d 31'])
+        lines = []
+        for i in range(200):
+            lines.append('net.ipv4.conf.eth%d.rp_filter = 1' % i)
+            lines.append('net.ipv6.conf.eth%d.disable_ipv6 = 0' % i)
+        lines.extend(['kernel.panic = 0', 'kernel.panic_on_oops = 1',
+                      'kernel.softlockup_panic = 0', 'vm.swappiness = 30'])
+        self.write('sos_commands/kernel/sysctl_-a', sorted(lines))
+
+    def _procs(self):
+        '''(user, pid, ppid, state, command, threads) of every process,
+        the same for every ps output written'''
+        if hasattr(self, '_proc_list'):
+            return self._proc_list
+        rand = self.rand
+        procs = [('root', 1, 0, 'Ss', '/usr/lib/systemd/systemd', 1)]
+        for pid in range(2, self.sizes['procs'] + 1):
+            # most processes are children of a handful of parents
+            ppid = rand.choice([1, 1, 2, rand.randint(1, pid - 1)])
+            cmd = rand.choice(COMMANDS)
+            if '%d' in cmd:
+                cmd = cmd % pid
+            threads = 1
+            if cmd.startswith(('/usr/bin/java', '/usr/libexec/qemu')):
+                threads = rand.randint(1, self.sizes['threads'] * 8)
+            procs.append((rand.choice(USERS), pid, ppid,
+                          rand.choice(STATES), cmd, threads))
+        self._proc_list = procs
+        return procs
+
+    def gen_ps_auxwww(self):
+        rand = self.rand
+        lines = ['USER       PID %CPU %MEM    VSZ   RSS TTY      STAT START'
+                 '   TIME COMMAND']
+        for user, pid, ppid, state, cmd, threads in self._procs():
+            rss = rand.randint(0, 4000000)
+            lines.append('%-8s %6d %4.1f %4.1f %7d %6d %-8s %-4s %5s %6s %s' % (
+                user, pid, rand.random() * 100, rand.random() * 10,
+                rss + rand.randint(0, 4000000), rss,
+                rand.choice(['?', '?', 'pts/0']), state, '09:12',
+                '%d:%02d' % (rand.randint(0, 900), rand.randint(0, 59)),
+                cmd))
+        self.write('sos_commands/process/ps_auxwww', lines)
+
+    def gen_ps_alxwww(self):
+        rand = self.rand
+        lines = ['F   UID   PID  PPID PRI  NI    VSZ   RSS WCHAN  STAT TTY'
+                 '        TIME COMMAND']
+        for user, pid, ppid, state, cmd, threads in self._procs():
+            lines.append('%d %5d %5d %5d %3d %3d %6d %5d %-6s %-4s %-10s '
+                         '%4s %s' % (rand.choice([0, 1, 4, 5]),
+                                     USERS.index(user), pid, ppid, 20, 0,
+                                     rand.randint(0, 8000000),
+                                     rand.randint(0, 4000000),
+                                     rand.choice(['-', 'ep_pol', 'do_wai']),
+                                     state, '?', '0:01', cmd))
+        self.write('sos_commands/process/ps_alxwww', lines)
+
+    def gen_ps_elfl(self):
+        rand = self.rand
+        lines = ['F S UID        PID  PPID   LWP  C NLWP PRI  NI ADDR SZ '
+                 'WCHAN  STIME TTY          TIME CMD']
+        for user, pid, ppid, state, cmd, threads in self._procs():
+            for lwp in range(threads):
+                lines.append('%d %s %-8s %5d %5d %5d %2d %4d %3d %3d - %5d %-6s '
+                             '%5s %-8s %8s %s' % (
+                                 rand.choice([0, 1, 4]),
+                                 rand.choice(['S', 'S', 'R', 'D']) if lwp else
+                                 state[0], user, pid, ppid,
+                                 pid if not lwp else pid * 100 + lwp,
+                                 0, threads, 80, 0, rand.randint(100, 90000),
+                                 '-', '09:12', '?', '00:00:01', cmd))
+        self.write('sos_commands/process/ps_-elfL', lines)
+
+    def _interfaces(self):
+        physical = max(2, min(8, self.sizes['interfaces'] // 8))
+        names = ['lo'] + ['eth%d' % i for i in range(physical)] + ['bond0']
+        for i in range(self.sizes['interfaces'] - len(names)):
+            names.append('%s%d' % ('vnet' if i % 2 else 'veth', i))
+        return names, physical
+
+    def gen_network(self):
+        rand = self.rand
+        names, physical = self._interfaces()
+        dev = ['Inter-|   Receive                                          '
+               '      |  Transmit',
+               ' face |bytes    packets errs drop fifo frame compressed '
+               'multicast|bytes    packets errs drop fifo colls carrier '
+               'compressed']
+        addr = []
+        for i, name in enumerate(names):
+            rx = [rand.randint(0, 10 ** 13), rand.randint(0, 10 ** 10),
+                  rand.choice([0, 0, 0, rand.randint(1, 10 ** 4)]),
+                  rand.choice([0, 0, rand.randint(1, 10 ** 5)]), 0, 0, 0,
+                  rand.randint(0, 10 ** 6)]
+            tx = [rand.randint(0, 10 ** 13), rand.randint(0, 10 ** 10),
+                  0, rand.choice([0, 0, rand.randint(1, 10 ** 3)]), 0, 0, 0,
+                  0]
+            dev.append('%6s: %s' % (name, ' '.join(str(n) for n in rx + tx)))
+            mac = '52:54:00:%02x:%02x:%02x' % ((i >> 16) & 255,
+                                                (i >> 8) & 255, i & 255)
+            master = ''
+            if name.startswith('eth') and int(name[3:]) < 2:
+                master = ' master bond0'
+            flags = 'LOOPBACK,UP,LOWER_UP' if name == 'lo' else \
+                'BROADCAST,MULTICAST,UP,LOWER_UP'
+            addr.append('%d: %s: <%s> mtu %d qdisc mq%s state UP qlen 1000'
+                        % (i + 1, name, flags, 65536 if name == 'lo' else 1500,
+                           master))
+            if name == 'lo':
+                addr.append('    link/loopback 00:00:00:00:00:00 brd '
+                            '00:00:00:00:00:00')
+                addr.append('    inet 127.0.0.1/8 scope host lo')
+                addr.append('    inet6 ::1/128 scope host')
+                continue
+            addr.append('    link/ether %s brd ff:ff:ff:ff:ff:ff' % mac)
+            if master:
+                continue
+            addr.append('    inet 10.%d.%d.%d/16 brd 10.%d.255.255 scope '
+                        'global %s' % ((i >> 16) & 255, (i >> 8) & 255,
+                                       i & 255, (i >> 16) & 255, name))
+            if name == 'bond0':
+                addr.append('    inet 192.168.0.10/24 scope global secondary '
+                            'bond0')
+            addr.append('    inet6 fe80::5054:ff:fe%02x:%02x%02x/64 scope '
+                        'link' % ((i >> 16) & 255, (i >> 8) & 255, i & 255))
+        self.write('proc/net/dev', dev)
+        self.write('sos_commands/networking/ip_address', addr)
+
+        base = 'sos_commands/networking/'
+        for name in names[1:physical + 2]:
+            self.write(base + 'ethtool_' + name, [
+                'Settings for %s:' % name,
+                '\tSupported ports: [ FIBRE ]',
+                '\tSpeed: 25000Mb/s',
+                '\tDuplex: Full',
+                '\tPort: FIBRE',
+                '\tAuto-negotiation: off',
+                '\tLink detected: yes'])
+            self.write(base + 'ethtool_-i_' + name, [
+                'driver: %s' % ('bonding' if name == 'bond0' else 'mlx5_core'),
+                'version: 5.0-0',
+                'firmware-version: 16.27.2008',
+                'bus-info: 0000:3b:00.%d' % names.index(name)])
+            self.write(base + 'ethtool_-g_' + name, [
+                'Ring parameters for %s:' % name,
+                'Pre-set maximums:', 'RX:\t\t8192', 'RX Mini:\t0',
+                'RX Jumbo:\t0', 'TX:\t\t8192',
+                'Current hardware settings:', 'RX:\t\t1024', 'RX Mini:\t0',
+                'RX Jumbo:\t0', 'TX:\t\t1024'])
+            stats = ['NIC statistics:']
+            for queue in range(32):
+                for counter in ['packets', 'bytes', 'dropped', 'errors']:
+                    for way in ['rx', 'tx']:
+                        value = rand.randint(0, 10 ** 9)
+                        if counter in ('dropped', 'errors'):
+                            value = rand.choice([0, 0, 0, 0, value % 1000])
+                        stats.append('     %s%d_%s: %d' % (way, queue, counter,
+                                                           value))
+            self.write(base + 'ethtool_-S_' + name, stats)
+            self.write('etc/sysconfig/network-scripts/ifcfg-' + name, [
+                'DEVICE=%s' % name, 'ONBOOT=yes', 'MTU=1500'] +
+                (['BONDING_OPTS="mode=4 miimon=100"'] if name == 'bond0'
+                 else []))
+        self.write('proc/net/bonding/bond0', [
+            'Ethernet Channel Bonding Driver: v3.7.1 (April 27, 2011)', '',
+            'Bonding Mode: IEEE 802.3ad Dynamic link aggregation', '',
+            'Slave Interface: eth0', 'MII Status: up',
+            'Link Failure Count: 0',
+            'Permanent HW addr: 52:54:00:00:00:01', '',
+            'Slave Interface: eth1', 'MII Status: up',
+            'Link Failure Count: 2',
+            'Permanent HW addr: 52:54:00:00:00:02'])
+
+    def gen_namespaces(self):
+        rand = self.rand
+        names = ['cni-%08x-%04x' % (rand.getrandbits(32), i)
+                 for i in range(self.sizes['namespaces'])]
+        self.write('sos_commands/networking/ip_netns',
+                   ['%s (id: %d)' % (name, i) for i, name in enumerate(names)])
+        for i, name in enumerate(names):
+            base = ('sos_commands/networking/namespaces/%s/'
+                    'ip_netns_exec_%s_' % (name, name))
+            net = '10.%d.%d' % (128 + i // 256, i % 256)
+            self.write(base + 'ip_address_show', [
+                '1: lo: <LOOPBACK,UP,LOWER_UP> mtu 65536 qdisc noqueue state '
+                'UNKNOWN qlen 1000',
+                '    link/loopback 00:00:00:00:00:00 brd 00:00:00:00:00:00',
+                '    inet 127.0.0.1/8 scope host lo',
+                '3: eth0@if%d: <BROADCAST,MULTICAST,UP,LOWER_UP> mtu 1450 '
+                'qdisc noqueue state UP' % (i + 100),
+                '    link/ether 0a:58:%02x:%02x:00:02 brd ff:ff:ff:ff:ff:ff '
+                'link-netnsid 0' % (i // 256, i % 256),
+                '    inet %s.2/24 brd %s.255 scope global eth0' % (net, net),
+                '    inet6 fe80::858:aff:fe%02x:%02x02/64 scope link' % (
+                    i // 256, i % 256)])
+            self.write(base + 'ip_route_show_table_all', [
+                'default via %s.1 dev eth0' % net,
+                '%s.0/24 dev eth0 proto kernel scope link src %s.2' % (net,
+                                                                      net),
+                '224.0.0.0/4 dev eth0',
+                'broadcast %s.255 dev eth0 table local proto kernel scope '
+                'link src %s.2' % (net, net),
+                'local %s.2 dev eth0 table local proto kernel scope host '
+                'src %s.2' % (net, net),
+                'local 127.0.0.0/8 dev lo table local proto kernel scope '
+                'host src 127.0.0.1'])
+            self.write(base + 'cat_.proc.net.dev', [
+                'Inter-|   Receive                                          '
+                '      |  Transmit',
+                ' face |bytes    packets errs drop fifo frame compressed '
+                'multicast|bytes    packets errs drop fifo colls carrier '
+                'compressed',
+                '    lo: 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0',
+                '  eth0: %d %d %d %d 0 0 0 0 %d %d %d %d 0 0 0 0' % (
+                    rand.randint(0, 10 ** 12), rand.randint(0, 10 ** 9),
+                    rand.choice([0, 0, rand.randint(1, 100)]),
+                    rand.choice([0, 0, rand.randint(1, 1000)]),
+                    rand.randint(0, 10 ** 12), rand.randint(0, 10 ** 9),
+                    rand.choice([0, 0, rand.randint(1, 100)]),
+                    rand.choice([0, 0, rand.randint(1, 1000)]))])
+
+    def gen_routes(self):
+        rand = self.rand
+        base = 'sos_commands/networking/'
+        routes = ['default via 10.0.0.1 dev bond0 proto static metric 300',
+                  '10.0.0.0/16 dev bond0 proto kernel scope link src '
+                  '10.0.0.10 metric 300']
+        # a BGP fed table, mostly /24s with shorter aggregates among them
+        for i in range(self.sizes['routes']):
+            length = rand.choice([16, 19, 20, 22, 23, 24, 24, 24, 24])
+            net = rand.getrandbits(32) & ~((1 << (32 - length)) - 1)
+            routes.append('%d.%d.%d.%d/%d via 10.0.%d.%d dev bond0 proto bgp '
+                          'metric 20' % (net >> 24, (net >> 16) & 255,
+                                         (net >> 8) & 255, net & 255, length,
+                                         rand.randint(0, 3),
+                                         rand.randint(2, 254)))
+        routes += ['default via 10.0.9.1 dev eth2 table 100',
+                   'unreachable 198.18.0.0/15 proto static',
+                   'local 10.0.0.10 dev bond0 table local proto kernel '
+                   'scope host src 10.0.0.10',
+                   'broadcast 10.0.255.255 dev bond0 table local proto '
+                   'kernel scope link src 10.0.0.10']
+        self.write(base + 'ip_route_show_table_all', routes)
+        routes = ['default via fe80::1 dev bond0 proto ra metric 300 pref '
+                  'medium',
+                  'fe80::/64 dev bond0 proto kernel metric 256 pref medium']
+        for i in range(self.sizes['routes'] // 10):
+            routes.append('2001:db8:%x:%x::/64 via fe80::1 dev bond0 proto '
+                          'bgp metric 20 pref medium' % (
+                              rand.getrandbits(16), rand.getrandbits(16)))
+        self.write(base + 'ip_-6_route_show_table_all', routes)
+        self.write(base + 'ip_-4_rule', [
+            '0:\tfrom all lookup local',
+            '100:\tfrom 10.0.9.0/24 lookup 100',
+            '32766:\tfrom all lookup main',
+            '32767:\tfrom all lookup default'])
+        self.write(base + 'ip_-6_rule', [
+            '0:\tfrom all lookup local',
+            '32766:\tfrom all lookup main'])
+
+    def gen_filesystem(self):
+        mount = ['proc on /proc type proc (rw,nosuid,nodev,noexec,relatime)',
+                 'sysfs on /sys type sysfs (rw,nosuid,nodev,noexec,relatime)']
+        df = ['Filesystem     1K-blocks     Used Available Use% Mounted on']
+        for i in range(self.sizes['mounts']):
+            dev = '/dev/mapper/vg%02d-lv%05d' % (i % 8, i)
+            point = '/srv/data%05d' % i if i else '/'
+            mount.append('%s on %s type xfs (rw,relatime,attr2,inode64,'
+                         'noquota)' % (dev, point))
+            size = self.rand.randint(10 ** 6, 10 ** 10)
+            used = self.rand.randint(0, size)
+            df.append('%s %d %d %d %d%% %s' % (dev, size, used, size - used,
+                                                100 * used // size, point))
+        self.write('sos_commands/filesys/mount_-l', mount)
+        self.write('sos_commands/filesys/df_-al', df)
+
+    def gen_lvm(self):
+        vgs = max(1, self.sizes['lvs'] // 500)
+        lines = []
+        for vg in range(vgs):
+            name = 'vg%02d' % vg
+            lines.extend([
+                '  --- Volume group ---',
+                '  VG Name               %s' % name,
+                '  System ID',
+                '  Format                lvm2',
+                '  VG Access             read/write',
+                '  VG Status             resizable',
+                '  VG Size               <20.00 TiB',
+                '  VG UUID               %032x' % vg, ''])
+            for lv in range(vg, self.sizes['lvs'], vgs):
+                lines.extend([
+                    '  --- Logical volume ---',
+                    '  LV Path                /dev/%s/lv%05d' % (name, lv),
+                    '  LV Name                lv%05d' % lv,
+                    '  VG Name                %s' % name,
+                    '  LV UUID                %032x' % lv,
+                    '  LV Write Access        read/write',
+                    '  LV Creation host, time bench, 2019-01-01 00:00:00',
+                    '  LV Status              available',
+                    '  LV Size                %d.00 GiB' % (lv % 500 + 1),
+                    '  Current LE             %d' % (lv * 256),
+                    '  Block device           253:%d' % lv, ''])
+            lines.extend([
+                '  --- Physical volumes ---',
+                '  PV Name               /dev/mapper/mpath%d' % vg,
+                '  PV UUID               %032x' % (vg + 1000),
+                '  PV Status             allocatable',
+                '  Total PE / Free PE    5242879 / 1024', ''])
+        self.write('sos_commands/lvm2/'
+                   'vgdisplay_-vv_--config_global_locking_type_0', lines)
+
+    def gen_dmidecode(self):
+        lines = ['# dmidecode 3.2', '',
+                 'Handle 0x0000, DMI type 0, 26 bytes',
+                 'BIOS Information',
+                 '\tVendor: Bench Inc.',
+                 '\tVersion: 2.8.2',
+                 '\tRelease Date: 08/27/2020', '',
+                 'Handle 0x0100, DMI type 1, 27 bytes',
+                 'System Information',
+                 '\tManufacturer: Bench Inc.',
+                 '\tProduct Name: Bench Server 9000',
+                 '\tSerial Number: BENCH001',
+                 '\tUUID: 4c4c4544-0000-0000-0000-000000000000', '']
+        arrays = max(1, self.sizes['dimms'] // 12)
+        for array in range(arrays):
+            lines.extend(['Handle 0x10%02x, DMI type 16, 23 bytes' % array,
+                          'Physical Memory Array',
+                          '\tLocation: System Board Or Motherboard',
+                          '\tMaximum Capacity: 3 TB',
+                          '\tNumber Of Devices: %d' % (
+                              self.sizes['dimms'] // arrays), ''])
+        for dimm in range(self.sizes['dimms']):
+            size = '\tSize: 32768 MB' if dimm % 3 else \
+                '\tSize: No Module Installed'
+            lines.extend(['Handle 0x11%02x, DMI type 17, 84 bytes' % dimm,
+                          'Memory Device', size,
+                          '\tLocator: DIMM_%d' % dimm, ''])
+        self.write('sos_commands/hardware/dmidecode', lines)
+
+    def gen_lspci(self):
+        lines = ['00:00.0 Host bridge: Intel Corporation Sky Lake-E DMI3 '
+                 'Registers (rev 07)',
+                 '03:00.0 VGA compatible controller: Matrox Electronics '
+                 'Systems Ltd. Integrated Matrox G200eW3 (rev 04)',
+                 '18:00.0 RAID bus controller: Broadcom / LSI MegaRAID SAS-3 '
+                 '3108 (rev 02)',
+                 '3b:00.0 Ethernet controller: Mellanox Technologies MT27800 '
+                 'Family [ConnectX-5]',
+                 '3b:00.1 Ethernet controller: Mellanox Technologies MT27800 '
+                 'Family [ConnectX-5]',
+                 '5e:00.0 Fibre Channel: QLogic Corp. ISP2722-based 16/32Gb '
+                 'Fibre Channel to PCIe Adapter (rev 01)']
+        self.write('lspci', lines)
+
+    def gen_containers(self):
+        self.write('sos_commands/docker/docker_info', [
+            'Containers: 40', 'Images: 12', 'Storage Driver: devicemapper',
+            ' Pool Name: docker-pool', 'Server Version: 1.13.1'])
+        self.write('sos_commands/docker/docker_images', [
+            'REPOSITORY TAG IMAGE ID CREATED SIZE'] + [
+            'registry.example.com/app%d latest %012x 2 weeks ago 400 MB' % (
+                i, i) for i in range(12)])
+        self.write('sos_commands/docker/docker_ps', [
+            'CONTAINER ID IMAGE COMMAND CREATED STATUS PORTS NAMES'] + [
+            '%012x app%d "/run.sh" 2_weeks Up 2_weeks app_%d' % (i, i % 12, i)
+            for i in range(40)])
+
+    def gen_pgdump(self):
+        '''A RHV manager database dump with hypervisors hosts in it'''
+        hosts = self.sizes['hypervisors']
+        if not hosts:
+            return
+        clusters = max(1, hosts // 50)
+        dcs = max(1, clusters // 4)
+        tables = OrderedDict()
+        tables['storage_pool'] = [
+            ['dc-%d' % i, 'DC%d' % i, '', '', '', '1', '', 'host-%d' % i,
+             '4.1'] for i in range(dcs)]
+        tables['cluster'] = [
+            ['cl-%d' % i, 'Cluster%d' % i, '', '', '', '', 'dc-%d' % (i % dcs),
+             '', '4.1'] for i in range(clusters)]
+        tables['vds_static'] = [
+            ['host-%d' % i, 'hyp%05d' % i, '', 'hyp%05d.example.com' % i, '',
+             'cl-%d' % (i % clusters), '', '0'] for i in range(hosts)]
+        dynamic = []
+        for i in range(hosts):
+            row = [''] * 40
+            row[0], row[1] = 'host-%d' % i, '3'
+            row[24] = 'RHEL - 7.9 - 1.el7'
+            row[25], row[26], row[27] = '2.12.0', '0.14.0', '3.10.0-1160'
+            row[34] = 'vdsm-4.20.60-1.el7ev'
+            dynamic.append(row)
+        tables['vds_dynamic'] = dynamic
+        tables['storage_domain_static'] = [
+            ['sd-%d' % i, '', 'SD%d' % i, str(i % 4), str(i % 8)]
+            for i in range(hosts // 10 + 1)]
+
+        dump = self.path('sos_commands/postgresql/pgdump/restore.sql')
+        pgdir = os.path.dirname(dump)
+        sql = []
+        for num, (table, rows) in enumerate(tables.items()):
+            dat = '%d.dat' % (3000 + num)
+            sql.append("COPY %s (id) FROM '$$PATH$$/%s';" % (table, dat))
+            self.write('sos_commands/postgresql/pgdump/' + dat,
+                       # pg_dump rows have more columns than are ever read,
+                       # so the last field is never one pysos looks at
+                       ['\t'.join(row + ['']) for row in rows] + ['\\.'])
+        self.write('sos_commands/postgresql/pgdump/restore.sql', sql)
+        tar = tarfile.open(self.path('sos_commands/postgresql/sos_pgdump.tar'),
+                           'w')
+        for fname in sorted(os.listdir(pgdir)):
+            tar.add(os.path.join(pgdir, fname), arcname=fname)
+            os.remove(os.path.join(pgdir, fname))
+        tar.close()
+        os.rmdir(pgdir)
+
+
+def get_sizes(scale, overrides=None):
+    '''The sizes for a preset scale, with any of them overridden'''
+    sizes = dict(SCALES[scale])
+    for key, value in (overrides or {}).items():
+        if value is not None:
+            sizes[key] = value
+    return sizes
+
+
+def generate(root, scale='small', seed=0, **overrides):
+    '''Write a synthetic report to root and return its path'''
+    return Report(root, get_sizes(scale, overrides), seed).generate()
+
+
+parser = argparse.ArgumentParser(description="Write a synthetic sosreport "
+                                 "for benchmarking pysos")
+parser.add_argument('root', help="Directory to write the report to")
+parser.add_argument('--scale', choices=list(SCALES), default='small',
+                    help="Preset sizes to use, defaults to small")
+parser.add_argument('--seed', type=int, default=0,
+                    help="Random seed, the same seed writes the same report")
+for _key in SCALES['small']:
+    parser.add_argument('--' + _key, type=int, default=None,
+                        help="Override the number of %s" % _key)
+
+
+if __name__ == '__main__':
+    args = vars(parser.parse_args())
+    root = args.pop('root')
+    scale = args.pop('scale')
+    seed = args.pop('seed')
+    sys.stdout.write(generate(root, scale, seed, **args) + '\n')
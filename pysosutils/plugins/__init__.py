@@ -0,0 +1,32 @@
+'''Registry of the plugins pysos can run.
+
+Every plugin is enabled by the command line option of the same name and
+is a class of that name in a module of that name in this package. A
+plugin's module is only imported once that plugin is asked for.
+'''
+
+from collections import OrderedDict
+
+# plugin name -> module, in run order. pysos used to run plugins in
+# whatever order a plain dict of them iterated in, so that order is kept
+# here to keep the output the same.
+PLUGINS = OrderedDict((name, '%s.%s' % (__name__, name)) for name in [
+    'virt',
+    'kernel',
+    'processes',
+    'network',
+    'opsys',
+    'memory',
+    'bios',
+    'lvm',
+    'filesystem',
+    'lspci',
+    'cpu',
+    'containers',
+])
+
+
+def get_plugin_class(name):
+    '''Import and return the class for a registered plugin'''
+    module = __import__(PLUGINS[name], fromlist=[name])
+    return getattr(module, name)
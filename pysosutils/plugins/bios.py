@@ -1,21 +1,30 @@
-import sys
-import os
 import re
 from pysosutils.utilities.plugin import Plugin
+from collections import OrderedDict
 from cpu import cpu
 
 
 class bios(Plugin):
 
-    def parse(self):
-        if self.dmifile:
-            self.report_bios()
+    sections = ['BIOS', 'Processor', 'System', 'DIMM']
+
+    def collect(self):
+        if not self.dmifile:
+            return False
+        info = OrderedDict()
+        for section in self.sections:
+            info[section] = getattr(self, 'get_%s_info' % section.lower())()
+        return info
+
+    def render(self, result):
+        if result:
+            self.report_bios(result)
         else:
             self.pprint.bred("No dmidecode file present")
 
     @property
     def dmifile(self):
-        if os.path.isfile(self.target + 'sos_commands/hardware/dmidecode'):
+        if self.file_exists('sos_commands/hardware/dmidecode'):
             return self.target + 'sos_commands/hardware/dmidecode'
         else:
             return False
@@ -32,19 +41,17 @@ class bios(Plugin):
                                     section
                                 )
 
-    def report_bios(self):
+    def report_bios(self, info):
         self.pprint.bsection('BIOS')
-        r = ['BIOS', 'Processor', 'System', 'DIMM']
         i = {}
         i['BIOS'] = ['Vendor', 'Version', 'Release Date']
         i['System'] = ['Manufacturer', 'Product Name', 'UUID', 'Serial Number']
         i['Processor'] = ['vendor', 'model', 'processors', 'cores', 'sockets']
         i['DIMM'] = ['ALL']
-        for s in r:
-            self.print_info_for_section(s, i[s])
+        for s in self.sections:
+            self.print_info_for_section(s, i[s], info[s])
 
-    def print_info_for_section(self, section, props):
-        info = getattr(self, 'get_%s_info' % section.lower())()
+    def print_info_for_section(self, section, props, info):
         if info:
             self.pprint.bheader('\t%s' % section)
             if 'ALL' in props:
@@ -84,26 +91,25 @@ class bios(Plugin):
         for prop in props:
             dimm[prop] = 0
 
-        with open(self.dmifile, 'r') as dfile:
-            # main iterables that have distinct leading names
-            for line in dfile:
-                if 'Maximum Capacity:' in line:
-                    index = line.find(':')
-                    maxmem = line[index + 1:len(line)].strip()
-                    if 'GB' in maxmem:
-                        dimm['Max Memory'] = int(maxmem.strip('GB'))
-                    elif 'TB' in maxmem:
-                        dimm['Max Memory'] = int(maxmem.strip('TB')) * 1024
-                if 'Number Of Devices:' in line:
-                    dimm_count += int(line.split()[3])
-                if re.match('\tSize:', line):
-                    if 'No Module Installed' in line:
-                        empty_dimms += 1
-                    else:
-                        size = int(line.split()[1])
-                        dimm['Total Memory'] += size
-                if 'Physical Memory Array' in line:
-                    mem_arrays += 1
+        # main iterables that have distinct leading names
+        for line in self.map_file(self.dmifile):
+            if 'Maximum Capacity:' in line:
+                index = line.find(':')
+                maxmem = line[index + 1:len(line)].strip()
+                if 'GB' in maxmem:
+                    dimm['Max Memory'] = int(maxmem.strip('GB'))
+                elif 'TB' in maxmem:
+                    dimm['Max Memory'] = int(maxmem.strip('TB')) * 1024
+            if 'Number Of Devices:' in line:
+                dimm_count += int(line.split()[3])
+            if re.match('\tSize:', line):
+                if 'No Module Installed' in line:
+                    empty_dimms += 1
+                else:
+                    size = int(line.split()[1])
+                    dimm['Total Memory'] += size
+            if 'Physical Memory Array' in line:
+                mem_arrays += 1
 
         dimm['Max Memory'] = dimm['Max Memory'] * mem_arrays
         used = dimm_count - empty_dimms
@@ -1,35 +1,45 @@
 import json
 import re
-import os
-import sys
 from pysosutils.utilities.plugin import Plugin
 from pysosutils.utilities.sostests import SosTests
+from collections import OrderedDict
 
 
 class containers(Plugin):
     ''' Docker, Rkt, Kubernetes, and Atomic '''
 
-    def parse(self):
+    def collect(self):
+        info = OrderedDict()
         if self.is_atomic:
-            self.report_atomic()
+            info['atomic'] = self.get_atomic_info()
         if self.is_docker:
-            self.report_docker()
-        if self.is_rkt:
-            self.report_rkt()
+            info['docker'] = self.get_docker_info()
         if self.is_kubernetes:
-            self.report_kubernetes()
+            info['kubernetes'] = self.get_kubernetes_info()
+        return info
+
+    def render(self, result):
+        if 'atomic' in result:
+            self.report_atomic(result['atomic'])
+        if 'docker' in result:
+            self.report_docker(result['docker'])
+        if 'kubernetes' in result:
+            self.report_kubernetes(result['kubernetes'])
 
     def _fmt_node_name(self, node):
         return node.split('=')[2].strip('http://')[0:-2]
 
     def _parse_json(self, f):
-        return json.loads("".join(open(f).readlines()))
+        data = self.read_file(f)
+        if data is None:
+            raise IOError('No %s file to parse' % f)
+        return json.loads(data)
 
     @property
     def is_atomic(self):
-        if not os.path.exists(self.target + "etc/redhat-release"):
+        cpe = self.read_lines('etc/redhat-release')
+        if not cpe:
             return False
-        cpe = open(self.target + "etc/redhat-release", "r").readlines()
         return 'Atomic' in cpe[0]
 
     @property
@@ -67,42 +77,40 @@ class containers(Plugin):
         except:
             return False
 
-    def report_atomic(self):
-        info = self.get_atomic_info()
+    def report_atomic(self, info):
         if info:
             self.pprint.section('Atomic Host')
             self.pprint.bheader('Branch', info['branch'])
             self.pprint.bheader('Commit', info['commit'])
 
     def get_image_list(self):
-        try:
-            images = []
-            with open(self.target +
-                      'sos_commands/docker/docker_images') as d:
-                for line in d:
-                    if line.startswith('Cannot'):
-                        break
-                    l = line.split()
-                    i = {}
-                    i['repo'] = l[0]
-                    i['tag'] = l[1]
-                    i['image'] = l[2]
-                    images.append(i)
-            return images
-        except IOError:
+        lines = self.read_lines('sos_commands/docker/docker_images')
+        if lines is None:
             return False
+        images = []
+        for line in lines:
+            if line.startswith('Cannot'):
+                break
+            l = line.split()
+            i = {}
+            i['repo'] = l[0]
+            i['tag'] = l[1]
+            i['image'] = l[2]
+            images.append(i)
+        return images
 
     def get_docker_info(self):
             try:
-                df = self.target + 'sos_commands/docker/docker_info'
-                with open(df) as dfile:
-                    info = {}
-                    for line in dfile:
-                        line = line.split(':')
-                        try:
-                            info[line[0]] = line[1].strip()
-                        except:
-                            pass
+                dfile = self.read_lines('sos_commands/docker/docker_info')
+                if dfile is None:
+                    raise IOError('No docker_info file to parse')
+                info = {}
+                for line in dfile:
+                    line = line.split(':')
+                    try:
+                        info[line[0]] = line[1].strip()
+                    except:
+                        pass
                 info['installed'] = self.get_rpm('docker')
                 l = [
                     m.string for m in (re.search('docker-latest', l)
@@ -110,36 +118,33 @@ class containers(Plugin):
                 ]
                 info['daemon'] = '/usr/bin/docker'
                 if l:
-                    with open(self.target + 'etc/sysconfig/docker', 'r') as f:
-                        for line in f:
-                            if 'DOCKERBINARY' in line:
-                                info['daemon'] = line.split('=')[1]
+                    for line in self.read_lines('etc/sysconfig/docker'):
+                        if 'DOCKERBINARY' in line:
+                            info['daemon'] = line.split('=')[1]
                 info['images'] = self.get_image_list()
                 info['image count'] = len(info['images'])
-                pf = self.target + 'sos_commands/docker/docker_ps'
-                with open(pf) as pfile:
-                    containers = []
-                    for line in pfile:
-                        if line.startswith('Cannot connect'):
-                            break
-                        if not line.startswith('CONTAINER'):
-                            line = line.split()
-                            container = {}
-                            container['id'] = line[0]
-                            container['image'] = line[1]
-                            container['cmd'] = line[2]
-                            container['status'] = line[4]
-                            container['name'] = line[6]
-                            containers.append(container)
-                    info['containers'] = containers
+                pfile = self.read_lines('sos_commands/docker/docker_ps')
+                containers = []
+                for line in pfile:
+                    if line.startswith('Cannot connect'):
+                        break
+                    if not line.startswith('CONTAINER'):
+                        line = line.split()
+                        container = {}
+                        container['id'] = line[0]
+                        container['image'] = line[1]
+                        container['cmd'] = line[2]
+                        container['status'] = line[4]
+                        container['name'] = line[6]
+                        containers.append(container)
+                info['containers'] = containers
                 info['running'] = len(info['containers'])
                 return info
             except Exception as e:
                 return False
 
-    def report_docker(self):
+    def report_docker(self, info):
         self.pprint.bsection('Containers')
-        info = self.get_docker_info()
         if info:
             self.pprint.section('  Docker')
             # do this twice to maintain order
@@ -166,7 +171,7 @@ class containers(Plugin):
         if 'Not Installed' in info['version']:
             return False
 
-        kroot = self.target + 'sos_commands/kubernetes/kubectl_get-o_json_'
+        kroot = 'sos_commands/kubernetes/kubectl_get-o_json_'
 
         # get pods
         for svc in ['pods', 'services', 'replicationController']:
@@ -179,8 +184,7 @@ class containers(Plugin):
 
         return info
 
-    def report_kubernetes(self):
-        info = self.get_kubernetes_info()
+    def report_kubernetes(self, info):
         if info:
             self.pprint.section('  Kubernetes')
             self.pprint.bheader('\t Installed', '\n\t\t %s' % info['version'])
@@ -1,16 +1,17 @@
-import os
 from collections import OrderedDict
 from pysosutils.utilities.plugin import Plugin
 
 
 class kernel(Plugin):
 
-    def parse(self):
-        self.report_kernel()
+    def collect(self):
+        return self.get_kernel_info()
 
-    def report_kernel(self):
+    def render(self, result):
+        self.report_kernel(result)
+
+    def report_kernel(self, info):
         self.pprint.bsection('Kernel')
-        info = self.get_kernel_info()
         if not info:
             self.pprint.bred('Could not parse kernel info')
             raise Exception
@@ -42,15 +43,12 @@ class kernel(Plugin):
     def get_kdump_config(self):
         """ Get all config settings for kdump """
         kdump = {}
-        if os.path.isfile(self.target + 'etc/kdump.conf'):
-            with open(self.target + 'etc/kdump.conf', 'r') as kfile:
-                for line in kfile:
-                    if (not line.startswith("#") and not
-                            line.startswith('\n')):
-                        kdump[line.split()[0]] = (line.split(
-                            line.split()[0])[1].strip('\n'))
-        else:
-            kdump = False
+        kfile = self.read_lines('etc/kdump.conf')
+        if kfile is None:
+            return False
+        for line in kfile:
+            if not line.startswith("#") and line.strip():
+                kdump[line.split()[0]] = line.split(line.split()[0])[1]
         return kdump
 
     def get_kdump_info(self):
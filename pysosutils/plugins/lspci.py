@@ -1,49 +1,51 @@
-import os
 from pysosutils.utilities.plugin import Plugin
 
 
 class lspci(Plugin):
 
-    def parse(self):
-        self.lspci_info = self.get_lspci_info()
+    def collect(self):
+        return self.get_lspci_info()
+
+    def render(self, result):
+        self.lspci_info = result
         self.display_all_devices()
 
     def get_lspci_info(self):
         ls_info = []
-        if os.path.isfile(self.target + 'lspci'):
-            with open(self.target + 'lspci', 'r') as lfile:
-                for line in lfile:
-                    if 'lspci -nvv:' in line:
-                        break
-                    try:
-                        pciaddr = line[0:line.find('.') - 1].strip()
-                        new_dev = True
-                        if len(ls_info) > 0:
-                            for dev in ls_info:
-                                if dev['pciaddr'] == pciaddr:
-                                    dev['count'] += 1
-                                    new_dev = False
-                                    break
-                        if new_dev:
-                            dev = {}
-                            dev['pciaddr'] = pciaddr
-                            dev['devtype'] = line[line.find(pciaddr):
-                                                  line.find(': ') + 1].strip(
-                                pciaddr).strip()
-                            dev['name'] = line[line.find(': ') + 2:
-                                               len(line)].strip('\n')
-                            if 'Ethernet' in dev['devtype']:
-                                dev['devtype'] = 'Ethernet'
-                            elif 'VGA' in dev['devtype']:
-                                dev['devtype'] = 'VGA'
-                            elif 'SCSI' in dev['devtype']:
-                                dev['devtype'] = 'SCSI'
-                            elif 'Fibre Channel' in dev['devtype']:
-                                dev['devtype'] = 'Fibre'
-                            dev['count'] = 1
-                            ls_info.append(dev)
-                    except:
-                        pass
+        lfile = self.read_lines('lspci')
+        if lfile is not None:
+            for line in lfile:
+                if 'lspci -nvv:' in line:
+                    break
+                try:
+                    pciaddr = line[0:line.find('.') - 1].strip()
+                    new_dev = True
+                    if len(ls_info) > 0:
+                        for dev in ls_info:
+                            if dev['pciaddr'] == pciaddr:
+                                dev['count'] += 1
+                                new_dev = False
+                                break
+                    if new_dev:
+                        dev = {}
+                        dev['pciaddr'] = pciaddr
+                        dev['devtype'] = line[line.find(pciaddr):
+                                              line.find(': ') + 1].strip(
+                            pciaddr).strip()
+                        dev['name'] = line[line.find(': ') + 2:
+                                           len(line)].strip('\n')
+                        if 'Ethernet' in dev['devtype']:
+                            dev['devtype'] = 'Ethernet'
+                        elif 'VGA' in dev['devtype']:
+                            dev['devtype'] = 'VGA'
+                        elif 'SCSI' in dev['devtype']:
+                            dev['devtype'] = 'SCSI'
+                        elif 'Fibre Channel' in dev['devtype']:
+                            dev['devtype'] = 'Fibre'
+                        dev['count'] = 1
+                        ls_info.append(dev)
+                except:
+                    pass
         return ls_info
 
     def display_all_devices(self):
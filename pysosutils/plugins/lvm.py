@@ -1,25 +1,44 @@
-import os
 from pysosutils.utilities.plugin import Plugin
 
 
 class lvm(Plugin):
 
-    def parse(self):
-        self.keys = ['name', 'size', 'path', 'status', 'uuid']
-        self.header = ['Name', 'Size', 'Path', 'Status', 'UUID']
-        df = self.target + 'sos_commands/devicemapper/vgdisplay_-vv'
-        lf = self.target + ('sos_commands/lvm2/'
-                            'vgdisplay_-vv_--config_global_locking_type_0'
-                            )
-        if os.path.isfile(df):
-            self.lvfile = df
-        elif os.path.isfile(lf):
-            self.lvfile = lf
-        self.display_lvm_data()
+    keys = ['name', 'size', 'path', 'status', 'uuid']
+    header = ['Name', 'Size', 'Path', 'Status', 'UUID']
+
+    @property
+    def lvfile(self):
+        df = 'sos_commands/devicemapper/vgdisplay_-vv'
+        lf = ('sos_commands/lvm2/'
+              'vgdisplay_-vv_--config_global_locking_type_0'
+              )
+        if self.file_exists(df):
+            return df
+        elif self.file_exists(lf):
+            return lf
+        return None
+
+    def collect(self):
+        vgs = self.get_lvm_data()
+        if vgs is False:
+            return False
+        return [vg.to_dict() for vg in vgs]
+
+    def render(self, result):
+        if result is False:
+            self.pprint.bred(
+                '\tCould not find %s. Unable to parse' % self.lvfile
+            )
+        self.display_lvm_data(result)
 
     def get_lvm_data(self):
         try:
-            data = [l.strip() for l in open(self.lvfile).readlines()
+            if self.lvfile is None:
+                raise IOError('No vgdisplay output to parse')
+            lines = self.read_lines(self.lvfile)
+            if lines is None:
+                raise IOError('No %s file to parse' % self.lvfile)
+            data = [l.strip() for l in lines
                     if l.strip() and (l.strip().startswith('---') or
                                       l.strip().startswith('VG') or
                                       l.strip().startswith('LV') or
@@ -31,19 +50,14 @@ class lvm(Plugin):
                 vgs.append(vg)
         except IOError:
             vgs = False
-            self.pprint.bred(
-                '\tCould not find %s. Unable to parse' % self.lvfile
-            )
         return vgs
 
-    def display_lvm_data(self):
-        data = self.get_lvm_data()
+    def display_lvm_data(self, vgs):
         self.pprint.bsection('Disk and LVM Information\n')
-        if data:
-            for vg in data:
-                self.pprint.bheader('\t VG Name: ', vg.name)
-                data = [lv.__dict__ for lv in vg.lvs]
-                tbl = self.format_as_table(data, self.keys,
+        if vgs:
+            for vg in vgs:
+                self.pprint.bheader('\t VG Name: ', vg['name'])
+                tbl = self.format_as_table(vg['lvs'], self.keys,
                                            self.header, 'name'
                                            )
                 self.display_table(tbl, color='WHITE', indent='\t\t')
@@ -69,6 +83,14 @@ class VolumeGroup:
         self.lvs = self.getlvs(vglvdata)
         self.pvs = self.getpvs(pvdata)
 
+    def to_dict(self):
+        vg = {}
+        for attr in ['name', 'access', 'status', 'size', 'uuid']:
+            vg[attr] = getattr(self, attr, '')
+        vg['lvs'] = [dict(lv.__dict__) for lv in self.lvs]
+        vg['pvs'] = [dict(pv.__dict__) for pv in self.pvs]
+        return vg
+
     def getvgdata(self, vglvdata):
         self.vgdata = [
             x for x in '+++'.join(vglvdata).split(
@@ -1,31 +1,37 @@
 # -*- coding: utf-8 -*-
 
-import os
 from pysosutils.utilities.plugin import Plugin
 
 
 class memory(Plugin):
 
-    def parse(self):
-        self.gprops = [
-                       ('used', 'blue'),
-                       ('cached', 'cyan'),
-                       ('in use', 'dblue'),
-                       ('buffers', 'purple'),
-                       ('swap used', 'white'),
-                       ('dirty', 'red'),
-                       ('slab', 'gray')
-                       ]
-        self.props = [
-                       'used',
-                       'cached',
-                       'buffers',
-                       'dirty',
-                       'active',
-                       'inactive',
-                       'unevictable',
-                    ]
-        self.display_mem_info()
+    gprops = [
+              ('used', 'blue'),
+              ('cached', 'cyan'),
+              ('in use', 'dblue'),
+              ('buffers', 'purple'),
+              ('swap used', 'white'),
+              ('dirty', 'red'),
+              ('slab', 'gray')
+              ]
+    props = [
+             'used',
+             'cached',
+             'buffers',
+             'dirty',
+             'active',
+             'inactive',
+             'unevictable',
+             ]
+
+    def collect(self):
+        mem = self.get_mem_info()
+        if mem:
+            mem = self.convert_mem_info(mem)
+        return mem
+
+    def render(self, result):
+        self.display_mem_info(result)
 
     def _graph(self, perc):
         """
@@ -61,11 +67,10 @@ class memory(Plugin):
         else:
             return str(mem) + ' MB'
 
-    def display_mem_info(self):
+    def display_mem_info(self, mem):
         self.pprint.bsection('Memory Information')
-        self.mem = self.get_mem_info()
+        self.mem = mem
         if self.mem:
-            self.mem = self.convert_mem_info(self.mem)
             self.graphs = self.get_mem_graphed(self.mem)
             self.pprint.bheader('\t Memory Statistics Graphed')
             for p in self.gprops:
@@ -106,9 +111,9 @@ class memory(Plugin):
         """ Returns the contents of meminfo as a dict and adds values for
         used, swapused and inuse which is used minus cached
         """
-        if not os.path.isfile(self.target + 'proc/meminfo'):
-            return False
         mem = self.file_to_dict('proc/meminfo')
+        if not mem:
+            return False
         for m in mem:
             mem[m] = int(mem[m])
         mem['used'] = mem['memtotal'] - mem['memfree']
@@ -1,14 +1,74 @@
-import os
-
+import posixpath
+import threading
+from collections import OrderedDict
+from pysosutils.utilities.ethstats import EthtoolMatrix, parse_stats
+from pysosutils.utilities.ipaddr import InterfaceTable
+from pysosutils.utilities.netdev import NetDevTable
 from pysosutils.utilities.plugin import Plugin
+from pysosutils.utilities.routes import (RoutingTables, parse_routes,
+                                         parse_rules)
 
 
 class network(Plugin):
     """Network device information"""
 
-    def parse(self):
-        self.dev_list = self.get_all_int_info()
+    # options that change what collect() returns
+    cache_options = ('vnet', 'ethstats', 'netns', 'route', 'route_src')
+    # rows shown in the ethtool statistics tables
+    top = 10
+    # threads namespaces are read on when --jobs doesn't ask for more
+    netns_threads = 8
+    # where sosreport puts the output of ip netns exec <ns> <command>,
+    # with a directory per namespace in newer versions
+    netns_dirs = ['sos_commands/networking/namespaces/%s/',
+                  'sos_commands/networking/']
+    # the commands run in each namespace, by what they're read for
+    netns_commands = {
+        'addresses': ['ip_address_show', 'ip_-d_address_show'],
+        'routes': ['ip_route_show_table_all', 'ip_route_show'],
+        'routes6': ['ip_-6_route_show_table_all', 'ip_-6_route_show'],
+        'counters': ['cat_.proc.net.dev'],
+        }
+    # ip route and ip rule output for each family, by preference
+    route_files = {
+        'inet': ['ip_route_show_table_all', 'ip_-4_route_show_table_all',
+                 'ip_route'],
+        'inet6': ['ip_-6_route_show_table_all', 'ip_-6_route'],
+        }
+    rule_files = {
+        'inet': ['ip_-4_rule_list', 'ip_-4_rule', 'ip_rule_list', 'ip_rule'],
+        'inet6': ['ip_-6_rule_list', 'ip_-6_rule'],
+        }
+    # what a device shows for anything its ethtool, ring or driver files
+    # don't say, such as for vnet and veth devices that have none
+    device_defaults = {
+        'linkdetected': '', 'autonegotiation': '', 'speed': '',
+        'currentrx': '?', 'currenttx': '?', 'maxrx': '?', 'maxtx': '?',
+        'driver': '', 'driverversion': '', 'firmware': '',
+        }
+
+    def collect(self):
+        self.get_all_int_info()
+        info = OrderedDict()
+        info['devices'] = self.devs
+        if self.options.get('ethstats'):
+            info['statistics'] = self.get_ethtool_stats()
+        if self.options.get('netns'):
+            info['namespaces'] = self.get_namespaces()
+        if self.options.get('route'):
+            info['routing'] = self.get_route_lookups(
+                self.options['route'], self.options.get('route_src'))
+        return info
+
+    def render(self, result):
+        self.devs = result['devices']
         self.display_info()
+        if 'statistics' in result:
+            self.display_ethtool_stats(result['statistics'])
+        if 'namespaces' in result:
+            self.display_namespaces(result['namespaces'])
+        if 'routing' in result:
+            self.display_routing(result['routing'])
 
     def display_info(self):
         self.pprint.bsection('Network Information')
@@ -45,41 +105,261 @@ class network(Plugin):
             header = ['Device', 'IP Address', 'MAC Address', 'Slave Of', 'MTU']
             self.display_section_info("IP", self.devs, keys, header)
 
+    def display_ethtool_stats(self, stats):
+        self.pprint.bheader('\n\tEthtool Statistics')
+        self.pprint.white('\t\t%s counters on %s interfaces' % (
+                          stats['counters'], stats['interfaces']))
+        if not stats['ranked']:
+            self.pprint.white('\t\tNo drop, error or discard counters '
+                              'above 0')
+            return
+        self.pprint.white('\n\t\tInterfaces by Drops, Errors and Discards:')
+        keys = ['name', 'drops', 'errors', 'discards', 'counters']
+        header = ['Device', 'Drops', 'Errors', 'Discards', 'Counters']
+        tbl = self.format_as_table(stats['ranked'], keys, header)
+        self.display_table(tbl, self.top, 'BBLUE', '\t\t ')
+        self.pprint.white('\n\t\tLargest Drop, Error and Discard Counters:')
+        keys = ['name', 'counter', 'kind', 'value']
+        header = ['Device', 'Counter', 'Kind', 'Value']
+        tbl = self.format_as_table(stats['top'], keys, header)
+        self.display_table(tbl, self.top, 'BBLUE', '\t\t ')
+
+    def display_namespaces(self, namespaces):
+        self.pprint.bheader('\n\tNetwork Namespaces')
+        if not namespaces:
+            self.pprint.white('\t\tNo network namespaces collected')
+            return
+        keys = ['name', 'interfaces', 'ipv4', 'ipv6', 'routes', 'default',
+                'rxerrs', 'rxdrop', 'txerrs', 'txdrop']
+        header = ['Namespace', 'Ifaces', 'IPv4', 'IPv6', 'Routes',
+                  'Default Route', 'RxErrs', 'RxDrops', 'TxErrs', 'TxDrops']
+        tbl = self.format_as_table(namespaces, keys, header)
+        self.display_table(tbl, color='WHITE', indent='\t\t')
+
+    def display_routing(self, routing):
+        self.pprint.bheader('\n\tRouting')
+        if not routing['tables']:
+            self.pprint.white('\t\tNo ip route output to parse')
+            return
+        keys = ['family', 'table', 'routes']
+        header = ['Family', 'Table', 'Routes']
+        tbl = self.format_as_table(routing['tables'], keys, header)
+        self.display_table(tbl, color='WHITE', indent='\t\t')
+        self.pprint.white('\n\t\tRoute Lookups:')
+        keys = ['address', 'route', 'type', 'via', 'dev', 'table', 'rule']
+        header = ['Destination', 'Route', 'Type', 'Via', 'Device', 'Table',
+                  'Rule']
+        tbl = self.format_as_table(routing['lookups'], keys, header)
+        self.display_table(tbl, color='WHITE', indent='\t\t')
+
     def display_section_info(self, section, data, keys, header):
         self.pprint.bheader('\n\t%s Information' % section)
         tbl = self.format_as_table(data, keys, header, False)
         self.display_table(tbl, color='WHITE', indent='\t\t')
 
+    def get_netdev_table(self):
+        """ Get the NetDevTable for proc/net/dev, parsed once and shared """
+        table = self.cache.parsed(self._path('proc/net/dev'), 'netdev',
+                                  NetDevTable.from_data)
+        if table is None:
+            raise IOError('No proc/net/dev file to parse')
+        return table
+
+    def get_ethtool_matrix(self):
+        """ Load the ethtool -S output of every interface into one
+        EthtoolMatrix """
+        prefix = 'ethtool_-S_'
+        stats = []
+        for fname in self.find_files('sos_commands/networking/%s*' % prefix):
+            counters = self.cache.parsed(self._path(fname), 'ethstats',
+                                         parse_stats)
+            if counters:
+                stats.append((posixpath.basename(fname)[len(prefix):],
+                              counters))
+        return EthtoolMatrix(stats)
+
+    def get_ethtool_stats(self):
+        """ Rank interfaces and ethtool -S counters by drops, errors and
+        discards """
+        matrix = self.get_ethtool_matrix()
+        info = OrderedDict()
+        info['interfaces'] = len(matrix)
+        info['counters'] = matrix.parsed
+        info['ranked'] = matrix.ranked(self.top)
+        info['top'] = matrix.top_counters(self.top)
+        return info
+
+    def get_namespace_names(self):
+        """ Get the names of the network namespaces sosreport collected
+        commands from """
+        names = set()
+        for line in self.read_lines('sos_commands/networking/ip_netns') or []:
+            # ip netns lists each as "name" or "name (id: 0)"
+            if line.strip():
+                names.add(line.split()[0])
+        base = self.netns_dirs[0].split('%s')[0]
+        for fname in self.find_files(base + '*/ip_netns_exec_*'):
+            names.add(fname[len(base):].split('/', 1)[0])
+        # older versions put every namespace's output in one directory,
+        # so the name is what is left once the command is taken off
+        prefix = self.netns_dirs[1] + 'ip_netns_exec_'
+        commands = [c for cs in self.netns_commands.values() for c in cs]
+        for fname in self.find_files(prefix + '*'):
+            rest = fname[len(prefix):]
+            for command in commands:
+                if rest.endswith('_' + command):
+                    names.add(rest[:-len(command) - 1])
+                    break
+        return sorted(names)
+
+    def get_namespace_file(self, name, what):
+        """ Get the path of the first output of a command run in a
+        namespace that the report has, or None """
+        for directory in self.netns_dirs:
+            if '%s' in directory:
+                directory = directory % name
+            for command in self.netns_commands[what]:
+                fname = directory + 'ip_netns_exec_%s_%s' % (name, command)
+                if self.file_exists(fname):
+                    return fname
+        return None
+
+    def get_namespace_info(self, name):
+        """ Summarize the interfaces, addresses, routes and interface
+        counters of one network namespace """
+        ns = {'name': name, 'interfaces': 0, 'ipv4': 0, 'ipv6': 0,
+              'routes': 0, 'default': '', 'rxerrs': '', 'rxdrop': '',
+              'txerrs': '', 'txdrop': ''}
+        fname = self.get_namespace_file(name, 'addresses')
+        if fname:
+            table = self.cache.parsed(self._path(fname), 'interfaces',
+                                      InterfaceTable.from_data)
+            for iface in table or []:
+                if iface['name'] == 'lo':
+                    continue
+                ns['interfaces'] += 1
+                ns['ipv4'] += len(iface['inet'])
+                ns['ipv6'] += len(iface['inet6'])
+        for what in ['routes', 'routes6']:
+            fname = self.get_namespace_file(name, what)
+            if not fname:
+                continue
+            routes = self.cache.parsed(self._path(fname), 'routes',
+                                       parse_routes) or []
+            for route in routes:
+                if route['table'] not in ('main', 'default'):
+                    continue
+                ns['routes'] += 1
+                if route['dest'] == 'default' and not ns['default']:
+                    ns['default'] = ' '.join(
+                        route[x] for x in ['via', 'dev'] if x in route)
+        fname = self.get_namespace_file(name, 'counters')
+        if fname:
+            table = self.cache.parsed(self._path(fname), 'netdev',
+                                      NetDevTable.from_data)
+            if table is not None:
+                for stat in ['rxerrs', 'rxdrop', 'txerrs', 'txdrop']:
+                    ns[stat] = sum(table.column(stat))
+        return ns
+
+    def get_namespaces(self):
+        """ Summarize every network namespace. The files of every
+        namespace are read in first on a pool of threads, at least
+        netns_threads of them or --jobs if that is more, so that reads
+        overlap, which is what costs on NFS. Parsing then runs one
+        namespace at a time, since the GIL would serialize it across
+        threads anyway and contending for it only slows it down. A
+        tarball is read under one lock, so it isn't read ahead. """
+        names = self.get_namespace_names()
+        paths = []
+        for name in names:
+            for what in self.netns_commands:
+                fname = self.get_namespace_file(name, what)
+                if fname:
+                    paths.append(self._path(fname))
+        jobs = max(self.options.get('jobs') or 1, self.netns_threads)
+        jobs = min(jobs, len(paths))
+        if jobs > 1 and not self.cache.is_archive:
+            # plain threads, since joining a ThreadPool on python 2 waits
+            # on its handler threads for as long as reading everything
+            # takes on local disk
+            def read(chunk):
+                for path in chunk:
+                    self.cache.read(path)
+            read = self.cache.carry_tracking(read)
+            threads = [threading.Thread(target=read, args=(paths[i::jobs],))
+                       for i in range(jobs)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        return [self.get_namespace_info(name) for name in names]
+
+    def get_routing_tables(self):
+        """ Load every routing table and the rules between them into a
+        RoutingTables, or return False if the report has no ip route
+        output """
+        tables = RoutingTables()
+        found = False
+        base = 'sos_commands/networking/'
+        for family in ['inet', 'inet6']:
+            for fname in self.route_files[family]:
+                routes = self.cache.parsed(self._path(base + fname),
+                                           'routes', parse_routes)
+                if routes is not None:
+                    tables.add_routes(routes, family)
+                    found = True
+                    break
+            for fname in self.rule_files[family]:
+                rules = self.cache.parsed(self._path(base + fname), 'rules',
+                                          parse_rules)
+                if rules is not None:
+                    tables.set_rules(rules, family)
+                    break
+        return tables if found else False
+
+    def get_route_lookups(self, addresses, source=None):
+        """ Resolve the route, and interface, each address would be sent
+        through, following the policy rules """
+        info = OrderedDict()
+        tables = self.get_routing_tables()
+        info['tables'] = tables.summary() if tables else []
+        info['lookups'] = []
+        for address in addresses:
+            lookup = {'address': address, 'route': 'none', 'type': '',
+                      'via': '', 'dev': '', 'table': '', 'rule': ''}
+            try:
+                found = tables.resolve(address, source) if tables else None
+            except ValueError:
+                # the source is from the other family
+                found = None
+            if found:
+                route = found['route']
+                lookup.update({'route': route['dest'],
+                               'type': route['type'],
+                               'via': route.get('via', ''),
+                               'dev': route.get('dev', ''),
+                               'table': found['table'],
+                               'rule': found['rule']})
+            info['lookups'].append(lookup)
+        return info
+
     def get_int_list(self, dev_filter=False):
         """ Get list of interfaces """
         dev_list = []
-        with open(self.target + 'proc/net/dev', 'r') as dfile:
-            lines = dfile.readlines()
-            # the 'Iter-' and '-face' lines from head of proc/net/dev
-            # will get captured by this. Delete them from the list
-            # There has to be a better way to do this
-            lines.pop(0)
-            lines.pop(0)
-            for line in lines:
-                index = line.find(':')
-                dev = str(line[0:index]).strip()
-                if dev_filter:
-                    if dev_filter in dev:
-                        dev_list.append(dev)
-                else:
-                    excludes = ['vnet', 'vlan', 'veth']
-                    if all(ex not in dev for ex in excludes):
-                        dev_list.append(dev)
-                    else:
-                        pass
-                        # if self.vnetDisplay:
-                        #    dev_list.append(dev)
+        excludes = ['vnet', 'vlan', 'veth']
+        for dev in self.get_netdev_table().names:
+            if dev_filter:
+                if dev_filter in dev:
+                    dev_list.append(dev)
+            elif self.options.get('vnet'):
+                dev_list.append(dev)
+            elif all(ex not in dev for ex in excludes):
+                dev_list.append(dev)
         # we don't care about these devices
-        try:
-            dev_list.remove('lo')
-            dev_list.remove(';vdsmdummy;')
-        except:
-            pass
+        for dev in ['lo', ';vdsmdummy;']:
+            if dev in dev_list:
+                dev_list.remove(dev)
         return dev_list
 
     def get_all_int_info(self):
@@ -87,7 +367,7 @@ class network(Plugin):
         if not hasattr(self, 'dev_list'):
             self.dev_list = self.get_int_list()
         for device in self.dev_list:
-            dev = {'name': device}
+            dev = dict(self.device_defaults, name=device)
             dev = self.get_int_info(dev)
             if 'bond' in device:
                 dev.update(self.get_bond_int_info(dev))
@@ -107,8 +387,8 @@ class network(Plugin):
 
     def get_ethtool_info(self, device):
         """ Get information as reported by ethtool for an interface """
-        ef = self.target + 'sos_commands/networking/ethtool_' + device['name']
-        if os.path.isfile(ef):
+        ef = 'sos_commands/networking/ethtool_' + device['name']
+        if self.file_exists(ef):
             dev_sets = self.parse_output_section(ef, 'Settings')
         else:
             return device
@@ -132,63 +412,37 @@ class network(Plugin):
 
     def get_netdev_info(self, device):
         """ Get interface stats from /proc/net/dev """
-        if os.path.isfile(self.target + 'proc/net/dev'):
-            stats = ['rxbytes', 'rxpkts', 'rxerrs', 'rxdrop', 'rxfifo',
-                     'rxframe', 'rxcomprsd', 'rxmulti', 'txbytes', 'txpkts',
-                     'txerrs', 'txdrop', 'txfifo', 'txcolls', 'txcarrier',
-                     'txcomprsd']
-            with open(self.target + 'proc/net/dev', 'r') as nfile:
-                for line in nfile.readlines():
-                    if line.split(':')[0].strip() == device['name']:
-                        line = line.split()
-                        # Depending on the OS there may or may not be a
-                        # space between the device name and the number
-                        # of bytes received.
-                        if line[0].strip(':') == device['name']:
-                            line.pop(0)
-                        else:
-                            line[0] = line[0].split(':')[1].strip()
-                            if line[0] == '':
-                                line.pop(0)
-                        line = list(map(int, line))
-                        x = 0
-                        for stat in stats:
-                            device[stat] = line[x]
-                            x += 1
-                        if device['rxbytes'] == '':
-                            device['rxbytes'] = 0
-            try:
-                device['rxgbytes'] = device['rxbytes'] / 1073741824
-                device['rxmpkts'] = str(device['rxpkts'] / 1000000) + 'm'
-                device['txgbytes'] = device['txbytes'] / 1073741824
-                device['txmpkts'] = str(device['txpkts'] / 1000000) + 'm'
-                return device
-            except Exception as e:
-                device['rxgbytes'] = '---'
-                device['rxmpkts'] = '---'
-                device['txgbytes'] = '---'
-                device['txmpkts'] = '---'
-                return device
-        else:
+        try:
+            stats = self.get_netdev_table().stats(device['name'])
+        except IOError:
+            return device
+        if stats is None:
+            device['rxgbytes'] = '---'
+            device['rxmpkts'] = '---'
+            device['txgbytes'] = '---'
+            device['txmpkts'] = '---'
             return device
+        device.update(stats)
+        device['rxgbytes'] = device['rxbytes'] // 1073741824
+        device['rxmpkts'] = str(device['rxpkts'] // 1000000) + 'm'
+        device['txgbytes'] = device['txbytes'] // 1073741824
+        device['txmpkts'] = str(device['txpkts'] // 1000000) + 'm'
+        return device
 
     def get_int_driver_info(self, device):
         """ Get driver information for an interface """
-        ef = self.target + 'sos_commands/networking/ethtool_-i_'
-        ef += device['name']
-        if os.path.isfile(ef):
-            with open(ef, 'r') as efile:
-                for line in efile:
-                    if line.startswith('driver'):
-                        device['driver'] = line.split(':')[1].strip('\n')
-                    elif line.startswith('version'):
-                        device['driverversion'] = line.split(
-                            ':')[1].strip('\n')
-                    elif line.startswith('firmware-version'):
-                        device['firmware'] = line.split(
-                            ':')[1].strip('\n')
-                    else:
-                        break
+        ef = 'sos_commands/networking/ethtool_-i_' + device['name']
+        efile = self.read_lines(ef)
+        if efile is not None:
+            for line in efile:
+                if line.startswith('driver'):
+                    device['driver'] = line.split(':')[1]
+                elif line.startswith('version'):
+                    device['driverversion'] = line.split(':')[1]
+                elif line.startswith('firmware-version'):
+                    device['firmware'] = line.split(':')[1]
+                else:
+                    break
         else:
             device['driver'] = ''
             device['driverversion'] = ''
@@ -197,31 +451,30 @@ class network(Plugin):
 
     def get_ring_info(self, device):
         """ Get ring information for an interface """
-        ef = self.target + 'sos_commands/networking/ethtool_-g_'
-        ef += device['name']
-        if os.path.isfile(ef):
+        ef = 'sos_commands/networking/ethtool_-g_' + device['name']
+        rfile = self.read_lines(ef)
+        if rfile is not None:
             if 'bond' in device['name'] or 'vnet' in device['name']:
                 for item in ['maxrx', 'maxtx', 'currentrx',
                              'currenttx']:
                     device[item] = '?'
                 return device
-            with open(ef, 'r') as rfile:
-                if 'Operation not supported' in rfile.readline():
-                    for item in ['maxrx', 'maxtx', 'currentrx',
-                                 'currenttx']:
-                        device[item] = '?'
-                    return device
-                # easiest way to parse this is by line number
-                # since it's a fixed output
-                for i, line in enumerate(rfile.readlines()):
-                    if i == 1:
-                        device['maxrx'] = line.split()[1].strip()
-                    elif i == 4:
-                        device['maxtx'] = line.split()[1].strip()
-                    elif i == 6:
-                        device['currentrx'] = line.split()[1].strip()
-                    elif i == 9:
-                        device['currenttx'] = line.split()[1].strip()
+            if not rfile or 'Operation not supported' in rfile[0]:
+                for item in ['maxrx', 'maxtx', 'currentrx',
+                             'currenttx']:
+                    device[item] = '?'
+                return device
+            # easiest way to parse this is by line number
+            # since it's a fixed output
+            for i, line in enumerate(rfile[1:]):
+                if i == 1:
+                    device['maxrx'] = line.split()[1].strip()
+                elif i == 4:
+                    device['maxtx'] = line.split()[1].strip()
+                elif i == 6:
+                    device['currentrx'] = line.split()[1].strip()
+                elif i == 9:
+                    device['currenttx'] = line.split()[1].strip()
             return device
         else:
             for item in ['maxrx', 'maxtx', 'currentrx', 'currenttx']:
@@ -235,21 +488,19 @@ class network(Plugin):
         device['hwaddr'] = ''
         device['master'] = ''
         device['mtu'] = ''
-        ef = self.target + 'etc/sysconfig/network-scripts/ifcfg-'
-        ef += device['name']
-        if os.path.isfile(ef):
-            with open(ef, 'r') as ifile:
-                for line in ifile.readlines():
-                    for i in ['IPADDR', 'HWADDR', 'MTU', 'MASTER']:
-                        if line.startswith(i):
-                            stat = line[line.find('=') + 1:len(line)].replace(
-                                '"', '').replace("'", '').strip('\n')
-                            device[i.lower()] = stat
+        ef = 'etc/sysconfig/network-scripts/ifcfg-' + device['name']
+        ifile = self.read_lines(ef)
+        if ifile is not None:
+            for line in ifile:
+                for i in ['IPADDR', 'HWADDR', 'MTU', 'MASTER']:
+                    if line.startswith(i):
+                        stat = line[line.find('=') + 1:len(line)].replace(
+                            '"', '').replace("'", '')
+                        device[i.lower()] = stat
             return device
         # if that fails, go to ifconfig -a
-        ef = self.target + 'sos_commands/networking/ifconfig_-a'
-        ef += device['name']
-        if os.path.isfile(ef):
+        ef = 'sos_commands/networking/ifconfig_-a' + device['name']
+        if self.file_exists(ef):
             dev_info = self.parse_output_section(ef, device['name'])
             try:
                 if dev_info['inet addr']:
@@ -258,20 +509,17 @@ class network(Plugin):
             except:
                 return device
         # if that fails try ip_address which may or may not be present
-        ef = self.target + 'sos_commands/networking/ip_address'
-        if os.path.isfile(ef):
-            with open(ef, 'r') as ifile:
-                for n, line in enumerate(ifile):
-                    if device['name'] in line:
-                        for i in range(3):
-                            line = next(ifile)
-                            if 'inet ' in line:
-                                ip = line[line.find('inet') + 4:
-                                          line.find('/')].strip()
-                                device['ipaddr'] = ip
-                            if 'link/ether' in line:
-                                mac = line.split()[1]
-                                device['hwaddr'] = mac
+        table = self.get_interface_table()
+        if table:
+            iface = table.get(device['name'])
+            if iface is not None:
+                device['ipaddr'] = ' '.join(table.addresses(device['name']))
+                device['ip6addr'] = ' '.join(
+                    table.addresses(device['name'], 'inet6'))
+                device['hwaddr'] = iface['hwaddr']
+                device['master'] = iface['master']
+                device['mtu'] = iface['mtu']
+                device['state'] = iface['state']
             return device
         # if we reach this point, we can't reliably determine the IP
         return device
@@ -283,49 +531,44 @@ class network(Plugin):
         bond['macaddrs'] = []
         bond['mode'] = ''
         bond['bondingopts'] = ''
-        pbf = self.target + 'proc/net/bonding/' + bond['name']
-        if os.path.isfile(pbf):
-            with open(pbf, 'r') as bfile:
-                for line in bfile.readlines():
-                    if line.startswith('Bonding Mode:'):
-                        mode = line[line.find(':') + 2:
-                                    line.find('(') - 1].strip('\n')
-                        if 'IEEE 802.3ad' in mode:
-                            mode = '802.3ad (LACP)'
-                        bond['mode'] = mode
-                    elif line.startswith('Primary Slave'):
-                        bond['primary'] = line[line.find(':') + 2:
-                                               len(line)].strip('\n')
-                    elif line.startswith('Currently Active Slave:'):
-                        bond['active'] = line[line.find(':') + 2:
-                                              len(line)].strip('\n')
-                    elif line.startswith('Slave Interface:'):
-                        slave = line[line.find(':') + 2:
-                                     len(line)].strip('\n')
-                        try:
-                            if slave == bond['active']:
-                                slave = slave + '*'
-                        except:
-                            pass
-                        bond['slaves'].append(slave)
-                    elif line.startswith('Link Failure Count:'):
-                        bond['failures'].append(line[line.find(':') + 2:
-                                                     len(line)].strip('\n'))
-                    elif line.startswith('Permanent HW addr:'):
-                        bond['macaddrs'].append(line[
-                            line.find(':') + 2:len(line)].strip('\n'))
-
-        ibf = '%setc/sysconfig/network-scripts/ifcfg-%s' % (self.target,
-                                                            bond['name']
-                                                            )
-        if os.path.isfile(ibf):
-            with open(ibf, 'r') as bfile:
-                for line in bfile.readlines():
-                    if line.startswith('BONDING_OPTS'):
-                        l = line[line.find('=') + 1:len(line)].replace(
-                                '"', '').replace("'", '').strip('\n')
-                        bond['bondingopts'] = l
-                        break
+        bfile = self.read_lines('proc/net/bonding/' + bond['name'])
+        if bfile is not None:
+            for line in bfile:
+                if line.startswith('Bonding Mode:'):
+                    mode = line[line.find(':') + 2:
+                                line.find('(') - 1].strip('\n')
+                    if 'IEEE 802.3ad' in mode:
+                        mode = '802.3ad (LACP)'
+                    bond['mode'] = mode
+                elif line.startswith('Primary Slave'):
+                    bond['primary'] = line[line.find(':') + 2:
+                                           len(line)].strip('\n')
+                elif line.startswith('Currently Active Slave:'):
+                    bond['active'] = line[line.find(':') + 2:
+                                          len(line)].strip('\n')
+                elif line.startswith('Slave Interface:'):
+                    slave = line[line.find(':') + 2:
+                                 len(line)].strip('\n')
+                    try:
+                        if slave == bond['active']:
+                            slave = slave + '*'
+                    except:
+                        pass
+                    bond['slaves'].append(slave)
+                elif line.startswith('Link Failure Count:'):
+                    bond['failures'].append(line[line.find(':') + 2:
+                                                 len(line)].strip('\n'))
+                elif line.startswith('Permanent HW addr:'):
+                    bond['macaddrs'].append(line[
+                        line.find(':') + 2:len(line)].strip('\n'))
+
+        ibf = 'etc/sysconfig/network-scripts/ifcfg-%s' % bond['name']
+        for line in self.read_lines(ibf) or []:
+            if line.startswith('BONDING_OPTS'):
+                l = line[line.find('=') + 1:len(line)].replace(
+                        '"', '').replace("'", '')
+                bond['bondingopts'] = l
+                break
 
         for attr in ['linkdetected', 'autonegotiation']:
             if not hasattr(bond, attr):
@@ -5,13 +5,15 @@ from cpu import cpu
 
 class opsys(Plugin):
 
-    def parse(self):
-        self.report_opsys()
+    def collect(self):
+        return self.get_opsys_info()
 
-    def _fmt_load_avg(self):
+    def render(self, result):
+        self.report_opsys(result)
+
+    def _fmt_load_avg(self, loads, cpus):
         '''Format get_load_avg() into string with percentages'''
-        loads = self.get_load_avg()
-        cpus = cpu(self.target, self.options).get_cpu_info()['processors']
+        loads = list(loads)
         percs = []
         for item in loads:
             index = loads.index(item)
@@ -28,10 +30,15 @@ class opsys(Plugin):
         ldavg = '[%s CPUs] %s' % (cpus, str(loads[0] + loads[1] + loads[2]))
         return ldavg
 
-    def report_opsys(self):
-        info = self.get_opsys_info()
+    def report_opsys(self, info):
         if not info:
             raise Exception
+        info = dict(info)
+        info['selinux'] = '{} ( config: {})'.format(info['selinux']['current'],
+                                                    info['selinux']['config'])
+        info['cmdline'] = textwrap.fill(info['cmdline'], 100,
+                                        subsequent_indent=' ' * 23) + '\n'
+        info['load avg'] = self._fmt_load_avg(info['load avg'], info['cpus'])
         self.pprint.bsection('OS')
         props = [
                  'Hostname',
@@ -67,14 +74,12 @@ class opsys(Plugin):
         for prop in props:
             meth = getattr(self, 'get_' + prop)
             info[prop] = meth()
-        info['selinux'] = '{} ( config: {})'.format(info['selinux']['current'],
-                                                    info['selinux']['config'])
         info['taints'] = info['taints'][0].strip()
-        info['cmdline'] = textwrap.fill(info['cmdline'], 100,
-                                        subsequent_indent=' ' * 23) + '\n'
 
         info.update(self.get_proc_stat())
         info['uptime'] = self.get_uptime()
         info['sys time'] = self.get_sos_date()
-        info['load avg'] = self._fmt_load_avg()
+        info['load avg'] = self.get_load_avg()
+        info['cpus'] = cpu(self.target, self.options).get_cpu_info()[
+                                                            'processors']
         return info
@@ -1,49 +1,80 @@
-import os
-import operator
+from collections import OrderedDict
 from pysosutils.utilities.plugin import Plugin
+from pysosutils.utilities.proctable import (ProcessTable, metric_name,
+                                            parse_filter, parse_metric)
+from pysosutils.utilities.proctree import ProcessTree
+from pysosutils.utilities.threads import ThreadSummary
 
 
 class processes(Plugin):
     '''Process information'''
 
-    def parse(self):
+    # what --group-by reports when no --agg is given
+    aggregates = ['count', 'sum:cpu', 'sum:mem', 'sum:rssmb']
+    # options that change what collect() returns
+    cache_options = ('group_by', 'agg', 'where', 'top')
+    # ps outputs that have a PPID column, in order of preference
+    tree_files = ['sos_commands/process/ps_alxwww',
+                  'sos_commands/process/ps_-elfL']
+    # ps outputs with a line per thread
+    thread_files = ['sos_commands/process/ps_-elfL',
+                    'sos_commands/process/ps_-eLf']
+
+    @property
+    def top(self):
+        '''Number of rows shown in each table'''
+        return self.options.get('top') or 5
+
+    def collect(self):
         self.ps_info = self.parse_proc_file()
-        if self.ps_info:
+        if not self.ps_info:
+            return False
+        self.get_user_totals()
+        info = OrderedDict()
+        info['total'] = self.num_procs
+        info['users'] = self.get_sorted_user_report('cpu')
+        info['defunct'] = self.get_defunct_procs()
+        info['top'] = OrderedDict()
+        for x in ['cpu', 'mem']:
+            info['top'][x] = self.get_top_by_metric(x, self.top)
+        tree = self.get_process_tree()
+        if tree:
+            info['trees'] = self.get_tree_report(tree)
+            info['blocked parents'] = self.get_blocked_parents(tree)
+        threads = self.get_thread_info()
+        if threads:
+            info['threads'] = threads
+        if self.options.get('group_by'):
+            info['groups'] = self.get_groups(self.options['group_by'],
+                                             self.options.get('agg'),
+                                             self.options.get('where'))
+        return info
+
+    def render(self, result):
+        if result:
             self.pprint.bsection('Processes')
             self.pprint.white('\tTotal Running Processes:',
-                              ' %s' % self.num_procs
+                              ' %s' % result['total']
                               )
-            self.get_user_totals()
-            self.display_top_users()
-            self.display_defunct_procs()
-            self.display_top_procs()
+            self.display_top_users(result['users'])
+            self.display_defunct_procs(result['defunct'])
+            self.display_top_procs(result['top'])
+            if 'trees' in result:
+                self.display_tree_report(result['trees'],
+                                         result['blocked parents'])
+            if 'threads' in result:
+                self.display_thread_info(result['threads'])
+            if 'groups' in result:
+                self.display_groups(result['groups'])
 
     def parse_proc_file(self):
-        '''Parse through a ps output file and return the contents as a list
-        of dicts where each dict is a process.'''
-        if os.path.isfile(
-                self.target + 'sos_commands/process/ps_auxwww'):
-            ps_info = []
-            stats = ['user', 'pid', 'cpu', 'mem', 'vsz', 'rss',
-                     'tty', 'stat', 'start', 'time']
-            with open(self.target +
-                      'sos_commands/process/ps_auxwww', 'r') as psfile:
-                next(psfile)
-                for line in psfile:
-                    proc = {}
-                    line = line.split()
-                    try:
-                        for x, stat in enumerate(stats):
-                            proc[stat] = line[x]
-                        proc['command'] = ' '.join(line[10:-1])[:100]
-                        proc['shortcmd'] = proc['command'].split()[0]
-                        proc['rssmb'] = int(proc['rss']) / 1024
-                        ps_info.append(proc)
-                    except Exception as e:
-                        pass
-            return ps_info
-        else:
+        '''Parse the ps output file into a ProcessTable, shared by every
+        plugin that asks for it. Returns False if there isn't one.'''
+        table = self.cache.parsed(self._path('sos_commands/process/ps_auxwww'),
+                                  'processes', ProcessTable.from_data)
+        if table is None:
             return False
+        return table
 
     @property
     def num_procs(self):
@@ -51,46 +82,169 @@ class processes(Plugin):
         return len(self.ps_info)
 
     def get_user_totals(self):
-        '''Returns a sorted list of top consuming users'''
-        top = []
-        users = {}
-        for proc in self.ps_info:
-            if proc['user'] in users:
-                for x in ['cpu', 'mem', 'rssmb', 'vsz']:
-                    users[proc['user']][x] += float(proc[x])
-            else:
-                new_user = {}
-                new_user['user'] = proc['user']
-                for x in ['cpu', 'mem', 'rssmb', 'vsz']:
-                    new_user[x] = float(proc[x])
-                users[proc['user']] = new_user
-
-        for user in users:
-            top.append(users[user])
-
-        self.user_report = top
+        '''Sums up the usage of each user'''
+        self.user_report = self.ps_info.group_sums('user', ['cpu', 'mem',
+                                                            'rssmb', 'vsz'])
 
     def get_defunct_procs(self):
         '''Get a list of all defunct or uninterruptible processess'''
-        defunct = []
-        for proc in self.ps_info:
-            if ('<defunct>' in proc['command'] or
-                    'D' in proc['stat'] or 'Ds' in proc['stat']):
-                defunct.append(proc)
-        return defunct
+        table = self.ps_info
+        rows = set(table.search('command', '<defunct>'))
+        rows.update(table.search('stat', 'D'))
+        return table.rows(sorted(rows))
 
     def get_sorted_user_report(self, sort_by):
         '''Get a report on usage by user sorted by a metric'''
 
         return sorted(self.user_report, reverse=True, key=lambda x: x[sort_by])
 
-    def get_top_by_metric(self, metric):
-        '''Returns a sorted list of processes by a given metric'''
-        return sorted(self.ps_info, reverse=True, key=lambda x: x[metric])
+    def get_top_by_metric(self, metric, limit=None):
+        '''Returns the processes with the highest values of a given
+        metric, highest first'''
+        return self.ps_info.rows(self.ps_info.top(metric, limit))
+
+    def get_groups(self, by, aggregates=None, filters=None):
+        '''Processes grouped by user, cmd, state or tty, with aggregates
+        such as count, sum:rssmb or p95:cpu for each group, counting only
+        the processes matching every filter, such as state=D or
+        rssmb>100. Aggregates may be given comma separated. Groups with
+        the largest first aggregate come first.'''
+        specs = []
+        for spec in aggregates or self.aggregates:
+            specs.extend(s for s in spec.split(',') if s.strip())
+        metrics = [parse_metric(spec) for spec in specs]
+        info = OrderedDict()
+        info['by'] = by
+        info['aggregates'] = [metric_name(m) for m in metrics]
+        info['where'] = list(filters or [])
+        info['groups'] = self.ps_info.aggregate(
+            by, metrics, [parse_filter(spec) for spec in info['where']],
+            self.top)
+        return info
 
-    def display_defunct_procs(self):
+    def get_process_tree(self):
+        '''Returns the ProcessTree for the first ps output with parent
+        PIDs in it, or False if the report has none'''
+        for fname in self.tree_files:
+            tree = self.cache.parsed(self._path(fname), 'tree',
+                                     ProcessTree.from_data)
+            if tree:
+                return tree
+        return False
+
+    def get_tree_report(self, tree):
+        '''Usage of each process tree started by init, or without a
+        parent, totalled over every process in the tree. Trees using the
+        most memory come first.'''
+        rollups = {}
+        for x in ['cpu', 'mem', 'rssmb']:
+            rollups[x] = tree.rollup(tree.join(self.ps_info, x))
+        tops = []
+        for root in tree.roots:
+            if tree.pids[root] == 1:
+                tops.extend(tree.children(root))
+            else:
+                tops.append(root)
+        tops.sort(key=lambda row: rollups['rssmb'][row], reverse=True)
+        report = []
+        for row in tops[:self.top]:
+            states = tree.state_counts(row)
+            entry = {'pid': tree.pids[row], 'command': tree.label(row),
+                     'procs': tree.size[row],
+                     'states': ' '.join('%s:%d' % (s, states[s])
+                                        for s in sorted(states))}
+            for x in rollups:
+                entry[x] = round(rollups[x][row], 1)
+            report.append(entry)
+        return report
+
+    def get_blocked_parents(self, tree):
+        '''The parents with the most children in uninterruptible sleep or
+        defunct, and the processes those parents were started by'''
+        blocked = {}
+        for row, state in enumerate(tree.states):
+            parent = tree.parents[row]
+            if state[:1] in ('D', 'Z') and parent >= 0:
+                blocked[parent] = blocked.get(parent, 0) + 1
+        rows = sorted(blocked, key=lambda row: (-blocked[row], row))
+        report = []
+        for row in rows[:self.top]:
+            chain = [tree.label(a) for a in tree.ancestors(row)]
+            report.append({'pid': tree.pids[row],
+                           'command': tree.label(row),
+                           'blocked': blocked[row],
+                           'ancestors': ' <- '.join(chain)})
+        return report
+
+    def get_thread_info(self):
+        '''Thread counts from the thread level ps output, read straight
+        from the file without holding on to any thread. Returns False if
+        the report has no such output.'''
+        for fname in self.thread_files:
+            psfile = self.map_file(fname)
+            if psfile is None:
+                continue
+            summary = ThreadSummary(psfile.scan_lines())
+            if not summary.threads:
+                continue
+            info = OrderedDict()
+            info['total'] = summary.threads
+            info['processes'] = summary.processes
+            info['states'] = summary.states()
+            info['top'] = summary.top_processes(self.top)
+            info['users'] = summary.top_users(self.top)
+            return info
+        return False
+
+    def display_groups(self, info):
+        '''Displays the groups from get_groups()'''
+        title = '\n\tProcesses by %s' % info['by']
+        if info['where']:
+            title += ' where %s' % ' and '.join(info['where'])
+        self.pprint.white(title + ':')
+        keys = [info['by']] + info['aggregates']
+        header = [info['by'].capitalize()]
+        header += [k.replace('_', '(', 1).upper() + ')' if '_' in k
+                   else k.capitalize() for k in info['aggregates']]
+        tbl = self.format_as_table(info['groups'], keys, header)
+        self.display_table(tbl, self.top, 'BBLUE', '\t\t ')
+
+    def display_thread_info(self, info):
+        '''Displays the thread counts from get_thread_info()'''
+        self.pprint.white('\n\tThreads:', ' %s in %s processes' % (
+                          info['total'], info['processes']))
+        self.pprint.white('\n\tThread States:')
+        tbl = self.format_as_table(info['states'], ['state', 'threads'],
+                                   ['State', 'Threads'])
+        self.display_table(tbl, color='BBLUE', indent='\t\t ')
+        self.pprint.white('\n\tProcesses with the Most Threads:')
+        keys = ['user', 'pid', 'threads', 'command']
+        header = ['User', 'PID', 'Threads', 'Command']
+        tbl = self.format_as_table(info['top'], keys, header)
+        self.display_table(tbl, self.top, 'BBLUE', '\t\t ')
+        self.pprint.white('\n\tUsers with the Most Threads:')
+        keys = ['user', 'threads', 'processes']
+        header = ['User', 'Threads', 'Processes']
+        tbl = self.format_as_table(info['users'], keys, header)
+        self.display_table(tbl, self.top, 'BBLUE', '\t\t ')
+
+    def display_tree_report(self, trees, parents):
+        '''Displays the largest process trees, and the parents of blocked
+        processes'''
+        self.pprint.white('\n\tLargest Process Trees by RSS:')
+        keys = ['command', 'procs', 'cpu', 'mem', 'rssmb', 'states']
+        header = ['Tree', 'Procs', '%CPU', '%MEM', 'RSS-MB', 'States']
+        tbl = self.format_as_table(trees, keys, header)
+        self.display_table(tbl, self.top, 'BBLUE', '\t\t ')
+        if parents:
+            self.pprint.bred('\n\tParents of Blocked and Defunct Processes:')
+            keys = ['command', 'blocked', 'ancestors']
+            header = ['Parent', 'Blocked', 'Started By']
+            tbl = self.format_as_table(parents, keys, header)
+            self.display_table(tbl, self.top, 'BBLUE', '\t\t ')
+
+    def display_defunct_procs(self, defunct):
         '''If needed, display the defunct processess'''
-        defunct = self.get_defunct_procs()
         if defunct:
             self.pprint.bred(
                 '\tUninterruptable Sleep and Defunct Processes : ')
@@ -103,25 +257,27 @@ class processes(Plugin):
             tbl = self.format_as_table(defunct,
                                        keys,
                                        header,
-                                       x,
-                                       True
+                                       'cpu',
+                                       True,
+                                       self.top
                                        )
-            self.display_table(tbl, 5, 'BBLUE', '\t\t ')
+            self.display_table(tbl, self.top, 'BBLUE', '\t\t ')
 
-    def display_top_users(self):
+    def display_top_users(self, users):
         '''Displays the top consuming users ordered by CPU usage'''
         self.pprint.white('\n\tTop Users of CPU:')
         keys = ['user', 'cpu', 'mem', 'rssmb']
         header = ['User', 'CPU', 'Memory', 'RSS(MB)']
-        tbl = self.format_as_table(self.get_sorted_user_report('cpu'),
+        tbl = self.format_as_table(users,
                                    keys,
                                    header,
                                    'cpu',
-                                   True
+                                   True,
+                                   self.top
                                    )
-        self.display_table(tbl, 5, 'BBLUE', '\t\t ')
+        self.display_table(tbl, self.top, 'BBLUE', '\t\t ')
 
-    def display_top_procs(self):
+    def display_top_procs(self, top):
         '''Displays the top processes for cpu and memory consumption'''
         for x in ['cpu', 'mem']:
             self.pprint.white('\n\tTop usage processes of %s: ' % x.upper())
@@ -131,10 +287,11 @@ class processes(Plugin):
             header = ['User', 'PID', '%CPU ', '%MEM ', 'RSS-MB', 'TTY',
                       'STAT', 'TIME', 'Command'
                       ]
-            tbl = self.format_as_table(self.get_top_by_metric(x),
+            tbl = self.format_as_table(top[x],
                                        keys,
                                        header,
                                        x,
-                                       True
+                                       True,
+                                       self.top
                                        )
-            self.display_table(tbl, 5, 'BBLUE', '\t\t ')
+            self.display_table(tbl, self.top, 'BBLUE', '\t\t ')
@@ -1,4 +1,7 @@
 import os
+import shutil
+import tempfile
+from collections import OrderedDict
 
 from processes import processes
 from pysosutils.utilities.plugin import Plugin
@@ -7,12 +10,32 @@ from pysosutils.utilities.rhevdatabase import Database
 
 class virt(Plugin):
 
-    def parse(self):
+    db_tables = ['data_centers', 'clusters', 'hypervisors', 'storage_domains']
+
+    @property
+    def persistent(self):
+        # the database dump is unpacked and read outside of the cache
+        return not self.options.get('db')
+
+    def collect(self):
         self.db = False
         self.platform = self.determine_platform()
         self.packages = self.get_virt_packages()
         self.info = self.get_platform_info()
-        self.display_platform_info()
+        info = OrderedDict()
+        info['platform'] = self.platform
+        info['packages'] = self.packages
+        info.update(self.info)
+        if self.platform == 'rhev':
+            info['is spm'] = self.is_spm
+            info['hosted engine'] = self.is_hosted_engine
+        if self.db:
+            info['db'] = OrderedDict((ent, getattr(self.db, ent))
+                                     for ent in self.db_tables)
+        return info
+
+    def render(self, result):
+        self.display_platform_info(result)
 
     def determine_platform(self):
         """Used to see what virt platform the sosreport is from"""
@@ -84,21 +107,30 @@ class virt(Plugin):
     def get_running_vms(self):
         vms = []
         procs = processes(self.target, self.options).parse_proc_file()
-        for proc in procs:
+        if not procs:
+            return vms
+        rows = procs.search('command', '/usr/libexec/qemu-kvm')
+        for proc in procs.rows(rows):
             vm = {}
-            if '/usr/libexec/qemu-kvm' in proc['command']:
-                s = proc['command']
-                vm['name'] = s[s.find('-name'):-1].split()[1].split(
-                                ',')[0].replace('guest=', '')
-                vm.update(proc)
-                vms.append(vm)
+            s = proc['command']
+            vm['name'] = s[s.find('-name'):-1].split()[1].split(
+                            ',')[0].replace('guest=', '')
+            vm.update(proc)
+            vms.append(vm)
         return vms
 
     def get_rhevm_info(self):
         if self.options['db']:
+            self.db_tmp = None
             db_file = self.find_db_file()
-            if db_file:
-                self.db = self.get_database(db_file)
+            try:
+                if db_file:
+                    self.db = self.get_database(db_file)
+            finally:
+                # Database() reads everything in as it is created, so a
+                # dump pulled out of an archive isn't needed after it
+                if self.db_tmp:
+                    shutil.rmtree(self.db_tmp, True)
 
     def get_database(self, db_file):
         ver = self.get_rpm_version('rhevm').split('-')[0].split('.', 2)[:2]
@@ -106,47 +138,60 @@ class virt(Plugin):
         return Database(db_file, simple_ver)
 
     def find_db_file(self):
+        if self.cache.archive:
+            # the database dump has to be on disk for Database() to
+            # unpack it, so pull just that member out of the archive into
+            # a temporary directory
+            dbs = self.cache.archive.find('sos_pgdump.tar')
+            if dbs:
+                self.db_tmp = tempfile.mkdtemp(prefix='pysos-')
+                return self.cache.archive.extract(dbs[0], self.db_tmp)
+            return False
+        dbs = self.cache.find('sos_pgdump.tar')
+        if dbs:
+            return self.target + dbs[0]
         for root, dirs, files in os.walk(self.target + '..'):
             for f in files:
                 if f == 'sos_pgdump.tar':
                     return os.path.join(root, f)
         return False
 
-    def display_rhev_hyper_info(self):
-        self.pprint.white('\n\t{:20s} : '.format('Is SPM'), '%s' % self.is_spm)
+    def display_rhev_hyper_info(self, info):
+        self.pprint.white('\n\t{:20s} : '.format('Is SPM'),
+                          '%s' % info['is spm'])
         self.pprint.white('\t{:20s} : '.format('Hosted Engine'), '%s' % (
-                            self.is_hosted_engine)
+                            info['hosted engine'])
                           )
 
-    def display_platform_info(self):
-        if not hasattr(self, 'info'):
-            self.info = self.get_platform_info()
+    def display_platform_info(self, info=None):
+        if info is None:
+            info = self.collect()
 
         self.pprint.bsection('Virtualization Information\n')
-        self.print_header_values(self.info, headers=['kernel', 'release'])
+        self.print_header_values(info, headers=['kernel', 'release'])
 
         keys = ['name', 'version']
         header = ['Name', 'Version']
-        tbl = self.format_as_table(self.packages, keys, header, 'name')
+        tbl = self.format_as_table(info['packages'], keys, header, 'name')
         self.pprint.bheader('\n\t{:20s} : '.format('Packages'))
         self.display_table(tbl, color='BHEADER', indent='\t\t\t\t',
                            no_header=True
                            )
 
-        if self.platform == 'rhev':
-            self.display_rhev_hyper_info()
+        if info['platform'] == 'rhev':
+            self.display_rhev_hyper_info(info)
 
-        if 'vms' in self.info:
+        if 'vms' in info:
             self.pprint.bheader('\n\tRunning VMs : \n')
             keys = ['name', 'rssmb', 'cpu']
             header = ['Name', 'Memory (MB)', 'CPU (%)']
-            tbl = self.format_as_table(self.info['vms'], keys, header, 'name')
+            tbl = self.format_as_table(info['vms'], keys, header, 'name')
             self.display_table(tbl, color='WHITE', indent='\t\t\t\t')
 
-        if self.options['db'] and self.db:
-            self.display_db_info()
+        if self.options['db'] and info.get('db'):
+            self.display_db_info(info['db'])
 
-    def display_db_info(self):
+    def display_db_info(self, db):
         self.data_centers_keys = ['name', 'status', 'compat', 'spm']
         self.data_centers_header = ['Name', 'Status', 'Compat', 'SPM']
 
@@ -165,14 +210,13 @@ class virt(Plugin):
         self.storage_domains_keys = ['name', 'storage_type', 'domain_type']
         self.storage_domains_header = ['Name', 'Storage Type', 'Domain Type']
 
-        for ent in ['data_centers', 'clusters', 'hypervisors',
-                    'storage_domains']:
+        for ent in self.db_tables:
             self.pprint.bheader('\t{} Report'.format(
                                 ent.replace('_', ' ').title())
                                 )
             keys = getattr(self, ent + '_keys')
             header = getattr(self, ent + '_header')
-            t = getattr(self.db, ent)
+            t = db[ent]
             tbl = self.format_as_table(t, keys, header, 'name')
             self.display_table(tbl, color='BBLUE', indent='\t\t')
             print ''
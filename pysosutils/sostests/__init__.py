@@ -0,0 +1,13 @@
+'''Registry of the test modules run by pysos -t. Like plugins, each one
+holds a class with the same name as its module.'''
+
+TESTS = dict((name, '%s.%s' % (__name__, name)) for name in [
+    'dockertests',
+    'sharedtests',
+])
+
+
+def get_test_class(name):
+    '''Import and return the class for a registered test module'''
+    module = __import__(TESTS[name], fromlist=[name])
+    return getattr(module, name)
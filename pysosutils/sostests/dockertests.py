@@ -9,14 +9,12 @@ class dockertests(SosTests, Plugin):
     enabled_for = ('containers',)
 
     def run_storage_driver(self):
-        try:
-            with open(self.target + 'sos_commands/docker/docker_info') as s:
-                if 'loopback' in s.readlines():
-                    self.warn('Loopback storage in use. Should use LVM')
-                else:
-                    self.succeed()
-        except IOError:
-            pass
+        info = self.read_lines('sos_commands/docker/docker_info')
+        if info is not None:
+            if 'loopback' in info:
+                self.warn('Loopback storage in use. Should use LVM')
+            else:
+                self.succeed()
 
     def run_package_version(self, run_if_failed=True):
         rpms = self.get_rpm('docker', match_all=True)
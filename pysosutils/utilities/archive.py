@@ -0,0 +1,214 @@
+import os
+import posixpath
+import shutil
+import tempfile
+import threading
+
+try:
+    import lzma
+except ImportError:
+    try:
+        from backports import lzma
+    except ImportError:
+        lzma = None
+
+ARCHIVE_EXTS = ('.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz',
+                '.txz')
+# what compressed tarballs start with
+MAGIC = (('\x1f\x8b', 'gzip'), ('BZh', 'bz2'), ('\xfd7zXZ\x00', 'xz'))
+
+
+class ArchiveError(IOError):
+    '''A sosreport tarball that can't be read'''
+
+
+def is_archive(path):
+    '''Returns True if path is a sosreport tarball rather than an
+    extracted sosreport directory'''
+    if not os.path.isfile(path):
+        return False
+    if path.endswith(ARCHIVE_EXTS):
+        return True
+    # imported here so that directory reports don't pay for it
+    import tarfile
+    return tarfile.is_tarfile(path)
+
+
+def report_name(target):
+    '''target as it is shown, without the trailing / that targets are
+    given when it is a tarball'''
+    path = target.rstrip('/')
+    return path if is_archive(path) else target
+
+
+class ArchiveReport():
+    '''A sosreport tarball read in place, without extracting it.
+
+    The member list is read in a single pass when the archive is opened
+    and indexed by path relative to the sosreport root, with symlinks
+    resolved inside the archive.
+
+    A compressed stream can only be read forwards, so reading members out
+    of order would decompress from the start again for each one, and the
+    work would grow with the square of the members read. Instead a
+    compressed tarball is decompressed once, in the same pass that lists
+    it, into an anonymous temporary file, and members are read from that
+    in any order. That takes as much disk as the uncompressed tarball,
+    but nothing is left behind, even if pysos is killed.
+    '''
+
+    def __init__(self, path):
+        import tarfile
+        self.path = path
+        self.root = ''
+        self.members = {}
+        self._lock = threading.Lock()
+        self._resolved = {}
+        self._spool = None
+        try:
+            self.tar = self._open(path)
+            self._index()
+        except tarfile.TarError as e:
+            raise ArchiveError(str(e))
+
+    def _decompressor(self, path):
+        '''A file object of the uncompressed tarball for a compressed
+        one, or None if path isn't compressed'''
+        import tarfile
+        with open(path, 'rb') as f:
+            head = f.read(6)
+        for magic, kind in MAGIC:
+            if head.startswith(magic):
+                break
+        else:
+            return None
+        if kind == 'gzip':
+            import gzip
+            return gzip.GzipFile(path, 'rb')
+        if kind == 'bz2':
+            import bz2
+            return bz2.BZ2File(path, 'rb')
+        # python 2 can only read xz through the backport
+        if lzma is None:
+            raise tarfile.ReadError('reading xz compressed sosreports on '
+                                    'python 2 requires the lzma backport, '
+                                    'install backports.lzma')
+        return lzma.LZMAFile(path)
+
+    def _open(self, path):
+        import tarfile
+        stream = self._decompressor(path)
+        if stream is None:
+            return tarfile.open(path, mode='r:')
+        self._spool = tempfile.TemporaryFile(prefix='pysos-')
+        try:
+            shutil.copyfileobj(stream, self._spool, 1024 * 1024)
+        except Exception as e:
+            self._spool.close()
+            raise tarfile.ReadError('unable to decompress: %s' % e)
+        finally:
+            stream.close()
+        self._spool.seek(0)
+        return tarfile.open(fileobj=self._spool, mode='r:')
+
+    def _index(self):
+        names = {}
+        for member in self.tar:
+            name = member.name
+            while name.startswith('./'):
+                name = name[2:]
+            names[name.rstrip('/')] = member
+        tops = set(name.split('/', 1)[0] for name in names)
+        if len(tops) == 1:
+            top = tops.pop()
+            if top not in names or names[top].isdir():
+                self.root = top + '/'
+        for name, member in names.items():
+            if name.startswith(self.root):
+                self.members[name[len(self.root):]] = member
+
+    def _strip_root(self, name):
+        while name.startswith('./'):
+            name = name[2:]
+        if name.startswith(self.root):
+            return name[len(self.root):]
+        return None
+
+    def _resolve(self, rel, depth=0):
+        '''Follow symlinks and hardlinks, including ones on parent
+        directories, and return the member that rel refers to'''
+        if depth > 20 or rel is None:
+            return None
+        parts = rel.split('/')
+        for i in range(1, len(parts) + 1):
+            sub = '/'.join(parts[:i])
+            member = self.members.get(sub)
+            if member is None:
+                continue
+            if member.issym():
+                if member.linkname.startswith('/'):
+                    # points outside of the sosreport
+                    return None
+                dest = posixpath.normpath(posixpath.join(
+                    posixpath.dirname(sub), member.linkname))
+                if dest.startswith('..'):
+                    return None
+                return self._resolve('/'.join([dest] + parts[i:]),
+                                     depth + 1)
+            if member.islnk() and i == len(parts):
+                return self._resolve(self._strip_root(member.linkname),
+                                     depth + 1)
+        return self.members.get(rel)
+
+    def member(self, rel):
+        '''Returns the TarInfo for rel after resolving links, or None'''
+        rel = posixpath.normpath(rel.lstrip('/'))
+        if rel not in self._resolved:
+            self._resolved[rel] = self._resolve(rel)
+        return self._resolved[rel]
+
+    def exists(self, rel):
+        member = self.member(rel)
+        return member is not None and member.isfile()
+
+    def isdir(self, rel):
+        member = self.member(rel)
+        if member is not None:
+            return member.isdir()
+        # directories don't always have their own entry in a tarball
+        prefix = posixpath.normpath(rel.lstrip('/')) + '/'
+        return any(name.startswith(prefix) for name in self.members)
+
+    def read(self, rel):
+        '''Returns the contents of a member, or None if it isn't a
+        regular file in the archive'''
+        member = self.member(rel)
+        if member is None or not member.isfile():
+            return None
+        # the underlying file is shared, so only one
+        # member can be read at a time
+        with self._lock:
+            data = self.tar.extractfile(member).read()
+        if not isinstance(data, str):
+            data = data.decode('utf-8', 'replace')
+        return data
+
+    def find(self, basename):
+        '''Returns the paths of all members with the given file name'''
+        return sorted(rel for rel in self.members
+                      if posixpath.basename(rel) == basename)
+
+    def extract(self, rel, dest):
+        '''Writes a single member out to dest and returns its path'''
+        member = self.member(rel)
+        path = os.path.join(dest, posixpath.basename(rel))
+        with self._lock:
+            src = self.tar.extractfile(member)
+            with open(path, 'wb') as out:
+                out.write(src.read())
+        return path
+
+    def close(self):
+        self.tar.close()
+        if self._spool is not None:
+            self._spool.close()
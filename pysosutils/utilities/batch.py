@@ -0,0 +1,205 @@
+import signal
+import sys
+import time
+from collections import OrderedDict
+from functools import partial
+
+from pysosutils.utilities.archive import report_name
+from pysosutils.utilities.cache import get_cache, drop_cache
+from pysosutils.utilities.color import Colors
+from pysosutils.utilities.profile import enable_profiler, render_profile
+from pysosutils.utilities.result import ResultWriter, plugin_record, to_json
+from pysosutils.utilities.runner import (ThreadOutput, load_plugins,
+                                         run_plugins)
+from pysosutils.utilities.sostests import SosChecker
+from pysosutils.utilities.store import get_store
+
+
+def missing_report(pattern):
+    '''The report of analyze_report() for a pattern that didn't match
+    any sosreport'''
+    report = OrderedDict()
+    report['target'] = pattern
+    report['ok'] = False
+    report['error'] = 'No sosreport found'
+    report['failed'] = []
+    report['tests'] = None
+    report['output'] = ''
+    report['records'] = []
+    report['seconds'] = 0.0
+    return report
+
+
+def _init_worker():
+    # let the parent handle ctrl-c and terminate the pool
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def analyze_report(target, args):
+    '''Run the enabled plugins, and tests if asked for, against a single
+    report and return what happened as a dict. Runs in a pool worker, so
+    everything it returns has to be picklable.'''
+    start = time.time()
+    structured = args['format'] != 'text'
+    report = OrderedDict()
+    report['target'] = report_name(target)
+    report['ok'] = True
+    report['error'] = None
+    report['failed'] = []
+    report['tests'] = None
+    report['output'] = ''
+    report['records'] = []
+    output = ThreadOutput(sys.stdout)
+    sys.stdout = output
+    output.start()
+    try:
+        cache = get_cache(target)
+        if get_store() is None:
+            cache.open()
+        profiler = enable_profiler() if args['profile'] else None
+        plugins = load_plugins(target, args)
+        writer = ResultWriter('json', target) if structured else None
+        run_plugins(plugins, args['jobs'], writer)
+        report['failed'] = [p.__class__.__name__ for p in plugins
+                            if p.parse_failed]
+        if args['tests']:
+            t = SosChecker(target, args)
+            if structured:
+                t.result = t.collect()
+                writer.add(plugin_record('tests', target, t.result))
+            else:
+                t.run_all_tests()
+            report['tests'] = dict((k, len(v)) for k, v in t.result.items())
+        if profiler:
+            if structured:
+                writer.add(plugin_record('profile', target,
+                                         profiler.records))
+            else:
+                render_profile(profiler.records)
+        if writer:
+            report['records'] = writer.records
+    except IOError as e:
+        report['ok'] = False
+        report['error'] = 'Unable to read sosreport: %s' % e
+    except Exception as e:
+        report['ok'] = False
+        report['error'] = str(e) or e.__class__.__name__
+    finally:
+        report['output'] = output.finish()
+        sys.stdout = output.stream
+        # workers go on to other reports, don't keep this one in memory
+        drop_cache(target)
+    report['seconds'] = round(time.time() - start, 2)
+    return report
+
+
+class BatchSummary():
+    '''Running totals over every report in a batch'''
+
+    def __init__(self):
+        self.start = time.time()
+        self.reports = []
+
+    def add(self, report):
+        entry = OrderedDict()
+        for key in ['target', 'ok', 'error', 'failed', 'tests', 'seconds']:
+            entry[key] = report[key]
+        self.reports.append(entry)
+
+    def to_dict(self):
+        summary = OrderedDict()
+        summary['reports'] = len(self.reports)
+        summary['unreadable'] = len([r for r in self.reports if not r['ok']])
+        failures = {}
+        for r in self.reports:
+            for plugin in r['failed']:
+                failures[plugin] = failures.get(plugin, 0) + 1
+        summary['plugin failures'] = failures
+        for result in ['warned', 'failed']:
+            summary['tests %s' % result] = sum(
+                (r['tests'] or {}).get(result, 0) for r in self.reports)
+        summary['seconds'] = round(time.time() - self.start, 2)
+        summary['details'] = sorted(self.reports, key=lambda r: r['target'])
+        return summary
+
+    def render(self):
+        pprint = Colors()
+        summary = self.to_dict()
+        pprint.bsection('\nBatch Summary')
+        pprint.bheader('\t{:20s} : '.format('Reports'), str(summary['reports']))
+        pprint.bheader('\t{:20s} : '.format('Unreadable'),
+                       str(summary['unreadable']))
+        pprint.bheader('\t{:20s} : '.format('Total Time'),
+                       '%.2fs' % summary['seconds'])
+        line = '\t\t{:<50s} {:>8s} {:>7s} {:>7s}  {}'
+        pprint.white(line.format('Report', 'Time', 'Warned', 'Failed',
+                                 'Errors'))
+        for r in summary['details']:
+            tests = r['tests'] or {}
+            errors = r['error'] or ', '.join(r['failed'])
+            print line.format(r['target'][-50:], '%.2fs' % r['seconds'],
+                              str(tests.get('warned', '-')),
+                              str(tests.get('failed', '-')), errors)
+
+
+def run_batch(targets, args, workers=None, stream=None, missing=()):
+    '''Analyze many reports on a pool of worker processes, writing each
+    report out as soon as it finishes and a summary of all of them once
+    every report is done. Patterns in missing, which matched nothing,
+    are counted as unreadable reports.
+
+    Each worker imports the plugins once and then handles as many reports
+    as it is given, so the per-report cost is just the analysis itself.
+    '''
+    # imported here so that single report runs don't pay for it
+    import multiprocessing
+    stream = stream or sys.stdout
+    fmt = args['format']
+    workers = workers or multiprocessing.cpu_count()
+    workers = max(1, min(workers, len(targets)))
+    summary = BatchSummary()
+
+    def emit(report):
+        summary.add(report)
+        if fmt == 'text':
+            Colors().bsection('\n%s' % ('=' * 80))
+            Colors().bsection(report['target'])
+            stream.write(report['output'])
+            if not report['ok']:
+                Colors().bred(report['error'])
+        else:
+            if report['output']:
+                sys.stderr.write(report['output'])
+            if fmt == 'ndjson':
+                for r in report['records']:
+                    stream.write(to_json(r) + '\n')
+                if not report['ok']:
+                    stream.write(to_json(plugin_record(
+                        None, report['target'], failed=True,
+                        error=report['error'])) + '\n')
+            else:
+                summary.reports[-1]['results'] = report['records']
+        stream.flush()
+
+    for pattern in missing:
+        emit(missing_report(pattern))
+    pool = multiprocessing.Pool(workers, _init_worker)
+    try:
+        for report in pool.imap_unordered(partial(analyze_report, args=args),
+                                          targets):
+            emit(report)
+        pool.close()
+    except KeyboardInterrupt:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+
+    if fmt == 'text':
+        summary.render()
+    elif fmt == 'ndjson':
+        stream.write(to_json({'summary': summary.to_dict()}) + '\n')
+    else:
+        stream.write(to_json(summary.to_dict(), indent=2) + '\n')
+    stream.flush()
+    return summary
@@ -0,0 +1,339 @@
+import os
+import threading
+from collections import OrderedDict
+
+from pysosutils.utilities.archive import ArchiveReport, is_archive
+from pysosutils.utilities.mapped import MappedFile
+from pysosutils.utilities.snapshot import TreeSnapshot
+
+# Default memory budget for cached file contents, in bytes
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Sizing a parsed object properly means walking it, so each parsed form
+# is charged this many times the size of the file it came from instead.
+# Lists and dicts of python strings rarely take less than that.
+PARSED_WEIGHT = 2
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(target):
+    '''Return the FileCache shared by everything run against target,
+    creating it on first use.'''
+    with _caches_lock:
+        if target not in _caches:
+            _caches[target] = FileCache(target)
+        return _caches[target]
+
+
+def drop_cache(target):
+    '''Forget the cache for target, releasing everything it holds'''
+    with _caches_lock:
+        cache = _caches.pop(target, None)
+    if cache is not None:
+        cache.close()
+
+
+class FileCache():
+    '''Per-report cache of sosreport file contents and their parsed forms.
+
+    Each file is read at most once while it stays cached. Entries are
+    kept in least-recently-used order and evicted once their combined
+    size goes over max_bytes. Parsed forms live in the same entry as the
+    file they came from, so they are dropped with it, and each one adds
+    an estimated PARSED_WEIGHT times the file's size to the entry's.
+    Files that do not exist are cached as well, since on remote storage
+    a failed open costs as much as a successful one.
+
+    If target is a sosreport tarball rather than a directory, files are
+    read from the archive instead of the filesystem. The archive is only
+    opened and indexed once something needs to be read from it.
+
+    Existence, size and glob queries are answered from a TreeSnapshot
+    of the whole report, taken the first time one is asked, rather than
+    by probing the filesystem for each path.
+
+    Every path looked up by a thread between track() and tracked() is
+    recorded, along with every glob and find and what it matched, so
+    callers can tell which files a result was built from. Work handed to
+    other threads is recorded too when it is wrapped with carry_tracking().
+    '''
+
+    def __init__(self, target, max_bytes=DEFAULT_MAX_BYTES):
+        self.target = target
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # files actually opened, and the bytes read or mapped from them
+        self.opened = 0
+        self.bytes_read = 0
+        self._entries = OrderedDict()
+        self._mapped = {}
+        self._lock = threading.RLock()
+        self._tracking = threading.local()
+        self._archive = None
+        self._snapshot = None
+        self.is_archive = is_archive(target.rstrip('/'))
+
+    @property
+    def archive(self):
+        '''The ArchiveReport for a tarball target, or None'''
+        if self.is_archive and self._archive is None:
+            with self._lock:
+                if self._archive is None:
+                    self._archive = ArchiveReport(self.target.rstrip('/'))
+        return self._archive
+
+    @property
+    def snapshot(self):
+        '''The TreeSnapshot of the report, taken on first use'''
+        if self._snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    if self.archive:
+                        self._snapshot = TreeSnapshot.from_archive(
+                            self.archive)
+                    else:
+                        self._snapshot = TreeSnapshot.from_directory(
+                            self.target)
+        return self._snapshot
+
+    def _known(self, rel):
+        '''True if the snapshot can say whether rel exists'''
+        return rel is not None and self.snapshot.known(rel)
+
+    def open(self):
+        '''Open and index a tarball target now rather than on first read,
+        so that an unreadable one is reported before anything runs'''
+        return self.archive
+
+    def track(self):
+        '''Start recording the paths looked up by the calling thread'''
+        self._tracking.paths = set()
+        self._tracking.queries = {}
+
+    def tracked(self):
+        '''Stop recording for the calling thread and return the paths
+        looked up since track(), and a dict of the glob and find queries
+        made, as (method, argument), to what each returned'''
+        paths = getattr(self._tracking, 'paths', None) or set()
+        queries = getattr(self._tracking, 'queries', None) or {}
+        self._tracking.paths = None
+        self._tracking.queries = None
+        return paths, queries
+
+    def carry_tracking(self, func):
+        '''Wrap func so that what it looks up when called on another
+        thread, such as a ThreadPool worker, is recorded for the calling
+        thread as well'''
+        paths = getattr(self._tracking, 'paths', None)
+        queries = getattr(self._tracking, 'queries', None)
+        if paths is None:
+            return func
+
+        def call(*args, **kwargs):
+            self._tracking.paths = paths
+            self._tracking.queries = queries
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._tracking.paths = None
+                self._tracking.queries = None
+        return call
+
+    def _note(self, path):
+        paths = getattr(self._tracking, 'paths', None)
+        if paths is not None:
+            paths.add(path)
+
+    def _note_query(self, method, arg, found):
+        queries = getattr(self._tracking, 'queries', None)
+        if queries is not None:
+            queries[(method, arg)] = found
+
+    def _relpath(self, path):
+        if path.startswith(self.target):
+            return path[len(self.target):]
+        return None
+
+    def _load(self, path):
+        if self._snapshot is not None:
+            # don't open what the snapshot already knows isn't there
+            rel = self._relpath(path)
+            if self._known(rel) and not self._snapshot.exists(rel):
+                return None
+        if self.archive:
+            rel = self._relpath(path)
+            if rel is None:
+                return None
+            return self.archive.read(rel)
+        try:
+            with open(path, 'r') as f:
+                return f.read()
+        except IOError:
+            return None
+
+    def _entry(self, path):
+        '''Return the cache entry for path, reading the file on a miss'''
+        self._note(path)
+        with self._lock:
+            entry = self._entries.pop(path, None)
+            if entry is not None:
+                self.hits += 1
+                self._entries[path] = entry
+                return entry
+            self.misses += 1
+        # read outside of the lock so slow storage doesn't serialize
+        # concurrent readers of unrelated files
+        data = self._load(path)
+        with self._lock:
+            if data is not None:
+                self.opened += 1
+                self.bytes_read += len(data)
+            entry = self._entries.pop(path, None)
+            if entry is None:
+                entry = {'data': data, 'parsed': {},
+                         'size': len(data) if data is not None else 0}
+                self.size += entry['size']
+            self._entries[path] = entry
+            self._evict()
+            return entry
+
+    def _evict(self):
+        # never evict the most recently added entry, even if it alone
+        # is larger than the budget
+        while self.size > self.max_bytes and len(self._entries) > 1:
+            path, entry = self._entries.popitem(last=False)
+            self.size -= entry['size']
+            self.evictions += 1
+
+    def exists(self, path):
+        '''Returns True if path is a regular file in the report'''
+        self._note(path)
+        with self._lock:
+            entry = self._entries.get(path)
+        if entry is not None:
+            return entry['data'] is not None
+        rel = self._relpath(path)
+        if self._known(rel):
+            return self.snapshot.exists(rel)
+        if self.archive:
+            return rel is not None and self.archive.exists(rel)
+        return os.path.isfile(path)
+
+    def file_size(self, path):
+        '''Returns the size of path in bytes, or None if it isn't a
+        regular file in the report'''
+        self._note(path)
+        rel = self._relpath(path)
+        if self._known(rel):
+            return self.snapshot.size(rel)
+        try:
+            return os.path.getsize(path) if os.path.isfile(path) else None
+        except OSError:
+            return None
+
+    def glob(self, pattern):
+        '''Returns the paths, relative to the report root, of the files
+        matching a shell pattern such as sos_commands/networking/ethtool_*'''
+        found = self.snapshot.glob(pattern)
+        self._note_query('glob', pattern, found)
+        return found
+
+    def find(self, basename):
+        '''Returns the paths, relative to the report root, of every file
+        with the given name'''
+        found = self.snapshot.find(basename)
+        self._note_query('find', basename, found)
+        return found
+
+    def read(self, path):
+        '''Return the full contents of path, or None if it can't be read'''
+        return self._entry(path)['data']
+
+    def mapped(self, path):
+        '''Return a MappedFile for path, or None if it can't be read.
+
+        Files from a directory are memory-mapped rather than read in,
+        and don't count against max_bytes. Files that are already cached,
+        and members of an archive, are served from memory instead.
+        '''
+        self._note(path)
+        with self._lock:
+            if path in self._mapped:
+                self.hits += 1
+                return self._mapped[path]
+            entry = self._entries.get(path)
+        if entry is not None or self.archive:
+            data = self.read(path)
+            if data is None:
+                return None
+            mapped = MappedFile(path, data=data)
+        else:
+            with self._lock:
+                self.misses += 1
+            try:
+                mapped = MappedFile(path)
+            except (IOError, OSError):
+                return None
+            with self._lock:
+                self.opened += 1
+                self.bytes_read += mapped.size
+        with self._lock:
+            return self._mapped.setdefault(path, mapped)
+
+    def parsed(self, path, kind, parser):
+        '''Return the parsed form of path identified by kind.
+
+        parser is called with the file contents the first time a given
+        kind is requested and its return value is cached. None is
+        returned without calling parser if the file can't be read.
+        '''
+        entry = self._entry(path)
+        if entry['data'] is None:
+            return None
+        try:
+            return entry['parsed'][kind]
+        except KeyError:
+            value = parser(entry['data'])
+        with self._lock:
+            if kind not in entry['parsed']:
+                entry['parsed'][kind] = value
+                charge = PARSED_WEIGHT * len(entry['data'])
+                entry['size'] += charge
+                # an entry evicted while parsing is no longer counted
+                if self._entries.get(path) is entry:
+                    self.size += charge
+                    self._evict()
+            return entry['parsed'][kind]
+
+    def lines(self, path):
+        '''Return the contents of path as a list of lines, without
+        line endings, or None if it can't be read'''
+        return self.parsed(path, 'lines', lambda data: data.splitlines())
+
+    def close(self):
+        '''Release mapped files and any open archive'''
+        with self._lock:
+            for mapped in self._mapped.values():
+                mapped.close()
+            self._mapped = {}
+            if self._archive:
+                self._archive.close()
+
+    def stats(self):
+        '''Return the hit/miss counters and current usage'''
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'opened': self.opened,
+            'bytes_read': self.bytes_read,
+            'files': len(self._entries),
+            'mapped': len(self._mapped),
+            'bytes': self.size,
+            'max_bytes': self.max_bytes
+            }
@@ -1,39 +1,64 @@
+import sys
+
+CODES = {}
+CODES['BOLD'] = '\033[1m'
+CODES['HEADER'] = '\033[95m'
+CODES['BHEADER'] = CODES['HEADER'] + CODES['BOLD']
+CODES['BLUE'] = '\033[94m'
+CODES['BBLUE'] = CODES['BLUE'] + CODES['BOLD']
+CODES['GREEN'] = '\033[92m'
+CODES['BGREEN'] = CODES['GREEN'] + CODES['BOLD']
+CODES['SECTION'] = '\033[93m'
+CODES['BSECTION'] = CODES['SECTION'] + CODES['BOLD']
+CODES['RED'] = '\033[91m'
+CODES['BRED'] = CODES['RED'] + CODES['BOLD']
+CODES['ENDC'] = '\033[0m'
+CODES['WHITE'] = '\033[1;37m'
+CODES['GREY'] = '\033[37m'
+CODES['WARN'] = '\033[33m'
+CODES['PURPLE'] = '\033[35m'
+CODES['BPURPLE'] = CODES['PURPLE'] + CODES['BOLD']
+CODES['CYAN'] = '\033[36m'
+CODES['DBLUE'] = '\033[34m'
+
+_colors = CODES
+
+
+def set_color(enabled):
+    '''Turn escape codes on or off for every Colors created afterwards.
+    With them off each color is an empty string.'''
+    global _colors
+    _colors = CODES if enabled else dict.fromkeys(CODES, '')
+
+
 class Colors:
 
     def __init__(self):
-        self.colors = {}
-        self.colors['BOLD'] = '\033[1m'
-        self.colors['HEADER'] = '\033[95m'
-        self.colors['BHEADER'] = self.colors['HEADER'] + self.colors['BOLD']
-        self.colors['BLUE'] = '\033[94m'
-        self.colors['BBLUE'] = self.colors['BLUE'] + self.colors['BOLD']
-        self.colors['GREEN'] = '\033[92m'
-        self.colors['BGREEN'] = self.colors['GREEN'] + self.colors['BOLD']
-        self.colors['SECTION'] = '\033[93m'
-        self.colors['BSECTION'] = self.colors['SECTION'] + self.colors['BOLD']
-        self.colors['RED'] = '\033[91m'
-        self.colors['BRED'] = self.colors['RED'] + self.colors['BOLD']
-        self.colors['ENDC'] = '\033[0m'
-        self.colors['WHITE'] = '\033[1;37m'
-        self.colors['GREY'] = '\033[37m'
-        self.colors['WARN'] = '\033[33m'
-        self.colors['PURPLE'] = '\033[35m'
-        self.colors['BPURPLE'] = self.colors['PURPLE'] + self.colors['BOLD']
-        self.colors['CYAN'] = '\033[36m'
-        self.colors['DBLUE'] = '\033[34m'
-        for k, v in self.colors.items():
-            self.__dict__[k] = v
+        # shared between every instance, don't modify it
+        self.colors = _colors
+        self.__dict__.update(_colors)
 
     def fmt(self, color, text):
         return color + text[0] + self.colors['ENDC'] + ' ' + ' '.join(text[1:])
 
+    def write(self, color, args):
+        if args:
+            sys.stdout.write(self.fmt(color, args) + '\n')
+
     def __getattr__(self, name):
-        def trapit(*args):
-            if name.upper() not in list(self.colors.keys()):
-                color = 'endc'
-            else:
-                color = name
-            if not args:
-                return
-            print self.fmt(self.colors[color.upper()], args)
-        return trapit
+        if name.startswith('__'):
+            raise AttributeError(name)
+        # anything that isn't a color is printed without one
+        color = self.colors.get(name.upper(), self.colors['ENDC'])
+        return lambda *args: self.write(color, args)
+
+
+def _printer(name):
+    def printer(self, *args):
+        self.write(self.colors[name], args)
+    printer.__name__ = name.lower()
+    return printer
+
+
+for _name in CODES:
+    setattr(Colors, _name.lower(), _printer(_name))
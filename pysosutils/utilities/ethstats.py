@@ -0,0 +1,184 @@
+import heapq
+import re
+from array import array
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# kinds of counter worth looking at, and the words that mark a counter
+# name as one of them. Whole words are matched, so tx_deferred isn't an
+# error counter.
+KINDS = (('drops', ('drop', 'drops', 'dropped', 'miss', 'missed')),
+         ('errors', ('err', 'errs', 'error', 'errors', 'crc')),
+         ('discards', ('discard', 'discards', 'discarded')))
+
+# counter names are words joined by _, and sometimes . or -
+_WORDS = re.compile(r'[^a-z0-9]+')
+
+
+def counter_kind(name):
+    '''The kind from KINDS of an ethtool -S counter name, or None'''
+    words = set(_WORDS.split(name.lower()))
+    for kind, names in KINDS:
+        if words.intersection(names):
+            return kind
+    return None
+
+
+def parse_stats(data):
+    '''(counter, value) pairs from ethtool -S output'''
+    stats = []
+    for line in data.splitlines():
+        name, sep, value = line.rpartition(':')
+        if not sep:
+            continue
+        try:
+            stats.append((name.strip(), int(value)))
+        except ValueError:
+            continue
+    return stats
+
+
+class EthtoolMatrix():
+    '''ethtool -S counters of every interface as one interface by counter
+    matrix.
+
+    The matrix is a single array of integers, a row per interface and a
+    column for every counter name seen on any interface, with 0 where an
+    interface doesn't have a counter. Each counter is sorted into one of
+    KINDS by its name once, and totals per interface and the largest
+    counters of a kind are worked out over whole rows and columns, with
+    numpy when it is installed.
+    '''
+
+    def __init__(self, stats=()):
+        '''stats is (interface, [(counter, value), ...]) pairs'''
+        self.interfaces = []
+        self.counters = []
+        # counters read from the interfaces, not counting the 0s the
+        # matrix is padded with
+        self.parsed = 0
+        self._rows = {}
+        self._columns = {}
+        cells = []
+        for iface, pairs in stats:
+            row = []
+            for name, value in pairs:
+                col = self._columns.get(name)
+                if col is None:
+                    col = self._columns[name] = len(self.counters)
+                    self.counters.append(name)
+                row.append((col, value))
+            self.parsed += len(row)
+            self._rows[iface] = len(self.interfaces)
+            self.interfaces.append(iface)
+            cells.append(row)
+        width = len(self.counters)
+        self.values = array('l', [0]) * (width * len(self.interfaces))
+        for idx, row in enumerate(cells):
+            base = idx * width
+            for col, value in row:
+                self.values[base + col] = value
+        self.kinds = dict((kind, [col for col, name in
+                                  enumerate(self.counters)
+                                  if counter_kind(name) == kind])
+                          for kind, words in KINDS)
+
+    def __len__(self):
+        return len(self.interfaces)
+
+    @property
+    def size(self):
+        '''Number of cells in the matrix, an interface times counter
+        names, including the ones an interface doesn't have'''
+        return len(self.values)
+
+    def value(self, iface, counter):
+        '''One counter of one interface, 0 if it doesn't have it'''
+        col = self._columns.get(counter)
+        if col is None or iface not in self._rows:
+            return 0
+        return self.values[self._rows[iface] * len(self.counters) + col]
+
+    def _matrix(self):
+        return numpy.frombuffer(self.values, dtype=numpy.int_).reshape(
+            len(self.interfaces), len(self.counters))
+
+    def _flagged(self):
+        '''Columns of every counter of any kind'''
+        return sorted(col for kind, words in KINDS
+                      for col in self.kinds[kind])
+
+    def totals(self, kind):
+        '''The total of the counters of a kind for each interface'''
+        cols = self.kinds[kind]
+        if not cols or not self.interfaces:
+            return [0] * len(self.interfaces)
+        if numpy is not None:
+            return self._matrix()[:, cols].sum(axis=1).tolist()
+        width = len(self.counters)
+        return [sum(self.values[base + col] for col in cols)
+                for base in range(0, len(self.values), width)]
+
+    def nonzero_counts(self):
+        '''The number of counters of any kind that aren't 0 for each
+        interface'''
+        cols = self._flagged()
+        if not cols or not self.interfaces:
+            return [0] * len(self.interfaces)
+        if numpy is not None:
+            return numpy.count_nonzero(self._matrix()[:, cols],
+                                       axis=1).tolist()
+        width = len(self.counters)
+        return [sum(1 for col in cols if self.values[base + col])
+                for base in range(0, len(self.values), width)]
+
+    def ranked(self, limit=None):
+        '''Interfaces with drops, errors or discards, as a dict each of
+        the totals of every kind and the number of counters that aren't
+        0. The worst interfaces come first.'''
+        totals = dict((kind, self.totals(kind)) for kind, words in KINDS)
+        counts = self.nonzero_counts()
+        report = []
+        for idx, iface in enumerate(self.interfaces):
+            if not counts[idx]:
+                continue
+            entry = {'name': iface, 'counters': counts[idx]}
+            for kind, words in KINDS:
+                entry[kind] = totals[kind][idx]
+            entry['total'] = sum(entry[kind] for kind, words in KINDS)
+            report.append(entry)
+        report.sort(key=lambda e: (-e['total'], e['name']))
+        return report[:limit]
+
+    def _nonzero(self):
+        '''(row, col, value) for every counter of any kind that isn't 0'''
+        cols = self._flagged()
+        if not cols or not self.interfaces:
+            return []
+        if numpy is not None:
+            sub = self._matrix()[:, cols]
+            rows, picked = numpy.nonzero(sub)
+            return list(zip(rows.tolist(),
+                            numpy.array(cols)[picked].tolist(),
+                            sub[rows, picked].tolist()))
+        width = len(self.counters)
+        return [(row, col, self.values[row * width + col])
+                for row in range(len(self.interfaces)) for col in cols
+                if self.values[row * width + col]]
+
+    def top_counters(self, limit=None):
+        '''The largest drop, error and discard counters across every
+        interface, largest first, as a dict each of the interface,
+        counter, its kind and value'''
+        cells = self._nonzero()
+        if limit is None:
+            cells.sort(key=lambda c: (-c[2], c[0], c[1]))
+        else:
+            cells = heapq.nsmallest(limit, cells,
+                                    key=lambda c: (-c[2], c[0], c[1]))
+        return [{'name': self.interfaces[row], 'counter': self.counters[col],
+                 'kind': counter_kind(self.counters[col]), 'value': value}
+                for row, col, value in cells]
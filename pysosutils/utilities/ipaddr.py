@@ -0,0 +1,87 @@
+from collections import OrderedDict
+
+# settings on the first line of each interface that take a value
+SETTINGS = ('mtu', 'qdisc', 'master', 'state', 'group', 'qlen')
+
+
+def _interface(line):
+    '''The dict for an interface from its first line, such as
+    2: eth0: <BROADCAST,MULTICAST,UP> mtu 1500 ... state UP'''
+    number, name, rest = line.split(':', 2)
+    name = name.strip()
+    # links such as vlan100@bond0 or veth1@if5 name their parent
+    name, sep, parent = name.partition('@')
+    flags, sep, rest = rest.partition('>')
+    iface = {'name': name, 'index': int(number), 'parent': parent,
+             'flags': [f for f in flags.strip(' <').split(',') if f],
+             'mtu': '', 'master': '', 'state': '', 'hwaddr': '',
+             'inet': [], 'inet6': []}
+    tokens = rest.split()
+    for pos, token in enumerate(tokens[:-1]):
+        if token in SETTINGS:
+            iface[token] = tokens[pos + 1]
+    return iface
+
+
+class InterfaceTable():
+    '''Every interface in ip address output, read in one pass.
+
+    Each interface is a dict holding its flags, mtu, master, state and MAC
+    address, and every IPv4 and IPv6 address on it in the order listed,
+    as address/prefix. Interfaces are looked up by exact name, so eth1
+    never matches eth10.
+    '''
+
+    def __init__(self, lines=()):
+        self.interfaces = OrderedDict()
+        iface = None
+        for line in lines:
+            if not line.strip():
+                continue
+            if not line[0].isspace():
+                try:
+                    iface = _interface(line)
+                except ValueError:
+                    iface = None
+                    continue
+                self.interfaces[iface['name']] = iface
+                continue
+            if iface is None:
+                continue
+            fields = line.split()
+            if len(fields) < 2:
+                continue
+            if fields[0] in ('inet', 'inet6'):
+                iface[fields[0]].append(fields[1])
+            elif fields[0].startswith('link/') and fields[0] != 'link/none':
+                iface['hwaddr'] = fields[1]
+                iface['link'] = fields[0][5:]
+
+    @classmethod
+    def from_data(cls, data):
+        return cls(data.splitlines())
+
+    def __len__(self):
+        return len(self.interfaces)
+
+    def __contains__(self, name):
+        return name in self.interfaces
+
+    def __iter__(self):
+        return iter(self.interfaces.values())
+
+    def get(self, name):
+        '''The dict for an interface, or None if it isn't listed'''
+        return self.interfaces.get(name)
+
+    @property
+    def names(self):
+        return list(self.interfaces)
+
+    def addresses(self, name, family='inet'):
+        '''Addresses of an interface without their prefix length, for
+        family inet or inet6'''
+        iface = self.interfaces.get(name)
+        if iface is None:
+            return []
+        return [addr.split('/')[0] for addr in iface[family]]
@@ -0,0 +1,178 @@
+import bisect
+import mmap
+import re
+import threading
+
+# Bytes scan_lines() decodes and splits at a time
+SCAN_BLOCK = 1024 * 1024
+
+
+class MappedFile():
+    '''Read-only, memory-mapped view of a file addressed by line.
+
+    Line start offsets are found on demand, only as far into the file
+    as a caller has asked for, and remembered so each newline is only
+    scanned for once. Searches run directly against the mapping and
+    only the lines that are returned get copied out of it.
+
+    If data is given instead of a path, the same interface is offered
+    over that string. This is used for files that are already in
+    memory, such as members of a sosreport tarball.
+    '''
+
+    def __init__(self, path=None, data=None):
+        self.path = path
+        self._map = None
+        if data is None:
+            with open(path, 'rb') as f:
+                try:
+                    self._map = mmap.mmap(f.fileno(), 0,
+                                          access=mmap.ACCESS_READ)
+                except ValueError:
+                    # empty files can't be mapped
+                    data = ''
+        self.buf = self._map if self._map is not None else data
+        self.size = len(self.buf)
+        self._offsets = [0]
+        self._indexed = self.size == 0
+        self._lock = threading.Lock()
+
+    def _decode(self, text):
+        if not isinstance(text, str):
+            text = text.decode('utf-8', 'replace')
+        return text
+
+    def _encode(self, text):
+        if not isinstance(self.buf[0:0], str):
+            text = text.encode('utf-8')
+        return text
+
+    def _index_to(self, line):
+        '''Extend the line offset index until it covers line, or the
+        end of the file'''
+        with self._lock:
+            pos = self._offsets[-1]
+            while not self._indexed and len(self._offsets) <= line + 1:
+                end = self.buf.find(self._encode('\n'), pos)
+                if end == -1 or end + 1 >= self.size:
+                    self._indexed = True
+                    break
+                pos = end + 1
+                self._offsets.append(pos)
+
+    def _index_to_offset(self, offset):
+        while not self._indexed and self._offsets[-1] <= offset:
+            self._index_to(len(self._offsets))
+
+    def __len__(self):
+        self._index_to(self.size)
+        if self.size == 0:
+            return 0
+        return len(self._offsets)
+
+    def _line_end(self, start):
+        end = self.buf.find(self._encode('\n'), start)
+        return self.size if end == -1 else end
+
+    def line(self, num):
+        '''Returns a single line, without its line ending'''
+        self._index_to(num)
+        if num >= len(self._offsets) or self.size == 0:
+            raise IndexError('line %d out of range' % num)
+        start = self._offsets[num]
+        return self._decode(self.buf[start:self._line_end(start)])
+
+    def lines(self, start=0, stop=None):
+        '''Returns lines start through stop - 1 as a list'''
+        return list(self.iter_lines(start, stop))
+
+    def iter_lines(self, start=0, stop=None):
+        '''Yields lines from start up to but not including stop without
+        building a list of them, indexing them as it goes'''
+        self._index_to(start)
+        if start >= len(self._offsets) or self.size == 0:
+            return
+        num = start
+        pos = self._offsets[num]
+        while pos < self.size and (stop is None or num < stop):
+            end = self._line_end(pos)
+            yield self._decode(self.buf[pos:end])
+            num += 1
+            pos = end + 1
+            with self._lock:
+                if pos >= self.size:
+                    self._indexed = True
+                elif num == len(self._offsets):
+                    self._offsets.append(pos)
+
+    def __iter__(self):
+        return self.iter_lines()
+
+    def scan_lines(self, block=SCAN_BLOCK):
+        '''Yields every line, as iter_lines() does, for a single pass
+        over a large file. The file is split into lines a block at a time
+        instead of one line at a time, and the line index isn't built.'''
+        newline = self._encode('\n')
+        pos = 0
+        while pos < self.size:
+            end = min(pos + block, self.size)
+            if end < self.size:
+                cut = self.buf.rfind(newline, pos, end)
+                # a line longer than a block is taken whole
+                end = cut if cut != -1 else self._line_end(pos)
+            elif self.buf[end - 1:end] == newline:
+                end -= 1
+            for line in self._decode(self.buf[pos:end]).split('\n'):
+                yield line
+            pos = end + 1
+
+    def reversed_lines(self):
+        '''Yields lines from the last one backwards. This doesn't need
+        the line index, so only the tail of the file that is actually
+        consumed gets read.'''
+        end = self.size
+        if end and self.buf[end - 1:end] == self._encode('\n'):
+            end -= 1
+        while end > 0:
+            start = self.buf.rfind(self._encode('\n'), 0, end) + 1
+            yield self._decode(self.buf[start:end])
+            end = start - 1
+        if end == 0 and self.size:
+            # the file starts with an empty line
+            yield ''
+
+    def line_number(self, offset):
+        '''Returns the number of the line containing a byte offset'''
+        self._index_to_offset(offset)
+        return bisect.bisect_right(self._offsets, offset) - 1
+
+    def find(self, pattern, start=0):
+        '''Returns the byte offset of the next occurrence of pattern,
+        or -1. Nothing is decoded to do so.'''
+        return self.buf.find(self._encode(pattern), start)
+
+    def grep(self, pattern):
+        '''Yields the number of each line containing pattern'''
+        pos = self.find(pattern)
+        while pos != -1:
+            num = self.line_number(pos)
+            yield num
+            self._index_to(num + 1)
+            if num + 1 >= len(self._offsets):
+                return
+            pos = self.find(pattern, self._offsets[num + 1])
+
+    def match_lines(self, pattern):
+        '''Yields the number of each line matching a regular expression,
+        which is run over the whole file in multiline mode so that ^ and
+        $ anchor to line boundaries'''
+        last = None
+        for match in re.finditer(self._encode(pattern), self.buf, re.M):
+            num = self.line_number(match.start())
+            if num != last:
+                yield num
+            last = num
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
@@ -0,0 +1,72 @@
+from array import array
+
+# the counters of each device in /proc/net/dev, in the order they appear
+STATS = ('rxbytes', 'rxpkts', 'rxerrs', 'rxdrop', 'rxfifo', 'rxframe',
+         'rxcomprsd', 'rxmulti', 'txbytes', 'txpkts', 'txerrs', 'txdrop',
+         'txfifo', 'txcolls', 'txcarrier', 'txcomprsd')
+
+
+class NetDevTable():
+    '''The counters of every device in /proc/net/dev, read in one pass.
+
+    Each counter is an array of integers with a slot per device, and
+    devices are looked up by name through a dict, so asking for the
+    counters of every device costs one parse of the file however many
+    devices there are.
+    '''
+
+    def __init__(self, lines=()):
+        self.names = []
+        self.index = {}
+        self.columns = dict((stat, array('l')) for stat in STATS)
+        self.extend(lines)
+
+    @classmethod
+    def from_data(cls, data):
+        '''Build the table from /proc/net/dev, skipping its two header
+        lines'''
+        return cls(data.splitlines()[2:])
+
+    def extend(self, lines):
+        '''Add device lines from /proc/net/dev. Lines that don't parse,
+        and devices already seen, are skipped.'''
+        counters = [[] for stat in STATS]
+        count = len(STATS)
+        for line in lines:
+            # depending on the OS there may or may not be a space between
+            # the device name and the number of bytes received
+            name, sep, values = line.partition(':')
+            name = name.strip()
+            if not sep or not name or name in self.index:
+                continue
+            values = values.split()
+            if len(values) < count:
+                continue
+            try:
+                values = [int(v) for v in values[:count]]
+            except ValueError:
+                continue
+            self.index[name] = len(self.names)
+            self.names.append(name)
+            for counter, value in zip(counters, values):
+                counter.append(value)
+        for stat, counter in zip(STATS, counters):
+            self.columns[stat].extend(counter)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def stats(self, name):
+        '''Every counter of a device as a dict, or None if the device
+        isn't listed'''
+        idx = self.index.get(name)
+        if idx is None:
+            return None
+        return dict((stat, self.columns[stat][idx]) for stat in STATS)
+
+    def column(self, stat):
+        '''One counter of every device, in the order devices are listed'''
+        return self.columns[stat]
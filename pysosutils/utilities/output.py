@@ -0,0 +1,57 @@
+COLOR_MODES = ('auto', 'always', 'never')
+
+# Bytes held back before they are written to a stream that isn't a
+# terminal
+DEFAULT_CHUNK = 64 * 1024
+
+
+def use_color(mode, stream):
+    '''Resolve one of COLOR_MODES to True or False for stream'''
+    if mode == 'auto':
+        isatty = getattr(stream, 'isatty', None)
+        return bool(isatty and isatty())
+    return mode == 'always'
+
+
+class OutputWriter():
+    '''Buffered stand-in for sys.stdout, or any file or pipe.
+
+    Output to a terminal is written out a line at a time, as print would
+    do. Anywhere else it is collected and written in chunks of at least
+    chunk bytes, so a long report is a handful of writes rather than one
+    per line. Unicode is written out as UTF-8.
+    '''
+
+    def __init__(self, stream, chunk=DEFAULT_CHUNK):
+        self.stream = stream
+        self.chunk = chunk
+        isatty = getattr(stream, 'isatty', None)
+        self.tty = bool(isatty and isatty())
+        self._pending = []
+        self._size = 0
+
+    def write(self, text):
+        if not isinstance(text, str):
+            text = text.encode('utf-8')
+        self._pending.append(text)
+        self._size += len(text)
+        if self._size >= self.chunk or (self.tty and '\n' in text):
+            self.flush()
+
+    def writelines(self, lines):
+        for line in lines:
+            self.write(line)
+
+    def flush(self):
+        if self._pending:
+            data = ''.join(self._pending)
+            self._pending = []
+            self._size = 0
+            self.stream.write(data)
+        self.stream.flush()
+
+    def isatty(self):
+        return self.tty
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
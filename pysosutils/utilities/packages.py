@@ -0,0 +1,103 @@
+import bisect
+
+ARCHES = ('noarch', 'x86_64', 'i386', 'i586', 'i686', 'athlon', 'ia64',
+          'ppc', 'ppc64', 'ppc64le', 'ppc64p7', 's390', 's390x', 'aarch64',
+          'armv7hl', 'src')
+
+
+def parse_nevra(nvra):
+    '''Split an rpm string as found in installed-rpms, such as
+    kernel-3.10.0-693.el7.x86_64, into its name, epoch, version, release
+    and arch fields.
+    '''
+    pkg = {'nvra': nvra, 'name': nvra, 'epoch': '', 'version': '',
+           'release': '', 'arch': ''}
+    nvr = nvra
+    if '.' in nvra:
+        base, arch = nvra.rsplit('.', 1)
+        if arch in ARCHES:
+            nvr = base
+            pkg['arch'] = arch
+    parts = nvr.rsplit('-', 2)
+    if len(parts) == 3:
+        pkg['name'], pkg['version'], pkg['release'] = parts
+        if ':' in pkg['version']:
+            pkg['epoch'], pkg['version'] = pkg['version'].split(':', 1)
+    return pkg
+
+
+class PackageDB():
+    '''Index over the contents of installed-rpms.
+
+    The file is parsed once. Exact name lookups go through a dict,
+    prefix lookups bisect a sorted list of rpm strings and substring
+    lookups search a single string holding every rpm, so none of them
+    walk the package list in Python. All lookups return packages in the
+    order they appear in installed-rpms.
+    '''
+
+    def __init__(self, lines):
+        self.packages = []
+        self.by_name = {}
+        for line in lines:
+            line = line.split()
+            if not line:
+                continue
+            pkg = parse_nevra(line[0])
+            self.packages.append(pkg)
+            self.by_name.setdefault(pkg['name'], []).append(pkg)
+        self._sorted = sorted((pkg['nvra'], idx) for idx, pkg in
+                              enumerate(self.packages))
+        self._sorted_nvras = [nvra for nvra, idx in self._sorted]
+        self._starts = []
+        offset = 0
+        for pkg in self.packages:
+            self._starts.append(offset)
+            offset += len(pkg['nvra']) + 1
+        self._blob = '\n'.join(pkg['nvra'] for pkg in self.packages)
+        self._searches = {}
+
+    @classmethod
+    def from_data(cls, data):
+        return cls(data.splitlines())
+
+    def __len__(self):
+        return len(self.packages)
+
+    def get(self, name):
+        '''Return all installed packages with exactly this name'''
+        return self.by_name.get(name, [])
+
+    def with_prefix(self, prefix):
+        '''Return all packages whose rpm string starts with prefix'''
+        matches = []
+        idx = bisect.bisect_left(self._sorted_nvras, prefix)
+        while idx < len(self._sorted):
+            nvra, pos = self._sorted[idx]
+            if not nvra.startswith(prefix):
+                break
+            matches.append(pos)
+            idx += 1
+        return [self.packages[pos] for pos in sorted(matches)]
+
+    def search(self, text):
+        '''Return all packages whose rpm string contains text'''
+        if not text or '\n' in text:
+            return [pkg for pkg in self.packages if text in pkg['nvra']]
+        if text in self._searches:
+            return self._searches[text]
+        matches = []
+        pos = self._blob.find(text)
+        while pos != -1:
+            # map the offset back to the package it falls in, then
+            # carry on searching from the start of the next one
+            idx = bisect.bisect_right(self._starts, pos) - 1
+            matches.append(self.packages[idx])
+            pos = self._blob.find(text, self._starts[idx] +
+                                  len(self.packages[idx]['nvra']))
+        self._searches[text] = matches
+        return matches
+
+    def search_names(self, text):
+        '''Return all packages whose name contains text'''
+        return [pkg for pkg in self.search(text) if text in pkg['name']]
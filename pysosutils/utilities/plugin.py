@@ -1,13 +1,26 @@
 import datetime
-import os
-import re
+import sys
+from pysosutils.utilities.cache import get_cache
 from pysosutils.utilities.color import Colors as c
-from operator import itemgetter
+from pysosutils.utilities.ipaddr import InterfaceTable
+from pysosutils.utilities.packages import PackageDB
+from pysosutils.utilities.sections import SectionIndex
+from pysosutils.utilities.store import get_store
+from pysosutils.utilities.sysctl import SysctlIndex
+from pysosutils.utilities.table import format_table, select_rows
+from itertools import islice
 from collections import OrderedDict
 
 
 class Plugin():
 
+    # options that change what collect() returns, as opposed to only
+    # how it is rendered
+    cache_options = ()
+    # False if collect() reads anything other than through the cache
+    # helpers, so its result can't be kept between runs
+    persistent = True
+
     def __init__(self, target, args):
         self.options = {}
         self.target = target
@@ -17,28 +30,99 @@ class Plugin():
         self.pprint = colors
         self.color = colors.colors
         self.parse_failed = False
+        self.error = None
+        self.result = None
+
+    def collect(self):
+        '''Gather the data this plugin reports on and return it as plain
+        dicts, lists and strings, without printing anything'''
+        return None
+
+    def render(self, result):
+        '''Print a result returned by collect() for a terminal'''
+        pass
+
+    def get_result(self):
+        '''Return collect(), served from the persistent result store if
+        one is enabled and the files behind it haven't changed'''
+        store = get_store()
+        if store is None:
+            return self.collect()
+        return store.fetch(self)
+
+    def parse(self):
+        self.result = self.get_result()
+        self.render(self.result)
+
+    @property
+    def cache(self):
+        '''The FileCache shared by everything run against this report'''
+        return get_cache(self.target)
+
+    def _path(self, fname):
+        '''Accept either a path relative to the sosreport root or one
+        already prefixed with the target'''
+        if fname.startswith(self.target):
+            return fname
+        return self.target + fname
+
+    def file_exists(self, fname):
+        '''Returns True if fname is a regular file in the sosreport'''
+        return self.cache.exists(self._path(fname))
+
+    def file_size(self, fname):
+        '''Returns the size of a sosreport file in bytes, or None if it
+        isn't there'''
+        return self.cache.file_size(self._path(fname))
+
+    def find_files(self, pattern):
+        '''Returns the paths of the sosreport files matching a shell
+        pattern such as sos_commands/networking/ethtool_-S_*, relative to
+        the sosreport root and sorted'''
+        return self.cache.glob(pattern)
+
+    def read_file(self, fname):
+        '''Return the contents of a sosreport file as a string, or None
+        if the file can't be read'''
+        return self.cache.read(self._path(fname))
+
+    def read_lines(self, fname):
+        '''Return a sosreport file as a list of lines without line
+        endings, or None if the file can't be read'''
+        return self.cache.lines(self._path(fname))
+
+    def map_file(self, fname):
+        '''Return a MappedFile for a sosreport file, or None if the file
+        can't be read. Use this instead of read_lines() for files that
+        may be very large, such as ps or dmidecode output.'''
+        return self.cache.mapped(self._path(fname))
 
     def file_to_string(self, filepath):
         '''For single line files, read the file in and return
         contents as a string.
         '''
-        try:
-            with open(filepath, 'r') as f:
-                return f.readline().strip('\n')
-        except IOError:
+        data = self.read_file(filepath)
+        if data is None:
             return ''
+        return data.split('\n', 1)[0]
+
+    def _parse_dict(self, data):
+        fdict = {}
+        for line in data.splitlines():
+            line = line.split()
+            if len(line) > 1:
+                fdict[line[0].strip(':').lower()] = line[1]
+        return fdict
 
     def file_to_dict(self, filepath):
         '''For multi-line files, each line becomes a dict entry with the
         first word as the key'''
-        try:
-            fdict = {}
-            with open(self.target + filepath, 'r') as f:
-                for line in f:
-                    fdict[line.split()[0].strip(':').lower()] = line.split()[1]
-            return fdict
-        except IOError:
+        fdict = self.cache.parsed(self._path(filepath), 'dict',
+                                  self._parse_dict)
+        if fdict is None:
             return False
+        # callers are free to modify what they get back
+        return dict(fdict)
 
     def get_cmdline(self):
         ''' Get the booted kernel cmdline options '''
@@ -108,58 +192,64 @@ class Plugin():
         loads = uptime[index + 2:len(uptime)].split(',')
         return loads
 
+    def get_sysctl_index(self):
+        '''Returns the SysctlIndex for this report's sysctl -a output, or
+        False if the report doesn't have one'''
+        index = self.cache.parsed(self._path('sos_commands/kernel/sysctl_-a'),
+                                  'sysctl', SysctlIndex.from_data)
+        return index or False
+
     def get_sysctl(self, sysctl):
         ''' Get the value of a specific sysctl'''
-        if os.path.isfile(self.target + 'sos_commands/kernel/sysctl_-a'):
-            with open(self.target +
-                      'sos_commands/kernel/sysctl_-a', 'r') as sfile:
-                for line in sfile:
-                    if line.startswith(sysctl):
-                        return line.split()[2]
-        else:
+        index = self.get_sysctl_index()
+        if not index:
             return False
+        return index.get(sysctl, False)
 
     def get_sysctls(self, sysctl):
-        ''' Get all sysctls matching a given string'''
-        sysctls = {}
-        if os.path.isfile(self.target + 'sos_commands/kernel/sysctl_-a'):
-            with open(self.target + 'sos_commands/kernel/sysctl_-a',
-                      'r') as sysfile:
-                for line in sysfile:
-                    if sysctl in line:
-                        name = line.split()[0]
-                        value = line.split()[2]
-                        sysctls[name] = value
-        else:
-            sysctls = False
-        return sysctls
+        '''Get all sysctls whose name contains a given string, or that
+        match it if it is a glob such as net.ipv4.*'''
+        index = self.get_sysctl_index()
+        if not index:
+            return False
+        return index.query(sysctl)
+
+    def get_sysctls_by_prefix(self, prefix):
+        ''' Get all sysctls under a dotted prefix such as net.ipv4 '''
+        index = self.get_sysctl_index()
+        if not index:
+            return False
+        return index.prefix(prefix)
 
     def get_all_sysctls(self):
-        pass
+        ''' Get every sysctl as a dict of name and value '''
+        index = self.get_sysctl_index()
+        if not index:
+            return False
+        return OrderedDict(index.values)
 
     def get_selinux(self):
         ''' Get the current and configured SELinux setting '''
         se_status = {}
-        if os.path.isfile(self.target + 'sos_commands/selinux/sestatus_-b'):
-            with open(self.target + 'sos_commands/selinux/sestatus_-b',
-                      'r') as sfile:
-                for i, line in enumerate(sfile):
-                    index = line.find(':')
-                    if line.startswith('SELinux status'):
-                        se_status['status'] = line[index + 1:
-                                                   len(line)].strip()
-                        if se_status['status'] == 'disabled':
-                            se_status['current'] = 'disabled'
-                            se_status['config'] = 'disabled'
-                            break
-                    elif line.startswith('Current'):
-                        se_status['current'] = line[index + 1:
-                                                    len(line)].strip()
-                    elif line.startswith('Mode'):
-                        se_status['config'] = line[index + 1:
-                                                   len(line)].strip()
-                    elif i > 6:
+        lines = self.read_lines('sos_commands/selinux/sestatus_-b')
+        if lines is not None:
+            for i, line in enumerate(lines):
+                index = line.find(':')
+                if line.startswith('SELinux status'):
+                    se_status['status'] = line[index + 1:
+                                               len(line)].strip()
+                    if se_status['status'] == 'disabled':
+                        se_status['current'] = 'disabled'
+                        se_status['config'] = 'disabled'
                         break
+                elif line.startswith('Current'):
+                    se_status['current'] = line[index + 1:
+                                                len(line)].strip()
+                elif line.startswith('Mode'):
+                    se_status['config'] = line[index + 1:
+                                               len(line)].strip()
+                elif i > 6:
+                    break
         else:
             se_status['current'] = 'Not Found'
             se_status['config'] = 'Not Found'
@@ -174,75 +264,47 @@ class Plugin():
                                             )
         return ps
 
+    def get_package_db(self):
+        '''Returns the PackageDB index of installed-rpms for this report.
+        The index is built once and shared by every plugin.
+        '''
+        db = self.cache.parsed(self._path('installed-rpms'), 'packages',
+                               PackageDB.from_data)
+        if db is None:
+            return PackageDB([])
+        return db
+
     def get_rpm(self, rpm, match_all=False):
         '''
         Get details on a given rpm.
         Boolean option can be used to see if rpm is installed or not.
         '''
-        rpms = []
-        if os.path.isfile(self.target + 'installed-rpms'):
-            with open(self.target + 'installed-rpms', 'r') as rfile:
-                for line in rfile:
-                    if not match_all:
-                        if line.split('.', 1)[0][:-2] == rpm:
-                            index = line.find('.')
-                            this_rpm = line[0:index - 2]
-                            rpms.append(line.split()[0])
-                            break
-                    else:
-                        if rpm in line.split('.', 1)[0][:-2]:
-                            index = line.find('.')
-                            this_rpm = line[0:index - 2]
-                            rpms.append(line.split()[0])
+        db = self.get_package_db()
+        if not match_all:
+            rpms = [pkg['nvra'] for pkg in db.get(rpm)[:1]]
+        else:
+            rpms = [pkg['nvra'] for pkg in db.search_names(rpm)]
         if len(rpms) == 0:
             rpms.append("Not Installed")
         return rpms
 
     def get_all_packages(self):
-        pkgs = []
-        if os.path.isfile(self.target + 'installed-rpms'):
-            with open(self.target + 'installed-rpms', 'r') as rfile:
-                for line in rfile:
-                    pkgs.append(line.split()[0])
-        return pkgs
+        return [pkg['nvra'] for pkg in self.get_package_db().packages]
 
     def is_installed(self, pkgnames):
         '''Simple check if a given package is installed.
         Returns only True or False'''
         if isinstance(pkgnames, str):
             pkgnames = [pkgnames]
-        if os.path.isfile(self.target + 'installed-rpms'):
-            with open(self.target + 'installed-rpms', 'r') as rfile:
-                for line in rfile:
-                    for pkg in pkgnames:
-                        if line.startswith(pkg):
-                            return True
-        return False
+        db = self.get_package_db()
+        return any(db.with_prefix(pkg) for pkg in pkgnames)
 
     def get_rpm_version(self, rpm):
         ''' Get _just_ the version of a given RPM '''
-        ver = self.get_rpm(rpm)[0]
-        if 'Not Installed' in ver:
+        pkgs = self.get_package_db().get(rpm)
+        if not pkgs:
             return False
-        else:
-            formatVer = ver.strip(rpm).strip('x86_64').strip(
-                'noarch').strip('-').strip('.')
-            return formatVer
-
-    def get_sysctl(self, sysctl):
-        ''' Get the setting for a given sysctl '''
-        sysctls = {}
-        if os.path.isfile(self.target + 'sos_commands/kernel/sysctl_-a'):
-            with open(self.target + 'sos_commands/kernel/sysctl_-a',
-                      'r') as sysfile:
-                for line in sysfile:
-                    if sysctl in line:
-                        name = line.split()[0]
-                        value = line.split()[2]
-                        sysctls[name] = value
-        else:
-            sysctls = "No sysctl_-a file to parse"
-        return sysctls
+        return '%s-%s' % (pkgs[0]['version'], pkgs[0]['release'])
 
     def get_nic_info(self, interface):
         '''Returns a single dict for given interface'''
@@ -257,6 +319,16 @@ class Plugin():
             return self.nics[interface]
         return False
 
+    def get_interface_table(self):
+        '''Returns the InterfaceTable for this report's ip address
+        output, parsed once and shared, or False if there isn't one'''
+        table = self.cache.parsed(
+            self._path('sos_commands/networking/ip_address'), 'interfaces',
+            InterfaceTable.from_data)
+        if table is None:
+            return False
+        return table
+
     def get_nics(self):
         '''Returns dict of nics, whereby the key is the nic name and
         the value is a dict of info about that nic
@@ -264,23 +336,20 @@ class Plugin():
         # TODO: make this OS independent. Will likely need to set some
         # class vars based on OS though.
         self.nics = {}
-        netfile = self.target + 'sos_commands/networking/ip_address'
-        with open(netfile, 'r') as nfile:
-            raw = nfile.read()
-            niclist = re.split('\n\d: ', re.split('^\d: ', raw)[1])
-            for nic in niclist:
-                n = {}
-                for i in [
-                          'inet',
-                          'inet6',
-                          'link/ether'
-                          ]:
-                    try:
-                        n[i] = re.split(i, nic)[1].split()[0]
-                    except:
-                        pass
-                name = nic.split()[0].strip(':')
-                self.nics[name] = n
+        table = self.get_interface_table()
+        if not table:
+            raise IOError('No ip_address file to parse')
+        for iface in table:
+            n = dict(iface)
+            n['addresses'] = iface['inet'] + iface['inet6']
+            for family in ['inet', 'inet6']:
+                if iface[family]:
+                    n[family] = iface[family][0]
+                else:
+                    del n[family]
+            if iface.get('link') == 'ether':
+                n['link/ether'] = iface['hwaddr']
+            self.nics[iface['name']] = n
         return self.nics
 
     def get_enablement(self, service):
@@ -288,94 +357,67 @@ class Plugin():
         Check the current service configuration from chkconfig.
         TO DO: expand to systemd.
         '''
-        if os.path.isfile(self.target + 'chkconfig'):
-            with open(self.target + 'chkconfig', 'r') as cfile:
-                for line in cfile:
-                    if service in line:
-                        service_status = line.lstrip(service).rstrip(
-                                                     '\n').lstrip()
-                        return service_status
-            return "Service not found in chkconfig"
-        else:
+        lines = self.read_lines('chkconfig')
+        if lines is None:
             return "No chkconfig file found"
+        for line in lines:
+            if service in line:
+                return line.lstrip(service).lstrip()
+        return "Service not found in chkconfig"
 
     def get_selinux(self):
         ''' Get the current and configured SELinux setting '''
         sel_status = {}
-        if os.path.isfile(self.target + 'sos_commands/selinux/sestatus_-b'):
-            with open(self.target + 'sos_commands/selinux/sestatus_-b',
-                      'r') as sfile:
-                for i, line in enumerate(sfile):
-                    index = line.find(':')
-                    if line.startswith('SELinux status'):
-                        sel_status['status'] = line[index + 1:
-                                                    len(line)].strip()
-                        if sel_status['status'] == 'disabled':
-                            sel_status['current'] = 'disabled'
-                            sel_status['config'] = 'disabled'
-                            break
-                    elif line.startswith('Current'):
-                        sel_status['current'] = line[index + 1:
-                                                     len(line)].strip()
-                    elif line.startswith('Mode'):
-                        sel_status['config'] = line[index + 1:
-                                                    len(line)].strip()
-                    elif i > 6:
+        lines = self.read_lines('sos_commands/selinux/sestatus_-b')
+        if lines is not None:
+            for i, line in enumerate(lines):
+                index = line.find(':')
+                if line.startswith('SELinux status'):
+                    sel_status['status'] = line[index + 1:
+                                                len(line)].strip()
+                    if sel_status['status'] == 'disabled':
+                        sel_status['current'] = 'disabled'
+                        sel_status['config'] = 'disabled'
                         break
+                elif line.startswith('Current'):
+                    sel_status['current'] = line[index + 1:
+                                                 len(line)].strip()
+                elif line.startswith('Mode'):
+                    sel_status['config'] = line[index + 1:
+                                                len(line)].strip()
+                elif i > 6:
+                    break
         else:
             sel_status['current'] = 'Not Found'
             sel_status['config'] = 'Not Found'
         return sel_status
 
-    def get_section_content(self, fname, start, end='$'):
+    def get_section_index(self, fname):
+        '''Returns the SectionIndex for a file, or False if the file
+        can't be read'''
+        index = self.cache.parsed(self._path(fname), 'sections',
+                                  SectionIndex.from_data)
+        return index or False
+
+    def get_section_content(self, fname, start):
         '''
-        Given a filename (fname) and a section header, parse the file
-        and then return all content between the section header and
-        a new line, signifying the end of the section.
+        Given a filename (fname) and a section header, return the
+        content between the section header and the next empty line as
+        a dict. If the header appears more than once the last section
+        is used.
         '''
-        if os.path.isfile(self.target + fname):
-            with open(self.target + fname, 'r') as pfile:
-                handle_regex = re.compile('^%s\s' % start)
-                newline = re.compile('^%s' % end)
-                lines = pfile.readlines()
-                for x in range(0, len(lines)):
-                    line = lines[x]
-                    if handle_regex.findall(line):
-                        # Found header for section
-                        sectionInfo = {}
-                        sectionInfo['info'] = []
-                        while True:
-                            try:
-                                line = lines[x + 1]
-                        # repeat until we hit newline
-                                if not newline.findall(line):
-                                    sectionInfo['info'].append(
-                                                line.strip().strip('\t')
-                                                )
-                                    x += 1
-                                else:
-                                    break
-                            except:
-                                break
-                        info = {}
-                        for item in sectionInfo['info']:
-                            try:
-                                key = item.split(':')[0]
-                                value = item.split(':')[1]
-                                info[key] = value.strip()
-                            except:
-                                pass
-            try:
-                return info
-            except UnboundLocalError:
-                return False
-        else:
+        index = self.get_section_index(fname)
+        if not index:
             return False
+        section = index.section(start)
+        if section is None:
+            return False
+        return section
 
     def format_as_table(self, data, keys, header=None, sort_by_key=None,
-                        sort_order_reverse=False):
+                        sort_order_reverse=False, limit=None):
         '''Takes a list of dictionaries, formats the data, and returns
-        the formatted data as a text table.
+        the formatted data as a text table. data is left as it was.
 
         Required Parameters:
             data - Data to process (list of dictionaries). (Type: List)
@@ -386,81 +428,40 @@ class Plugin():
             sort_by_key - The key to sort by. (Type: String)
             sort_order_reverse - Default sort order is ascending, if
                 True sort order will change to descending. (Type: Boolean)
+            limit - Only format the first limit rows, after sorting.
+                (Type: Integer)
         '''
-        # Sort the data if a sort key is specified (default sort order
-        # is ascending)
-
-        if sort_by_key:
-            data = sorted(data,
-                          key=itemgetter(sort_by_key),
-                          reverse=sort_order_reverse)
-        # If header is not empty, add header to data
-        if header:
-            # Get the length of each header and create a divider based
-            # on that length
-            header_divider = []
-            for name in header:
-                header_divider.append('-' * len(name))
-
-            # Create a list of dictionary from the keys and the header and
-            # insert it at the beginning of the list. Do the same for the
-            # divider and insert below the header.
-            header_divider = dict(zip(keys, header_divider))
-            data.insert(0, header_divider)
-            header = dict(zip(keys, header))
-            data.insert(0, header)
-
-        column_widths = []
-        for key in keys:
-            column_widths.append(max(len(str(column[key])) for column in data))
-        # Create a tuple pair of key and the associated column width for it
-        key_width_pair = zip(keys, column_widths)
-
-        format = ('%-*s ' * len(keys)).strip() + '\n'
-        formatted_data = ''
-        for element in data:
-            data_to_format = []
-            # Create a tuple that will be used for the formatting in
-            # width, value format
-            for pair in key_width_pair:
-                data_to_format.append(pair[1])
-                data_to_format.append(element[pair[0]])
-            formatted_data += format % tuple(data_to_format)
-        try:
-            data.pop(0)
-            data.pop(0)
-        except:
-            pass
-        return formatted_data
+        rows = select_rows(data, sort_by_key, sort_order_reverse, limit)
+        return format_table(rows, keys, header)
 
     def display_table(self, tbl, count=0, color=None, indent='',
                       no_header=False):
-        if count > 0:
-            count += 2
-        header = tbl.splitlines()[:2]
+        '''Print a table from format_as_table(), or any iterable of its
+        lines such as iter_table(), showing at most count rows'''
+        if isinstance(tbl, basestring):
+            tbl = tbl.splitlines()
+        lines = iter(tbl)
+        header = list(islice(lines, 2))
+        # lines are written as they are read so a streamed table is never
+        # held in memory, sys.stdout does the buffering
+        write = sys.stdout.write
         if not no_header:
+            start = end = ''
+            if color and color in self.color:
+                start, end = self.color[color], self.color['ENDC']
             for x in header:
-                if color:
-                    if color in self.color:
-                        print (indent + self.color[color] + x.strip() +
-                               self.color['ENDC']
-                               )
-                    else:
-                        print indent + x.strip()
-                else:
-                    print indent + x.strip()
-        if not count:
-            for line in tbl.splitlines()[2:]:
-                print indent + line.strip()
-        else:
-            for line in tbl.splitlines()[2:count]:
-                print indent + line.strip()
+                write(indent + start + x.strip() + end + '\n')
+        if count > 0:
+            lines = islice(lines, count)
+        for line in lines:
+            write(indent + line.strip() + '\n')
         return True
 
     def _get_taints(self):
-        with open(self.target + 'proc/sys/kernel/tainted', 'r') as tfile:
-            check = tfile.read().splitlines()
-            return int(check[0])
+        check = self.read_lines('proc/sys/kernel/tainted')
+        if check is None:
+            raise IOError('No proc/sys/kernel/tainted file to parse')
+        return int(check[0])
 
     def get_taints(self):
         '''
@@ -549,44 +550,7 @@ class Plugin():
 
     def parse_output_section(self, fname, section):
         """
-        Given a filename (fname) and a section header, parse the file
-        and then return all content between the section header and
-        a new line, signifying the end of the section.
+        Given a filename (fname) and a section header, return the
+        content of the section as a dict. Same as get_section_content().
         """
-        if os.path.isfile(fname):
-            with open(fname, 'r') as pfile:
-                handle_regex = re.compile('^%s\s' % section)
-                newline = re.compile('^$')
-                lines = pfile.readlines()
-                for x in range(0, len(lines)):
-                    line = lines[x]
-                    if handle_regex.findall(line):
-                        # Found header for section
-                        section_info = {}
-                        section_info['info'] = []
-                        while True:
-                            try:
-                                line = lines[x + 1]
-                        # repeat until we hit newline
-                                if not newline.findall(line):
-                                    section_info['info'].append(line.strip(
-                                    ).strip('\t'))
-                                    x += 1
-                                else:
-                                    break
-                            except:
-                                break
-                        info = {}
-                        for item in section_info['info']:
-                            try:
-                                key = item.split(':')[0]
-                                value = item.split(':')[1]
-                                info[key] = value.strip()
-                            except:
-                                pass
-            try:
-                return info
-            except UnboundLocalError:
-                return False
-        else:
-            return False
+        return self.get_section_content(fname, section)
@@ -0,0 +1,391 @@
+import heapq
+import operator
+import re
+from array import array
+from collections import OrderedDict
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    intern
+except NameError:
+    from sys import intern
+
+# column -> array typecode, for the numeric columns
+NUMERIC = (('pid', 'l'), ('cpu', 'd'), ('mem', 'd'), ('vsz', 'l'),
+           ('rss', 'l'), ('rssmb', 'l'))
+# text columns with few distinct values, kept as codes into a list of
+# the values
+CODED = ('user', 'tty', 'stat', 'start', 'shortcmd')
+# text columns kept as they are
+TEXT = ('time', 'command')
+
+COLUMNS = [name for name, code in NUMERIC] + list(CODED) + list(TEXT)
+
+
+def _state(stat):
+    '''The process state of a STAT value, without its flags'''
+    return stat[:1]
+
+# names aggregate() and filters know columns by, with the function that
+# turns a value into what is grouped or compared on
+ALIASES = {'cmd': ('shortcmd', None), 'state': ('stat', _state)}
+GROUPS = ('user', 'cmd', 'state', 'tty')
+FUNCTIONS = ('count', 'sum', 'max')
+OPERATORS = OrderedDict([('!=', operator.ne), ('>=', operator.ge),
+                         ('<=', operator.le), ('=', operator.eq),
+                         ('~', operator.contains), ('>', operator.gt),
+                         ('<', operator.lt)])
+_FILTER = re.compile(r'^\s*(\w+)\s*(%s)\s*(.*?)\s*$' %
+                     '|'.join(re.escape(op) for op in OPERATORS))
+
+
+def _resolve(name):
+    '''The column a name refers to and the function applied to its
+    values, if any'''
+    if name in ALIASES:
+        return ALIASES[name]
+    if name in COLUMNS:
+        return name, None
+    raise ValueError('unknown column %s' % name)
+
+
+def parse_metric(spec):
+    '''Parse an aggregate such as count, sum:rssmb, max:cpu or p95:vsz
+    into (function, column, percentile). Raises ValueError if it isn't
+    one.'''
+    func, sep, column = spec.strip().partition(':')
+    if func == 'count':
+        if sep:
+            raise ValueError('count takes no column')
+        return ('count', None, None)
+    percent = None
+    if func.startswith('p') and func[1:]:
+        try:
+            percent = float(func[1:])
+        except ValueError:
+            pass
+        if percent is None or not 0 <= percent <= 100:
+            raise ValueError('bad percentile %s' % func)
+    elif func not in FUNCTIONS:
+        raise ValueError('unknown aggregate %s' % func)
+    if column not in dict(NUMERIC):
+        raise ValueError('%s needs a numeric column, one of %s' % (
+            func, ', '.join(name for name, code in NUMERIC)))
+    return (func, column, percent)
+
+
+def metric_name(metric):
+    '''The key a parsed aggregate's result is stored under, such as
+    sum_rssmb'''
+    func, column, percent = metric
+    return '%s_%s' % (func, column) if column else func
+
+
+def parse_filter(spec):
+    '''Parse a filter such as state=D, user!=root, cmd~java or rssmb>100
+    into (column, operator, value, key). Numeric columns take every
+    operator, text ones only =, != and ~ (contains). Raises ValueError
+    if it isn't one.'''
+    match = _FILTER.match(spec)
+    if not match:
+        raise ValueError('bad filter %s' % spec)
+    name, op, value = match.groups()
+    column, key = _resolve(name)
+    if column in dict(NUMERIC):
+        if op == '~':
+            raise ValueError('~ only works on text columns')
+        value = float(value)
+    elif op not in ('=', '!=', '~'):
+        raise ValueError('%s only works on numeric columns' % op)
+    return (column, op, value, key)
+
+
+def _percentile(values, percent):
+    '''Nearest rank percentile of a list of numbers'''
+    values.sort()
+    rank = int(-(-percent * len(values) // 100)) - 1
+    return values[min(max(rank, 0), len(values) - 1)]
+
+
+class ProcessTable():
+    '''The processes in ps auxwww output, stored by column.
+
+    Numeric columns are arrays of machine numbers rather than strings, so
+    they sort and add up as numbers. Columns with few distinct values,
+    such as user and state, hold a code per process into a list of those
+    values, with every value interned. Processes are addressed by their
+    row number, and row() builds the dict for one when it is needed.
+
+    Group sums and top-N selection work on whole columns. With numpy
+    installed they are done with bincount and argpartition over the
+    arrays, otherwise in a single pass in python. aggregate() groups on
+    any coded column with filters and several aggregates in one pass.
+    '''
+
+    def __init__(self, lines=()):
+        self.columns = {}
+        for name, code in NUMERIC:
+            self.columns[name] = array(code)
+        self.values = {}
+        self._codes = {}
+        for name in CODED:
+            self.columns[name] = array('l')
+            self.values[name] = []
+            self._codes[name] = {}
+        for name in TEXT:
+            self.columns[name] = []
+        self.extend(lines)
+
+    @classmethod
+    def from_data(cls, data):
+        '''Build the table from ps auxwww output, skipping its header'''
+        return cls(data.splitlines()[1:])
+
+    def _code(self, name, value):
+        codes = self._codes[name]
+        if value not in codes:
+            codes[value] = len(self.values[name])
+            self.values[name].append(intern(value))
+        return codes[value]
+
+    def extend(self, lines):
+        '''Add lines of ps auxwww output. Lines that don't parse are
+        skipped.'''
+        numbers = dict((name, []) for name, code in NUMERIC)
+        coded = dict((name, []) for name in CODED)
+        pid, cpu, mem = numbers['pid'], numbers['cpu'], numbers['mem']
+        vsz, rss, rssmb = numbers['vsz'], numbers['rss'], numbers['rssmb']
+        users, ttys = coded['user'], coded['tty']
+        stats, starts = coded['stat'], coded['start']
+        shortcmds = coded['shortcmd']
+        times = self.columns['time']
+        commands = self.columns['command']
+        code = self._code
+        for line in lines:
+            fields = line.split()
+            if len(fields) < 11:
+                continue
+            try:
+                row = (int(fields[1]), float(fields[2]), float(fields[3]),
+                       int(fields[4]), int(fields[5]))
+            except ValueError:
+                continue
+            pid.append(row[0])
+            cpu.append(row[1])
+            mem.append(row[2])
+            vsz.append(row[3])
+            rss.append(row[4])
+            rssmb.append(row[4] // 1024)
+            users.append(code('user', fields[0]))
+            ttys.append(code('tty', fields[6]))
+            stats.append(code('stat', fields[7]))
+            starts.append(code('start', fields[8]))
+            command = ' '.join(fields[10:])[:100]
+            times.append(fields[9])
+            commands.append(command)
+            shortcmds.append(code('shortcmd', fields[10][:100]))
+        # the arrays are filled in one go rather than a value at a time
+        for name, values in list(numbers.items()) + list(coded.items()):
+            self.columns[name].extend(values)
+
+    def __len__(self):
+        return len(self.columns['pid'])
+
+    def value(self, name, idx):
+        '''The value of one column for the process in row idx'''
+        if name in self.values:
+            return self.values[name][self.columns[name][idx]]
+        return self.columns[name][idx]
+
+    def column(self, name):
+        '''Every value of a column, in row order'''
+        if name in self.values:
+            values = self.values[name]
+            return [values[code] for code in self.columns[name]]
+        return self.columns[name]
+
+    def row(self, idx):
+        '''The process in row idx as a dict of every column'''
+        return dict((name, self.value(name, idx)) for name in COLUMNS)
+
+    def rows(self, indices=None):
+        '''Dicts for the processes in the given rows, or all of them'''
+        if indices is None:
+            indices = range(len(self))
+        return [self.row(idx) for idx in indices]
+
+    def __iter__(self):
+        for idx in range(len(self)):
+            yield self.row(idx)
+
+    def matching(self, name, predicate):
+        '''Rows whose value of column name satisfies predicate. For coded
+        columns predicate is only called once per distinct value.'''
+        col = self.columns[name]
+        if name in self.values:
+            hits = set(code for code, value in enumerate(self.values[name])
+                       if predicate(value))
+            return [idx for idx, code in enumerate(col) if code in hits]
+        return [idx for idx, value in enumerate(col) if predicate(value)]
+
+    def search(self, name, text):
+        '''Rows whose value of column name contains text'''
+        return self.matching(name, lambda value: text in value)
+
+    def _numpy(self, name):
+        code = dict(NUMERIC)[name]
+        dtype = numpy.float64 if code == 'd' else numpy.int_
+        return numpy.frombuffer(self.columns[name], dtype=dtype)
+
+    def top(self, name, limit=None):
+        '''Rows with the largest values of a numeric column, largest
+        first. Rows with equal values keep their order in the table, the
+        same as sorting the whole table would give.'''
+        count = len(self)
+        if limit is None or limit >= count:
+            limit = count
+        if limit <= 0:
+            return []
+        col = self.columns[name]
+        if numpy is None or limit == count:
+            return heapq.nlargest(limit, range(count), key=col.__getitem__)
+        values = self._numpy(name)
+        # the limit-th largest value, found in linear time, then every
+        # row above it and as many of the rows equal to it as will fit
+        kth = values[numpy.argpartition(values, count - limit)[count - limit]]
+        above = numpy.flatnonzero(values > kth)
+        equal = numpy.flatnonzero(values == kth)[:limit - len(above)]
+        rows = numpy.concatenate((above, equal)).tolist()
+        return sorted(rows, key=lambda idx: (-col[idx], idx))
+
+    def group_sums(self, by, names):
+        '''Sum the numeric columns names for each distinct value of the
+        coded column by. Returns a dict per value holding by and each
+        sum, as floats, in the order values first appear.'''
+        codes = self.columns[by]
+        groups = len(self.values[by])
+        sums = {}
+        if numpy is not None and len(self):
+            keys = numpy.frombuffer(codes, dtype=numpy.int_)
+            for name in names:
+                sums[name] = numpy.bincount(keys, weights=self._numpy(name),
+                                            minlength=groups).tolist()
+        else:
+            for name in names:
+                total = [0.0] * groups
+                for code, value in zip(codes, self.columns[name]):
+                    total[code] += value
+                sums[name] = total
+        report = []
+        for code, value in enumerate(self.values[by]):
+            group = {by: value}
+            for name in names:
+                group[name] = sums[name][code]
+            report.append(group)
+        return report
+
+    def _tests(self, filters):
+        '''A (column, test) pair for each parsed filter, where test is
+        called with the column's value in a row. Coded columns are tested
+        against the set of codes that match, worked out once per distinct
+        value.'''
+        tests = []
+        for column, op, value, key in filters:
+            compare = OPERATORS[op]
+            if column in dict(NUMERIC):
+                test = (lambda v, compare=compare, value=value:
+                        compare(v, value))
+            else:
+                def test(v, compare=compare, value=value, key=key):
+                    return compare(key(v) if key else v, value)
+                if column in self.values:
+                    hits = set(code for code, v in
+                               enumerate(self.values[column]) if test(v))
+                    test = hits.__contains__
+            tests.append((self.columns[column], test))
+        return tests
+
+    def where(self, filters):
+        '''Rows matching every filter from parse_filter()'''
+        tests = self._tests(filters)
+        return [idx for idx in range(len(self))
+                if all(test(col[idx]) for col, test in tests)]
+
+    def aggregate(self, by, metrics, filters=(), limit=None):
+        '''Group the processes on a coded column, or one of GROUPS, and
+        work out each aggregate from parse_metric() per group, counting
+        only the rows matching every filter from parse_filter().
+
+        The filters and every aggregate are done in the same single pass
+        over the rows. Percentiles keep the values of their group until
+        the end. Returns an OrderedDict per group, holding by and each
+        aggregate under its metric_name(), largest first on the first
+        aggregate.'''
+        column, key = _resolve(by)
+        if column not in self.values:
+            raise ValueError('can only group by %s' % ', '.join(GROUPS))
+        # codes of the column's values -> group, several values can share
+        # a group when key folds them together
+        names = []
+        groups = {}
+        group_of = []
+        for value in self.values[column]:
+            name = key(value) if key else value
+            if name not in groups:
+                groups[name] = len(names)
+                names.append(name)
+            group_of.append(groups[name])
+        count = len(names)
+        totals = []
+        for func, col, percent in metrics:
+            if func in ('count', 'sum'):
+                totals.append([0] * count)
+            elif func == 'max':
+                totals.append([None] * count)
+            else:
+                totals.append([[] for i in range(count)])
+        work = [(func, self.columns[col] if col else None, total)
+                for (func, col, percent), total in zip(metrics, totals)]
+        tests = self._tests(filters)
+        seen = [0] * count
+        codes = self.columns[column]
+        for idx in range(len(self)):
+            for col, test in tests:
+                if not test(col[idx]):
+                    break
+            else:
+                group = group_of[codes[idx]]
+                seen[group] += 1
+                for func, col, total in work:
+                    if func == 'count':
+                        total[group] += 1
+                    elif func == 'sum':
+                        total[group] += col[idx]
+                    elif func == 'max':
+                        if total[group] is None or col[idx] > total[group]:
+                            total[group] = col[idx]
+                    else:
+                        total[group].append(col[idx])
+        report = []
+        for group, name in enumerate(names):
+            if not seen[group]:
+                continue
+            entry = OrderedDict([(by, name)])
+            for (func, col, percent), total in zip(metrics, totals):
+                value = total[group]
+                if percent is not None:
+                    value = _percentile(value, percent)
+                if isinstance(value, float):
+                    value = round(value, 1)
+                entry[metric_name((func, col, percent))] = value
+            report.append(entry)
+        if metrics:
+            first = metric_name(metrics[0])
+            report.sort(key=lambda e: (-e[first], e[by]))
+        else:
+            report.sort(key=lambda e: e[by])
+        return report[:limit]
@@ -0,0 +1,204 @@
+from array import array
+
+try:
+    intern
+except NameError:
+    from sys import intern
+
+# header names each column may have across the ps formats sosreport uses
+PID = ('PID',)
+PPID = ('PPID',)
+STATE = ('STAT', 'S')
+COMMAND = ('COMMAND', 'CMD')
+
+
+def _column(header, names):
+    for name in names:
+        if name in header:
+            return header.index(name)
+    raise ValueError('ps output has no %s column' % names[0])
+
+
+class ProcessTree():
+    '''Parent/child index over ps output that has a PPID column, such as
+    ps alxwww or ps -elfL.
+
+    Threads listed on their own line are folded into their process. The
+    children of every process are kept in one array, with each process's
+    children next to each other, and every process gets a place in a
+    depth-first order of the tree so that a subtree is a contiguous run
+    of that order. Processes whose parent isn't listed are roots.
+
+    Building the index, and rolling a value up over every subtree, take
+    time linear in the number of processes.
+    '''
+
+    def __init__(self, lines):
+        lines = iter(lines)
+        header = next(lines, '').split()
+        self.pids = array('l')
+        self.states = []
+        self.commands = []
+        self.index = {}
+        if not header:
+            ppids = []
+        else:
+            ppids = self._parse(header, lines)
+        count = len(self.pids)
+        self.parents = array('l', [-1] * count)
+        for row, ppid in enumerate(ppids):
+            self.parents[row] = self.index.get(ppid, -1)
+        self._link()
+
+    @classmethod
+    def from_data(cls, data):
+        return cls(data.splitlines())
+
+    def _parse(self, header, lines):
+        pid_col = _column(header, PID)
+        ppid_col = _column(header, PPID)
+        state_col = _column(header, STATE)
+        cmd_col = _column(header, COMMAND)
+        ppids = array('l')
+        for line in lines:
+            fields = line.split(None, cmd_col)
+            if len(fields) <= cmd_col:
+                continue
+            try:
+                pid = int(fields[pid_col])
+                ppid = int(fields[ppid_col])
+            except ValueError:
+                continue
+            if pid in self.index:
+                # another thread of a process already seen
+                continue
+            self.index[pid] = len(self.pids)
+            self.pids.append(pid)
+            ppids.append(ppid)
+            self.states.append(intern(fields[state_col]))
+            self.commands.append(fields[cmd_col].strip())
+        return ppids
+
+    def _link(self):
+        '''Group children by parent and lay out the depth-first order'''
+        count = len(self.pids)
+        parents = self.parents
+        starts = array('l', [0] * (count + 1))
+        for parent in parents:
+            if parent >= 0:
+                starts[parent + 1] += 1
+        for row in range(count):
+            starts[row + 1] += starts[row]
+        children = array('l', [0] * starts[count])
+        fill = array('l', starts)
+        for row, parent in enumerate(parents):
+            if parent >= 0:
+                children[fill[parent]] = row
+                fill[parent] += 1
+        self._starts = starts
+        self._children = children
+
+        self.order = array('l')
+        self.position = array('l', [-1] * count)
+        roots = [row for row in range(count) if parents[row] < 0]
+        self._walk(roots)
+        # processes in a parent loop aren't reachable from any root, so
+        # the loop is broken at the first of them
+        for row in range(count):
+            if self.position[row] < 0:
+                parents[row] = -1
+                self._walk([row])
+        self.size = array('l', [1] * count)
+        for row in reversed(self.order):
+            if parents[row] >= 0:
+                self.size[parents[row]] += self.size[row]
+
+    def _walk(self, roots):
+        stack = list(reversed(roots))
+        order, position = self.order, self.position
+        starts, children = self._starts, self._children
+        while stack:
+            row = stack.pop()
+            if position[row] >= 0:
+                continue
+            position[row] = len(order)
+            order.append(row)
+            stack.extend(reversed(children[starts[row]:starts[row + 1]]))
+
+    def __len__(self):
+        return len(self.pids)
+
+    def __contains__(self, pid):
+        return pid in self.index
+
+    @property
+    def roots(self):
+        '''Rows of the processes without a listed parent'''
+        return [row for row in self.order if self.parents[row] < 0]
+
+    def row(self, pid):
+        return self.index[pid]
+
+    def children(self, row):
+        '''Rows of the direct children of a process'''
+        return self._children[self._starts[row]:self._starts[row + 1]]
+
+    def subtree(self, row):
+        '''Rows of a process and all of its descendants'''
+        start = self.position[row]
+        return self.order[start:start + self.size[row]]
+
+    def ancestors(self, row):
+        '''Rows of the parent of a process, its parent, and so on up to
+        the root of its tree'''
+        chain = []
+        row = self.parents[row]
+        while row >= 0:
+            chain.append(row)
+            row = self.parents[row]
+        return chain
+
+    def rollup(self, values):
+        '''Given a value for every row, return the total of each subtree'''
+        totals = list(values)
+        parents = self.parents
+        for row in reversed(self.order):
+            if parents[row] >= 0:
+                totals[parents[row]] += totals[row]
+        return totals
+
+    def state_counts(self, row):
+        '''Number of processes in each state in a subtree, keyed on the
+        first letter of the state'''
+        counts = {}
+        states = self.states
+        for member in self.subtree(row):
+            state = states[member][:1]
+            counts[state] = counts.get(state, 0) + 1
+        return counts
+
+    def _table_rows(self, table):
+        '''Row of table for each row of the tree, matched by PID, or -1.
+        Kept for the last table asked about.'''
+        if getattr(self, '_joined', (None,))[0] is not table:
+            rows = dict((pid, idx) for idx, pid in
+                        enumerate(table.columns['pid']))
+            self._joined = (table, array('l', [rows.get(pid, -1)
+                                               for pid in self.pids]))
+        return self._joined[1]
+
+    def join(self, table, name):
+        '''Value of column name of a ProcessTable for each row of the
+        tree, matched by PID. Processes not in table get 0.'''
+        column = table.columns[name]
+        return array(column.typecode, [column[idx] if idx >= 0 else 0
+                                       for idx in self._table_rows(table)])
+
+    def label(self, row):
+        '''Short name for a process, its command name and PID'''
+        command = self.commands[row].split()
+        name = command[0] if command else '?'
+        if not name.startswith('['):
+            # kernel threads such as [jbd2/dm-0-8] keep the whole name
+            name = name.rsplit('/', 1)[-1]
+        return '%s(%d)' % (name[:30], self.pids[row])
@@ -0,0 +1,138 @@
+import os
+import sys
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from pysosutils.utilities.cache import get_cache
+from pysosutils.utilities.color import Colors
+from pysosutils.utilities.table import format_table
+
+try:
+    import tracemalloc
+except ImportError:
+    # python 2 only has it through the pytracemalloc backport
+    tracemalloc = None
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+COLUMNS = ('name', 'wall', 'cpu', 'opened', 'bytes_read', 'cache_hits',
+           'peak_memory')
+HEADER = ('Name', 'Wall (s)', 'CPU (s)', 'Files Opened', 'Bytes Read',
+          'Cache Hits', 'Peak Memory')
+
+_profiler = None
+
+
+def enable_profiler():
+    '''Start profiling plugins and tests run from now on, replacing any
+    profiler that was already enabled'''
+    global _profiler
+    _profiler = Profiler()
+    return _profiler
+
+
+def get_profiler():
+    '''Return the enabled Profiler, or None'''
+    return _profiler
+
+
+def _cpu_time():
+    times = os.times()
+    return times[0] + times[1]
+
+
+def _max_rss():
+    '''Peak resident size of the process so far in bytes, or None'''
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # linux counts in kilobytes, macOS in bytes
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+class Profiler():
+    '''Timing and I/O counters for each plugin and test that is run.
+
+    CPU time and the file counters are for the whole process, so they are
+    only attributed correctly when one thing is measured at a time. Peak
+    memory is what was allocated through python while a measurement ran
+    when tracemalloc is available, as on python 3. Otherwise it is how
+    much the peak resident size of the process grew, which is 0 for
+    anything that stayed under an earlier peak. A measurement is marked
+    failed if its body raised.
+    '''
+
+    def __init__(self):
+        self.records = []
+
+    @contextmanager
+    def measure(self, kind, name, target):
+        cache = get_cache(target)
+        opened, read, hits = cache.opened, cache.bytes_read, cache.hits
+        tracing = tracemalloc is not None and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        rss = None if tracing else _max_rss()
+        wall, cpu = time.time(), _cpu_time()
+        failed = False
+        try:
+            yield
+        except Exception:
+            failed = True
+            raise
+        finally:
+            record = OrderedDict()
+            record['kind'] = kind
+            record['name'] = name
+            record['wall'] = round(time.time() - wall, 4)
+            record['cpu'] = round(_cpu_time() - cpu, 4)
+            record['opened'] = cache.opened - opened
+            record['bytes_read'] = cache.bytes_read - read
+            record['cache_hits'] = cache.hits - hits
+            record['peak_memory'] = None
+            if tracing:
+                record['peak_memory'] = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            elif rss is not None:
+                record['peak_memory'] = _max_rss() - rss
+            record['failed'] = failed
+            self.records.append(record)
+
+
+def profiled(kind, name, target):
+    '''Context manager that measures its body with the enabled profiler,
+    or does nothing if profiling is off'''
+    if _profiler is None:
+        return _noop()
+    return _profiler.measure(kind, name, target)
+
+
+@contextmanager
+def _noop():
+    yield
+
+
+def format_profile(records):
+    '''Return records as a table, slowest first, with FAILED after the
+    name of anything that raised'''
+    rows = []
+    for r in sorted(records, key=lambda r: r['wall'], reverse=True):
+        row = dict(r)
+        row['name'] = '%s %s' % (r['kind'], r['name'])
+        if r.get('failed'):
+            row['name'] += ' FAILED'
+        row['wall'] = '%.4f' % r['wall']
+        row['cpu'] = '%.4f' % r['cpu']
+        if r['peak_memory'] is None:
+            row['peak_memory'] = '-'
+        rows.append(row)
+    return format_table(rows, COLUMNS, HEADER)
+
+
+def render_profile(records):
+    Colors().bsection('\nProfile')
+    sys.stdout.write(format_profile(records))
@@ -0,0 +1,62 @@
+import sys
+from collections import OrderedDict
+from pysosutils.utilities.archive import report_name
+
+FORMATS = ('text', 'json', 'ndjson')
+
+
+def _default(obj):
+    '''Fallback for objects json doesn't know how to serialize'''
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    if hasattr(obj, '__dict__'):
+        return vars(obj)
+    return str(obj)
+
+
+def to_json(obj, indent=None):
+    # imported here so that text output doesn't pay for it
+    import json
+    return json.dumps(obj, default=_default, indent=indent)
+
+
+def plugin_record(name, target, result=None, failed=False, error=None):
+    '''Build the record emitted for one plugin in the structured
+    output formats'''
+    record = OrderedDict()
+    record['plugin'] = name
+    record['target'] = report_name(target)
+    record['failed'] = failed
+    record['error'] = error
+    record['result'] = result
+    return record
+
+
+class ResultWriter():
+    '''Writes plugin records in one of the structured output formats.
+
+    ndjson writes each record on its own line as soon as it is added,
+    while json holds them and writes one document for the report when
+    closed.
+    '''
+
+    def __init__(self, fmt, target, stream=None):
+        self.fmt = fmt
+        self.target = target
+        self.stream = stream or sys.stdout
+        self.records = []
+
+    def add(self, record):
+        if self.fmt == 'ndjson':
+            self.stream.write(to_json(record) + '\n')
+            self.stream.flush()
+        else:
+            self.records.append(record)
+
+    def close(self):
+        if self.fmt == 'json':
+            doc = OrderedDict()
+            doc['target'] = report_name(self.target)
+            doc['results'] = self.records
+            self.stream.write(to_json(doc, indent=2) + '\n')
+            self.stream.flush()
@@ -0,0 +1,347 @@
+import socket
+from array import array
+
+# route types ip route prints ahead of the destination, unicast is left out
+TYPES = ('unicast', 'local', 'broadcast', 'multicast', 'anycast',
+         'unreachable', 'blackhole', 'prohibit', 'throw', 'nat')
+# settings that are followed by a value, anything else is a flag
+SETTINGS = ('via', 'dev', 'proto', 'scope', 'src', 'metric', 'table', 'mtu',
+            'weight', 'expires', 'pref', 'realm', 'advmss', 'hoplimit',
+            'initcwnd', 'initrwnd', 'features', 'quickack', 'rto_min',
+            'tos', 'dsfield', 'from', 'encap', 'nhid', 'congctl')
+
+
+def _settings(tokens, route):
+    '''Fill route from the setting and flag tokens of a route line'''
+    flags = route.setdefault('flags', [])
+    pos = 0
+    while pos < len(tokens):
+        token = tokens[pos]
+        if token in SETTINGS and pos + 1 < len(tokens):
+            route[token] = tokens[pos + 1]
+            pos += 2
+        else:
+            flags.append(token)
+            pos += 1
+    return route
+
+
+def parse_route(line):
+    '''A dict for one line of ip route output, such as
+    default via 10.0.0.1 dev eth0 proto static metric 100. The
+    destination is kept as ip route prints it. Returns None for lines
+    that aren't routes.'''
+    tokens = line.split()
+    if not tokens:
+        return None
+    rtype = 'unicast'
+    if tokens[0] in TYPES:
+        rtype = tokens.pop(0)
+        if not tokens:
+            return None
+    route = {'type': rtype, 'dest': tokens[0], 'table': 'main',
+             'nexthops': []}
+    return _settings(tokens[1:], route)
+
+
+def parse_routes(data):
+    '''Every route in ip route output. The nexthop lines of a multipath
+    route are added to its nexthops, as dicts of their settings.'''
+    routes = []
+    for line in data.splitlines():
+        if not line.strip():
+            continue
+        if line[0].isspace():
+            tokens = line.split()
+            if routes and tokens[0] == 'nexthop':
+                routes[-1]['nexthops'].append(_settings(tokens[1:], {}))
+            continue
+        route = parse_route(line)
+        if route is not None:
+            routes.append(route)
+    return routes
+
+
+def parse_address(text):
+    '''(family, address as an int, bits in the family) for an IPv4 or
+    IPv6 address. Raises ValueError if text isn't one.'''
+    family = socket.AF_INET6 if ':' in text else socket.AF_INET
+    try:
+        packed = socket.inet_pton(family, text)
+    except (socket.error, ValueError):
+        raise ValueError('%s is not an IP address' % text)
+    value = 0
+    for byte in bytearray(packed):
+        value = (value << 8) | byte
+    return ('inet6' if family == socket.AF_INET6 else 'inet', value,
+            len(packed) * 8)
+
+
+def parse_prefix(text, family):
+    '''(address as an int, prefix length) for a route destination or
+    rule selector such as 10.0.0.0/8, ::1 or default'''
+    if text in ('default', 'all'):
+        return 0, 0
+    addr, sep, length = text.partition('/')
+    found, value, bits = parse_address(addr)
+    if found != family:
+        raise ValueError('%s is not an %s prefix' % (text, family))
+    length = int(length) if sep else bits
+    if not 0 <= length <= bits:
+        raise ValueError('bad prefix length in %s' % text)
+    return value & ~((1 << (bits - length)) - 1), length
+
+
+def _metric(route):
+    try:
+        return int(route.get('metric', 0))
+    except ValueError:
+        return 0
+
+
+class PrefixTrie():
+    '''Longest prefix match over the routes of one table.
+
+    A binary trie with runs of single-child nodes collapsed, so it has at
+    most two nodes per prefix, kept as parallel arrays rather than an
+    object per node. A lookup follows one path from the root, visiting
+    at most as many nodes as the address has bits, however many routes
+    there are.
+    '''
+
+    def __init__(self, bits):
+        self.bits = bits
+        # node -> prefix, its length, its children for a 0 and a 1 bit
+        # next, and the routes for exactly that prefix, best first
+        self.prefix = [0]
+        self.length = array('l', [0])
+        self.child = (array('l', [-1]), array('l', [-1]))
+        self.routes = [None]
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def _node(self, prefix, length):
+        self.prefix.append(prefix)
+        self.length.append(length)
+        self.child[0].append(-1)
+        self.child[1].append(-1)
+        self.routes.append(None)
+        return len(self.prefix) - 1
+
+    def _bit(self, value, pos):
+        '''The bit of value after its first pos bits'''
+        return (value >> (self.bits - pos - 1)) & 1
+
+    def _mask(self, value, length):
+        return value & ~((1 << (self.bits - length)) - 1)
+
+    def _add_route(self, node, route):
+        if self.routes[node] is None:
+            self.routes[node] = []
+        self.routes[node].append(route)
+        self.routes[node].sort(key=_metric)
+        self.count += 1
+
+    def insert(self, prefix, length, route):
+        '''Add a route for prefix/length. Routes for the same prefix are
+        kept lowest metric first.'''
+        bits = self.bits
+        lengths, prefixes, child = self.length, self.prefix, self.child
+        node = 0
+        while True:
+            depth = lengths[node]
+            if length == depth:
+                return self._add_route(node, route)
+            bit = (prefix >> (bits - depth - 1)) & 1
+            below = child[bit][node]
+            if below < 0:
+                leaf = self._node(prefix, length)
+                child[bit][node] = leaf
+                return self._add_route(leaf, route)
+            span = lengths[below]
+            if length < span:
+                span = length
+            diff = (prefix ^ prefixes[below]) >> (bits - span)
+            if not diff and span == lengths[below]:
+                node = below
+                continue
+            common = span - diff.bit_length() if diff else span
+            # the new prefix parts from the one below part way down, so a
+            # node for the part they share goes between them
+            mid = self._node(self._mask(prefix, common), common)
+            child[bit][node] = mid
+            child[self._bit(prefixes[below], common)][mid] = below
+            if common == length:
+                return self._add_route(mid, route)
+            leaf = self._node(prefix, length)
+            child[self._bit(prefix, common)][mid] = leaf
+            return self._add_route(leaf, route)
+
+    def lookup(self, address):
+        '''The routes for the longest prefix containing address, best
+        first, or None'''
+        bits = self.bits
+        lengths, prefixes, child = self.length, self.prefix, self.child
+        node = 0
+        best = self.routes[0]
+        while lengths[node] < bits:
+            node = child[(address >> (bits - lengths[node] - 1)) & 1][node]
+            if node < 0:
+                break
+            shift = bits - lengths[node]
+            if address >> shift != prefixes[node] >> shift:
+                break
+            if self.routes[node] is not None:
+                best = self.routes[node]
+        return best
+
+
+# rule selectors that can't be worked out from a destination and source
+# address alone, rules with any of these are never taken
+UNKNOWN_SELECTORS = ('iif', 'oif', 'fwmark', 'uidrange', 'ipproto', 'sport',
+                     'dport', 'tos', 'dsfield', 'l3mdev', 'not')
+# what the kernel starts with when there are no other rules
+DEFAULT_RULES = ['0:\tfrom all lookup local', '32766:\tfrom all lookup main',
+                 '32767:\tfrom all lookup default']
+
+
+def parse_rules(data):
+    '''Every rule in ip rule output, in priority order'''
+    rules = []
+    for line in data.splitlines():
+        priority, sep, rest = line.partition(':')
+        if not sep:
+            continue
+        try:
+            rule = {'priority': int(priority), 'flags': []}
+        except ValueError:
+            continue
+        tokens = rest.split()
+        pos = 0
+        while pos < len(tokens):
+            token = tokens[pos]
+            if token in ('lookup', 'table'):
+                token = 'table'
+            if token in TYPES:
+                rule['action'] = token
+                pos += 1
+            elif token == 'not' or pos + 1 >= len(tokens):
+                rule['flags'].append(token)
+                pos += 1
+            else:
+                rule[token] = tokens[pos + 1]
+                pos += 2
+        rules.append(rule)
+    rules.sort(key=lambda r: r['priority'])
+    return rules
+
+
+class RoutingTables():
+    '''Every routing table of a host, for both families, and the rules
+    that pick between them, answering which route a packet would take.'''
+
+    def __init__(self):
+        self.tables = {}
+        self.rules = {'inet': parse_rules('\n'.join(DEFAULT_RULES)),
+                      'inet6': parse_rules('\n'.join(DEFAULT_RULES))}
+
+    def add_routes(self, routes, family):
+        '''Add routes from parse_routes() for family inet or inet6'''
+        bits = 128 if family == 'inet6' else 32
+        for route in routes:
+            try:
+                prefix, length = parse_prefix(route['dest'], family)
+            except ValueError:
+                continue
+            key = (family, route['table'])
+            if key not in self.tables:
+                self.tables[key] = PrefixTrie(bits)
+            self.tables[key].insert(prefix, length, route)
+
+    def set_rules(self, rules, family):
+        '''Use rules from parse_rules() instead of the default ones'''
+        if rules:
+            self.rules[family] = rules
+
+    def summary(self):
+        '''Number of routes in each table'''
+        return [{'family': family, 'table': table,
+                 'routes': len(self.tables[(family, table)])}
+                for family, table in sorted(self.tables)]
+
+    def lookup(self, address, table='main'):
+        '''The best route in one table for an address, or None'''
+        family, value, bits = parse_address(address)
+        trie = self.tables.get((family, table))
+        routes = trie.lookup(value) if trie else None
+        return routes[0] if routes else None
+
+    def _selects(self, rule, family, dest, source):
+        for name in UNKNOWN_SELECTORS:
+            if name in rule or name in rule['flags']:
+                return False
+        for name, address in (('to', dest), ('from', source)):
+            if rule.get(name, 'all') == 'all':
+                continue
+            if address is None:
+                return False
+            prefix, length = parse_prefix(rule[name], family)
+            bits = 128 if family == 'inet6' else 32
+            if address >> (bits - length) != prefix >> (bits - length):
+                return False
+        return True
+
+    def resolve(self, address, source=None):
+        '''Follow the rules in priority order to the route a packet to
+        address, optionally from source, would take. Returns a dict of
+        the route and the rule and table it was found through, or None
+        if nothing matches.'''
+        family, dest, bits = parse_address(address)
+        src = None
+        if source is not None:
+            found, src, bits = parse_address(source)
+            if found != family:
+                raise ValueError('%s and %s are not the same family' %
+                                 (address, source))
+        rules = self.rules[family]
+        priorities = set(rule['priority'] for rule in rules)
+        skip_to = None
+        for rule in rules:
+            if skip_to is not None:
+                if rule['priority'] < skip_to:
+                    continue
+                skip_to = None
+            if not self._selects(rule, family, dest, src):
+                continue
+            if 'action' in rule:
+                # unreachable, blackhole or prohibit rules end the search
+                return {'rule': rule['priority'], 'table': '',
+                        'route': {'type': rule['action'], 'dest': 'all',
+                                  'table': ''}}
+            if 'goto' in rule:
+                # a goto skips ahead to the rule with that priority. Like
+                # the kernel, one to a rule that isn't there does nothing.
+                try:
+                    target = int(rule['goto'])
+                except ValueError:
+                    continue
+                if target > rule['priority'] and target in priorities:
+                    skip_to = target
+                continue
+            if 'table' not in rule:
+                # nop rules don't pick a table
+                continue
+            trie = self.tables.get((family, rule['table']))
+            routes = trie.lookup(dest) if trie else None
+            if not routes or routes[0]['type'] == 'throw':
+                continue
+            if 'suppress_prefixlength' in rule:
+                # routes this short, usually the default, are ignored
+                length = parse_prefix(routes[0]['dest'], family)[1]
+                if length <= int(rule['suppress_prefixlength']):
+                    continue
+            return {'rule': rule['priority'], 'table': rule['table'],
+                    'route': routes[0]}
+        return None
@@ -0,0 +1,120 @@
+import sys
+import threading
+from functools import partial
+from pysosutils.plugins import PLUGINS, get_plugin_class
+from pysosutils.utilities.profile import profiled
+from pysosutils.utilities.result import plugin_record
+
+
+class ThreadOutput():
+    '''Stand-in for sys.stdout that collects what each worker thread
+    prints into a buffer for that thread. Threads without a buffer
+    write straight through to the real stream.'''
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.local = threading.local()
+
+    def start(self):
+        self.local.buffer = []
+
+    def finish(self):
+        text = ''.join(self.local.buffer)
+        self.local.buffer = None
+        return text
+
+    def write(self, text):
+        buf = getattr(self.local, 'buffer', None)
+        if buf is None:
+            self.stream.write(text)
+        else:
+            if not isinstance(text, str):
+                text = text.encode('utf-8')
+            buf.append(text)
+
+    def flush(self):
+        if getattr(self.local, 'buffer', None) is None:
+            self.stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+def load_plugins(target, args):
+    '''Returns an instance for target of every plugin enabled in args.
+    Only the modules of those plugins are imported.'''
+    return [get_plugin_class(name)(target, args) for name in PLUGINS
+            if args.get(name)]
+
+
+def run_plugin(plugin, structured=False):
+    '''Run a single plugin, keeping a failure from affecting any
+    other plugin. When structured is set only collect() is run and
+    nothing is rendered.'''
+    try:
+        with profiled('plugin', plugin.__class__.__name__, plugin.target):
+            if structured:
+                plugin.result = plugin.get_result()
+            else:
+                plugin.parse()
+    except Exception as e:
+        print(e)
+        plugin.parse_failed = True
+        plugin.error = str(e) or e.__class__.__name__
+
+
+def _run_buffered(output, plugin, structured=False):
+    output.start()
+    try:
+        run_plugin(plugin, structured)
+    finally:
+        text = output.finish()
+    return text
+
+
+def run_plugins(plugins, jobs=1, writer=None):
+    '''Run each plugin in the order given.
+
+    With jobs greater than 1 the plugins run on a pool of that many
+    threads. What each plugin prints is held back until every plugin
+    before it has been written out, so the output is the same as a
+    serial run.
+
+    If a ResultWriter is given, plugins are only collected and each
+    one's record is handed to the writer in order. Anything a plugin
+    prints along the way is sent to stderr so it can't end up mixed
+    into the records.
+    '''
+    structured = writer is not None
+    if not plugins:
+        return
+    if not structured and (jobs <= 1 or len(plugins) < 2):
+        for plugin in plugins:
+            run_plugin(plugin)
+        return
+    # only pay for importing multiprocessing when it is used
+    from multiprocessing.pool import ThreadPool
+    output = ThreadOutput(sys.stdout)
+    pool = ThreadPool(max(1, min(jobs, len(plugins))))
+    sys.stdout = output
+    run = partial(_run_buffered, output, structured=structured)
+    try:
+        # imap hands results back in submission order as soon as each
+        # one and all before it are done
+        for i, text in enumerate(pool.imap(run, plugins)):
+            if not structured:
+                output.stream.write(text)
+                output.stream.flush()
+                continue
+            if text:
+                sys.stderr.write(text)
+            plugin = plugins[i]
+            writer.add(plugin_record(plugin.__class__.__name__,
+                                     plugin.target,
+                                     plugin.result,
+                                     plugin.parse_failed,
+                                     plugin.error))
+    finally:
+        sys.stdout = output.stream
+        pool.close()
+        pool.join()
@@ -0,0 +1,69 @@
+class SectionIndex():
+    '''Key/value sections of command output such as dmidecode, ethtool
+    or ifconfig, found in a single pass over the file.
+
+    A section starts at any line that isn't indented and runs until the
+    next empty line. It can be looked up by the whole header line or by
+    any leading part of it that ends at whitespace, so 'Settings' finds
+    'Settings for eth0:'. Every line of the section after its header
+    that contains a ':' becomes an entry, keyed on the text before the
+    first ':' and valued with the text after it.
+    '''
+
+    def __init__(self, lines):
+        self.headers = {}
+        self._items = []
+        self._sections = {}
+        pending = []
+        for num, line in enumerate(lines):
+            if not line:
+                self._close(pending, num)
+                pending = []
+                self._items.append(None)
+                continue
+            if not line[0].isspace():
+                pending.append((num, line))
+            self._items.append(self._split(line))
+        self._close(pending, len(self._items))
+
+    @classmethod
+    def from_data(cls, data):
+        return cls(data.splitlines())
+
+    def _split(self, line):
+        parts = line.strip().split(':')
+        if len(parts) < 2:
+            return None
+        return parts[0], parts[1].strip()
+
+    def _close(self, headers, end):
+        '''Record every header line of a block that ended at line end'''
+        for num, line in headers:
+            for key in self._keys(line):
+                self.headers.setdefault(key, []).append((num + 1, end))
+
+    def _keys(self, line):
+        keys = [line[:i] for i, char in enumerate(line) if char.isspace()]
+        keys.append(line)
+        return set(keys)
+
+    def __contains__(self, header):
+        return header in self.headers
+
+    def _section(self, span):
+        if span not in self._sections:
+            self._sections[span] = dict(
+                item for item in self._items[span[0]:span[1]] if item)
+        # callers are free to modify what they get back
+        return dict(self._sections[span])
+
+    def sections(self, header):
+        '''Return every section with the given header, in file order'''
+        return [self._section(span) for span in self.headers.get(header, [])]
+
+    def section(self, header):
+        '''Return the last section with the given header, or None'''
+        spans = self.headers.get(header)
+        if not spans:
+            return None
+        return self._section(spans[-1])
@@ -0,0 +1,134 @@
+import fnmatch
+import os
+import posixpath
+
+try:
+    from os import scandir
+except ImportError:
+    try:
+        from scandir import scandir
+    except ImportError:
+        scandir = None
+
+
+class TreeSnapshot():
+    '''Every file in a sosreport and its size, listed once.
+
+    A directory report is walked a single time, with os.scandir where it
+    is available, and a tarball is listed from the archive's member
+    index. After that, whether a file exists, how big it is and which
+    files match a glob are all answered from memory, with no stat or open
+    per question. That matters on NFS, where every probe is a round trip.
+
+    Paths are relative to the report root. Directories reached through a
+    symlink aren't walked, so for paths under one the snapshot can't say
+    and known() is False.
+    '''
+
+    def __init__(self, files=None, dirs=None, linked=()):
+        # relative path -> size, for regular files and links to them
+        self.files = files or {}
+        # relative directory -> names of the files directly in it
+        self.dirs = dirs or {}
+        self.linked = set(linked)
+
+    @classmethod
+    def from_directory(cls, root):
+        '''Walk a report directory once'''
+        snap = cls()
+        pending = ['']
+        while pending:
+            rel = pending.pop()
+            names = snap.dirs.setdefault(rel, [])
+            try:
+                entries = snap._list(os.path.join(root, rel))
+            except OSError:
+                continue
+            for name, is_dir, is_link, size in entries:
+                path = posixpath.join(rel, name) if rel else name
+                if is_dir:
+                    if is_link:
+                        snap.linked.add(path)
+                    else:
+                        pending.append(path)
+                elif size is not None:
+                    snap.files[path] = size
+                    names.append(name)
+        return snap
+
+    def _list(self, path):
+        '''(name, is_dir, is_link, size) for each entry of a directory,
+        with size None for anything that isn't a regular file or a link
+        to one'''
+        listing = []
+        if scandir is not None:
+            for entry in scandir(path):
+                is_dir = entry.is_dir()
+                size = None
+                if not is_dir:
+                    try:
+                        if entry.is_file():
+                            size = entry.stat().st_size
+                    except OSError:
+                        pass
+                listing.append((entry.name, is_dir, entry.is_symlink(),
+                                size))
+            return listing
+        for name in os.listdir(path):
+            full = os.path.join(path, name)
+            is_dir = os.path.isdir(full)
+            size = None
+            if not is_dir and os.path.isfile(full):
+                size = os.path.getsize(full)
+            listing.append((name, is_dir, os.path.islink(full), size))
+        return listing
+
+    @classmethod
+    def from_archive(cls, archive):
+        '''List a tarball from the member index of an ArchiveReport'''
+        snap = cls()
+        for rel in archive.members:
+            member = archive.member(rel)
+            if member is None or not member.isfile():
+                continue
+            snap.files[rel] = member.size
+            parent, name = posixpath.split(rel)
+            snap.dirs.setdefault(parent, []).append(name)
+        return snap
+
+    def known(self, rel):
+        '''False if rel is under a directory symlink, which the snapshot
+        didn't walk, or outside of the report'''
+        rel = posixpath.normpath(rel)
+        if rel.startswith('..'):
+            return False
+        # look up each parent directory rather than scanning every link
+        end = rel.find('/')
+        while end != -1:
+            if rel[:end] in self.linked:
+                return False
+            end = rel.find('/', end + 1)
+        return True
+
+    def exists(self, rel):
+        return posixpath.normpath(rel) in self.files
+
+    def size(self, rel):
+        '''Size of a file in bytes, or None if it doesn't exist'''
+        return self.files.get(posixpath.normpath(rel))
+
+    def glob(self, pattern):
+        '''Files matching a shell pattern such as
+        sos_commands/networking/ethtool_-S_*, sorted. Only the directory
+        named by the pattern is looked at when it has no wildcards.'''
+        parent, name = posixpath.split(pattern)
+        if not any(c in parent for c in '*?['):
+            names = fnmatch.filter(self.dirs.get(parent, []), name)
+            return sorted(posixpath.join(parent, n) if parent else n
+                          for n in names)
+        return sorted(fnmatch.filter(self.files, pattern))
+
+    def find(self, basename):
+        '''Files with the given name anywhere in the report, sorted'''
+        return sorted(rel for rel in self.files
+                      if posixpath.basename(rel) == basename)
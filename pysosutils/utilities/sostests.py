@@ -1,10 +1,9 @@
-import inspect
-import os
 import sys
 
+from pysosutils.sostests import TESTS, get_test_class
 from pysosutils.utilities.color import Colors as c
 from pysosutils.utilities.plugin import Plugin
-from distutils.sysconfig import get_python_lib
+from pysosutils.utilities.profile import profiled
 
 
 class SosTests():
@@ -19,27 +18,31 @@ class SosTests():
         enabled_for = ()
         packages = []
 
+    @property
+    def _module_name(self):
+        return self.__module__.rsplit('.', 1)[-1].replace('tests', '')
+
     def setup(self):
         pass
 
     def succeed(self, reason='OK'):
         check = {}
-        check['module'] = self.__module__.replace('tests', '')
-        check['name'] = inspect.stack()[1][3].replace('run_', '')
+        check['module'] = self._module_name
+        check['name'] = sys._getframe(1).f_code.co_name.replace('run_', '')
         check['reason'] = reason
         self.passed.append(check)
 
     def fail(self, reason):
         check = {}
-        check['module'] = self.__module__.replace('tests', '')
-        check['name'] = inspect.stack()[1][3].replace('run_', '')
+        check['module'] = self._module_name
+        check['name'] = sys._getframe(1).f_code.co_name.replace('run_', '')
         check['reason'] = reason
         self.failed.append(check)
 
     def warn(self, reason):
         check = {}
-        check['module'] = self.__module__.replace('tests', '')
-        check['name'] = inspect.stack()[1][3].replace('run_', '')
+        check['module'] = self._module_name
+        check['name'] = sys._getframe(1).f_code.co_name.replace('run_', '')
         check['reason'] = reason
         self.warned.append(check)
 
@@ -63,10 +66,15 @@ class SosChecker(Plugin):
         self.pprint = c()
         self.packages = self.get_all_packages()
 
-    def run_all_tests(self):
+    def collect(self):
         self.init_enabled_tests()
-        res = self.run_enabled_tests()
-        self.report_results(res)
+        return self.run_enabled_tests()
+
+    def render(self, result):
+        self.report_results(result)
+
+    def run_all_tests(self):
+        self.parse()
 
     def report_results(self, results):
         self.pprint.bsection('\nTest Results')
@@ -107,7 +115,9 @@ class SosChecker(Plugin):
             for i in dir(t):
                 if i.startswith('run_'):
                     result = getattr(t, i)
-                    result()
+                    with profiled('test', '%s.%s' % (t._module_name, i[4:]),
+                                  self.target):
+                        result()
             res = t.return_results()
             for test in res:
                 if res[test]:
@@ -119,20 +129,9 @@ class SosChecker(Plugin):
         self.test = {}
         self.run_tests = []
 
-        if 'pysosutils' not in os.listdir(os.getcwd()):
-            p = get_python_lib()
-            path = p + '/pysosutils/sostests/'
-        else:
-            path = 'pysosutils/sostests/'
-
-        sys.path.insert(0, path)
-        for f in sorted(os.listdir(path)):
-            fname, ext = os.path.splitext(f)
-            if ext == '.py':
-                mod = __import__(fname)
-                class_ = getattr(mod, fname)
-                self.test[fname] = class_(self.target)
-        sys.path.pop(0)
+        for name in TESTS:
+            self.test[name] = get_test_class(name)(self.target)
+        pkgdb = self.get_package_db()
         for t in self.test:
             try:
                 m = self.test[t]
@@ -144,10 +143,8 @@ class SosChecker(Plugin):
                 if hasattr(m, 'packages') and hasattr(m, 'enabled_for'):
                     pkgs = m.packages
                     for pkg in pkgs:
-                        for p in self.packages:
-                            if pkg in p:
-                                self.run_tests.append(m)
-                                break
+                        if pkgdb.search(pkg):
+                            self.run_tests.append(m)
                 if hasattr(m, 'enabled_for') and not hasattr(m, 'packages'):
                     for plug in self.plugins:
                         if plug in m.enabled_for:
@@ -155,8 +152,7 @@ class SosChecker(Plugin):
                                 self.run_tests.append(m)
                             else:
                                 for pkg in m.packages:
-                                    for p in self.packages:
-                                        if pkg in p:
-                                            self.run_tests.append(m)
+                                    if pkgdb.search(pkg):
+                                        self.run_tests.append(m)
             except:
                 pass
@@ -0,0 +1,220 @@
+import os
+import stat
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+DEFAULT_DIR = os.path.join(os.environ.get('XDG_CACHE_HOME',
+                                          os.path.expanduser('~/.cache')),
+                           'pysos')
+
+_store = None
+
+
+def enable_store(directory=None):
+    '''Turn on the persistent result store for this process and any
+    worker processes it starts afterwards'''
+    global _store
+    _store = ResultStore(directory or DEFAULT_DIR)
+    return _store
+
+
+def get_store():
+    '''Return the enabled ResultStore, or None'''
+    return _store
+
+
+def _ordered(obj):
+    '''Copy of obj with every dict replaced by an OrderedDict, so that
+    results iterate in the same order after a round trip through pickle
+    as they did when they were collected'''
+    if isinstance(obj, dict):
+        return OrderedDict((k, _ordered(v)) for k, v in obj.items())
+    if isinstance(obj, list):
+        return [_ordered(v) for v in obj]
+    return obj
+
+
+def _package_files():
+    '''Every python file of the pysosutils package, in a fixed order.
+    A plugin's result can depend on any of them, such as the parsers in
+    utilities, not only on the modules its class is from.'''
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    files = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        files.extend(os.path.join(dirpath, name)
+                     for name in sorted(filenames) if name.endswith('.py'))
+    return files
+
+
+class ResultStore():
+    '''Plugin results kept on disk between runs, in a SQLite database.
+
+    A result is stored under a key made from the report's real path, the
+    plugin, the size and mtime of every file of the pysosutils package
+    and any options that change what it collects. Alongside it is the
+    size, mtime and SHA-1 of every file the plugin looked at while
+    collecting, including files it found to be missing, and what each of
+    its globs and finds matched. A stored result is only used while all
+    of those still match.
+    Files whose mtime changed but whose size didn't are hashed again, so a
+    copied or re-extracted report still hits.
+
+    For a tarball the archive itself is the only file fingerprinted,
+    which lets a fully cached tarball be answered without opening it.
+
+    sqlite3, json and hashlib are imported by the methods that use them,
+    so runs without --cache don't load them.
+    '''
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.path = os.path.join(directory, 'results.sqlite')
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        self._digests = {}
+        self._code = None
+
+    def _db(self):
+        # sqlite connections can't be shared between threads, or across
+        # the fork into batch workers
+        db = getattr(self._local, 'db', None)
+        if db is None or self._local.pid != os.getpid():
+            import sqlite3
+            if not os.path.isdir(self.directory):
+                try:
+                    os.makedirs(self.directory)
+                except OSError:
+                    if not os.path.isdir(self.directory):
+                        raise
+            db = sqlite3.connect(self.path, timeout=30)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('CREATE TABLE IF NOT EXISTS results ('
+                       'key TEXT PRIMARY KEY, plugin TEXT, target TEXT, '
+                       'sources TEXT, result BLOB, stored REAL)')
+            self._local.db = db
+            self._local.pid = os.getpid()
+        return db
+
+    def _key(self, plugin):
+        import hashlib
+        import json
+        if self._code is None:
+            self._code = [[path, self._stat(path)]
+                          for path in _package_files()]
+        options = dict((opt, plugin.options.get(opt))
+                       for opt in plugin.cache_options)
+        key = [os.path.realpath(plugin.target), plugin.__class__.__name__,
+               self._code, options]
+        return hashlib.sha1(json.dumps(key, sort_keys=True)).hexdigest()
+
+    def _stat(self, path):
+        '''(size, mtime) of a regular file, or None'''
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        if not stat.S_ISREG(st.st_mode):
+            return None
+        return [st.st_size, st.st_mtime]
+
+    def _digest(self, path, st):
+        key = (path, st[0], st[1])
+        if key not in self._digests:
+            import hashlib
+            sha = hashlib.sha1()
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1048576), b''):
+                    sha.update(chunk)
+            self._digests[key] = sha.hexdigest()
+        return self._digests[key]
+
+    def _sources(self, plugin, paths, queries):
+        cache = plugin.cache
+        if cache.is_archive:
+            # the archive's own fingerprint covers what is in it
+            paths = [cache.target.rstrip('/')]
+            queries = {}
+        files = []
+        for path in sorted(paths):
+            path = os.path.abspath(path)
+            st = self._stat(path)
+            if st is None:
+                files.append([path, None, None, None])
+            else:
+                files.append([path, st[0], st[1], self._digest(path, st)])
+        globs = [[method, arg, found] for (method, arg), found
+                 in sorted(queries.items())]
+        return {'files': files, 'globs': globs}
+
+    def _fresh(self, plugin, sources):
+        for path, size, mtime, digest in sources['files']:
+            st = self._stat(path)
+            if st is None or size is None:
+                if st is not None or size is not None:
+                    return False
+                continue
+            if st == [size, mtime]:
+                continue
+            if st[0] != size or self._digest(path, st) != digest:
+                return False
+        # a file added to the report can change what a glob matches
+        # without changing any file the result was read from
+        for method, arg, found in sources['globs']:
+            if getattr(plugin.cache, method)(arg) != found:
+                return False
+        return True
+
+    def fetch(self, plugin):
+        '''Return plugin.collect(), from the store if the files it was
+        built from are unchanged, otherwise collecting and storing it'''
+        if not plugin.persistent:
+            return plugin.collect()
+        import json
+        import sqlite3
+        key = self._key(plugin)
+        try:
+            row = self._db().execute('SELECT sources, result FROM results '
+                                     'WHERE key = ?', (key,)).fetchone()
+        except sqlite3.Error:
+            row = None
+        if row is not None and self._fresh(plugin, json.loads(row[0])):
+            try:
+                result = pickle.loads(bytes(row[1]))
+                self.hits += 1
+                return result
+            except Exception:
+                pass
+        self.misses += 1
+        plugin.cache.track()
+        try:
+            result = plugin.collect()
+        finally:
+            paths, queries = plugin.cache.tracked()
+        self.save(key, plugin, paths, queries, result)
+        return result
+
+    def save(self, key, plugin, paths, queries, result):
+        import json
+        import sqlite3
+        try:
+            blob = pickle.dumps(_ordered(result), 2)
+            sources = json.dumps(self._sources(plugin, paths, queries))
+            db = self._db()
+            with db:
+                db.execute('INSERT OR REPLACE INTO results VALUES '
+                           '(?, ?, ?, ?, ?, ?)',
+                           (key, plugin.__class__.__name__,
+                            os.path.realpath(plugin.target), sources,
+                            sqlite3.Binary(blob), time.time()))
+        except (sqlite3.Error, pickle.PicklingError, IOError, OSError):
+            # the store only saves time, a result that can't be kept is
+            # still returned to the caller
+            pass
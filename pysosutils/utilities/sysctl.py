@@ -0,0 +1,131 @@
+import fnmatch
+from collections import OrderedDict
+
+GLOB_CHARS = ('*', '?', '[')
+
+
+class SysctlIndex():
+    '''Parsed contents of sysctl -a output.
+
+    Values are kept in a dict for exact lookups, and names are also
+    stored in a trie keyed on their dotted components so that prefix
+    and glob queries only visit the part of the tree they can match.
+    Every query returns an OrderedDict in the order sysctl -a printed
+    the settings.
+    '''
+
+    def __init__(self, lines):
+        self.values = OrderedDict()
+        self.trie = {}
+        self._order = {}
+        self._searches = {}
+        for line in lines:
+            name, sep, value = line.partition(' = ')
+            if not sep:
+                if not line.rstrip().endswith(' ='):
+                    # error output such as 'sysctl: permission denied'
+                    continue
+                name = line.rstrip()[:-2]
+            name = name.strip()
+            if not name or ' ' in name:
+                continue
+            self.values[name] = ' '.join(value.split())
+            self._order.setdefault(name, len(self._order))
+            node = self.trie
+            for part in name.split('.'):
+                node = node.setdefault(part, {})
+            node[None] = name
+
+    @classmethod
+    def from_data(cls, data):
+        return cls(data.splitlines())
+
+    def __len__(self):
+        return len(self.values)
+
+    def __contains__(self, name):
+        return name in self.values
+
+    def get(self, name, default=None):
+        '''Return the value of a single sysctl'''
+        return self.values.get(name, default)
+
+    def _node(self, parts):
+        node = self.trie
+        for part in parts:
+            if part not in node:
+                return None
+            node = node[part]
+        return node
+
+    def _names_under(self, node):
+        names = []
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            for key, child in node.items():
+                if key is None:
+                    names.append(child)
+                else:
+                    stack.append(child)
+        return names
+
+    def _select(self, names):
+        # put matches back into the order sysctl -a printed them in
+        names = sorted(names, key=self._order.__getitem__)
+        return OrderedDict((n, self.values[n]) for n in names)
+
+    def prefix(self, prefix):
+        '''Return all sysctls under a dotted prefix. 'net.ipv4',
+        'net.ipv4.' and 'net.ipv4.*' are equivalent, while a partial
+        last component such as 'net.ipv4.tcp_' matches any component
+        starting with it.'''
+        if prefix.endswith('*'):
+            prefix = prefix[:-1]
+        parts = prefix.split('.')
+        last = parts.pop()
+        node = self._node(parts)
+        if node is None:
+            return OrderedDict()
+        if last:
+            nodes = [child for key, child in node.items()
+                     if key is not None and key.startswith(last)]
+        else:
+            nodes = [node]
+        names = []
+        for node in nodes:
+            names.extend(self._names_under(node))
+        return self._select(names)
+
+    def glob(self, pattern):
+        '''Return all sysctls matching a shell style pattern such as
+        'net.ipv4.conf.*.rp_filter'. Leading components without
+        wildcards are resolved through the trie.'''
+        parts = pattern.split('.')
+        literal = []
+        for part in parts:
+            if any(c in part for c in GLOB_CHARS):
+                break
+            literal.append(part)
+        if len(literal) == len(parts):
+            if pattern in self.values:
+                return OrderedDict([(pattern, self.values[pattern])])
+            return OrderedDict()
+        node = self._node(literal)
+        if node is None:
+            return OrderedDict()
+        return self._select(n for n in self._names_under(node)
+                            if fnmatch.fnmatchcase(n, pattern))
+
+    def search(self, text):
+        '''Return all sysctls whose name contains text'''
+        if text not in self._searches:
+            self._searches[text] = [n for n in self.values if text in n]
+        return OrderedDict((n, self.values[n]) for n in self._searches[text])
+
+    def query(self, pattern):
+        '''Dispatch to glob() for patterns with wildcards and to search()
+        for anything else'''
+        if any(c in pattern for c in GLOB_CHARS):
+            return self.glob(pattern)
+        return self.search(pattern)
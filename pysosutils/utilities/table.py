@@ -0,0 +1,62 @@
+import heapq
+from itertools import islice
+from operator import itemgetter
+
+
+def select_rows(data, sort_by_key=None, reverse=False, limit=None):
+    '''Return the rows of data to show as a new list, sorted on
+    sort_by_key and cut down to the first limit rows.
+
+    With both a sort key and a limit, the rows are picked with a heap so
+    only limit of them are ever ordered. The result is the same as
+    sorting everything, ties included.
+    '''
+    if sort_by_key:
+        key = itemgetter(sort_by_key)
+        if limit:
+            pick = heapq.nlargest if reverse else heapq.nsmallest
+            return pick(limit, data, key=key)
+        return sorted(data, key=key, reverse=reverse)
+    if limit:
+        return list(islice(data, limit))
+    return list(data)
+
+
+def column_widths(rows, keys, header=None):
+    '''Width of each column, found in a single pass over rows'''
+    if header:
+        widths = [len(str(name)) for name in header]
+    else:
+        widths = [0] * len(keys)
+    for row in rows:
+        for i, key in enumerate(keys):
+            width = len(str(row.get(key, '')))
+            if width > widths[i]:
+                widths[i] = width
+    return widths
+
+
+def iter_table(rows, keys, header=None, widths=None):
+    '''Yield the lines of a table of rows, which are dicts, showing keys.
+
+    If widths is given rows are formatted as they are read, so a table
+    can be written out without holding all of it. Otherwise rows are
+    read once up front to size the columns.
+    '''
+    if widths is None:
+        rows = rows if isinstance(rows, list) else list(rows)
+        widths = column_widths(rows, keys, header)
+    fmt = ' '.join('%%-%ds' % width for width in widths)
+    if header:
+        yield fmt % tuple(header)
+        yield fmt % tuple('-' * len(name) for name in header)
+    for row in rows:
+        yield fmt % tuple(row.get(key, '') for key in keys)
+
+
+def format_table(rows, keys, header=None):
+    '''Return a whole table as a single string, one line per row'''
+    lines = list(iter_table(rows, keys, header))
+    if not lines:
+        return ''
+    return '\n'.join(lines) + '\n'
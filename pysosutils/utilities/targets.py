@@ -0,0 +1,27 @@
+import glob
+import os
+
+from pysosutils.utilities.archive import is_archive
+
+
+def find_targets(patterns):
+    '''Expand sosreport directories, tarballs and globs into a list of
+    unique targets, each ending in a /. Returns the targets and the
+    patterns that didn't name or match any sosreport.'''
+    if isinstance(patterns, str):
+        patterns = [patterns]
+    targets = []
+    missing = []
+    seen = set()
+    for pattern in patterns:
+        paths = [path for path in sorted(glob.glob(pattern))
+                 if os.path.isdir(path) or is_archive(path)]
+        if not paths:
+            missing.append(pattern)
+            continue
+        for path in paths:
+            target = path.rstrip('/') + '/'
+            if target not in seen:
+                seen.add(target)
+                targets.append(target)
+    return targets, missing
@@ -0,0 +1,95 @@
+import heapq
+
+try:
+    intern
+except NameError:
+    from sys import intern
+
+# header names each column may have in thread level ps output
+USER = ('UID', 'USER')
+PID = ('PID',)
+STATE = ('S', 'STAT')
+COMMAND = ('CMD', 'COMMAND')
+
+
+def _column(header, names):
+    for name in names:
+        if name in header:
+            return header.index(name)
+    raise ValueError('ps output has no %s column' % names[0])
+
+
+class ThreadSummary():
+    '''Thread counts from ps output with a line per thread, such as
+    ps -elfL, built in one pass over its lines.
+
+    Only counters are kept: threads per process, per state and per user,
+    and the command of each process. No thread is held on to, so a file
+    of any size can be read straight from a MappedFile.
+    '''
+
+    def __init__(self, lines):
+        self.threads = 0
+        self.by_pid = {}
+        self.by_state = {}
+        self.by_user = {}
+        self.owners = {}
+        self.commands = {}
+        lines = iter(lines)
+        header = next(lines, '').split()
+        if header:
+            self._count(header, lines)
+
+    def _count(self, header, lines):
+        user_col = _column(header, USER)
+        pid_col = _column(header, PID)
+        state_col = _column(header, STATE)
+        cmd_col = _column(header, COMMAND)
+        by_pid, by_state, by_user = self.by_pid, self.by_state, self.by_user
+        threads = 0
+        for line in lines:
+            fields = line.split(None, cmd_col)
+            if len(fields) <= cmd_col:
+                continue
+            try:
+                pid = int(fields[pid_col])
+            except ValueError:
+                continue
+            threads += 1
+            state = fields[state_col]
+            user = fields[user_col]
+            by_state[state] = by_state.get(state, 0) + 1
+            by_user[user] = by_user.get(user, 0) + 1
+            if pid in by_pid:
+                by_pid[pid] += 1
+            else:
+                by_pid[pid] = 1
+                self.owners[pid] = intern(user)
+                self.commands[pid] = fields[cmd_col].strip()[:100]
+        self.threads = threads
+
+    @property
+    def processes(self):
+        return len(self.by_pid)
+
+    def top_processes(self, limit):
+        '''The processes with the most threads, most first'''
+        pids = heapq.nlargest(limit, self.by_pid, key=self.by_pid.get)
+        return [{'pid': pid, 'user': self.owners[pid],
+                 'threads': self.by_pid[pid], 'command': self.commands[pid]}
+                for pid in pids]
+
+    def top_users(self, limit):
+        '''The users running the most threads, most first'''
+        users = heapq.nlargest(limit, self.by_user, key=self.by_user.get)
+        procs = dict((user, 0) for user in users)
+        for user in self.owners.values():
+            if user in procs:
+                procs[user] += 1
+        return [{'user': user, 'threads': self.by_user[user],
+                 'processes': procs[user]} for user in users]
+
+    def states(self):
+        '''Number of threads in each state, most common first'''
+        return [{'state': state, 'threads': count} for state, count in
+                sorted(self.by_state.items(), key=lambda s: (-s[1], s[0]))]
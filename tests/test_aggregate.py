@@ -0,0 +1,96 @@
+import unittest
+
+from pysosutils.utilities.proctable import (ProcessTable, parse_filter,
+                                            parse_metric)
+from tests.test_proctable import PS
+
+
+class ParseMetricTest(unittest.TestCase):
+
+    def test_valid(self):
+        self.assertEqual(parse_metric('count'), ('count', None, None))
+        self.assertEqual(parse_metric(' sum:rssmb '), ('sum', 'rssmb', None))
+        self.assertEqual(parse_metric('max:cpu'), ('max', 'cpu', None))
+        self.assertEqual(parse_metric('p95:vsz'), ('p95', 'vsz', 95.0))
+        self.assertEqual(parse_metric('p99.9:rss'), ('p99.9', 'rss', 99.9))
+
+    def test_invalid(self):
+        for spec in ['avg:cpu', 'sum', 'sum:user', 'sum:nope', 'p:cpu',
+                     'p101:cpu', 'pfoo:cpu', 'count:cpu', '']:
+            self.assertRaises(ValueError, parse_metric, spec)
+
+
+class ParseFilterTest(unittest.TestCase):
+
+    def test_comparisons(self):
+        self.assertEqual(parse_filter('rssmb>100')[:3], ('rssmb', '>', 100.0))
+        self.assertEqual(parse_filter('cpu >= 1.5')[:3], ('cpu', '>=', 1.5))
+        self.assertEqual(parse_filter('pid<=10')[:3], ('pid', '<=', 10.0))
+        self.assertEqual(parse_filter('user!=root')[:3],
+                         ('user', '!=', 'root'))
+        self.assertEqual(parse_filter('cmd~java')[:3],
+                         ('shortcmd', '~', 'java'))
+
+    def test_state_alias(self):
+        column, op, value, key = parse_filter('state=D')
+        self.assertEqual((column, op, value), ('stat', '=', 'D'))
+        self.assertEqual(key('D+'), 'D')
+
+    def test_invalid(self):
+        for spec in ['rssmb', 'nope=1', 'rssmb>lots', 'cpu~1',
+                     'user>root', '=root']:
+            self.assertRaises(ValueError, parse_filter, spec)
+
+
+class AggregateTest(unittest.TestCase):
+
+    def setUp(self):
+        self.table = ProcessTable.from_data(PS)
+
+    def aggregate(self, by, metrics, filters=(), limit=None):
+        return self.table.aggregate(by, [parse_metric(m) for m in metrics],
+                                    [parse_filter(f) for f in filters],
+                                    limit)
+
+    def test_count_and_sum(self):
+        report = self.aggregate('user', ['count', 'sum:cpu'])
+        self.assertEqual([(e['user'], e['count'], e['sum_cpu'])
+                          for e in report],
+                         [('root', 3, 0.0), ('apache', 2, 42.5),
+                          ('java', 1, 75.5)])
+
+    def test_sorted_on_first_metric(self):
+        report = self.aggregate('user', ['sum:rssmb', 'count'])
+        self.assertEqual([e['user'] for e in report],
+                         ['java', 'apache', 'root'])
+        self.assertEqual(len(self.aggregate('user', ['count'], limit=2)), 2)
+
+    def test_max_and_percentile(self):
+        report = self.aggregate('user', ['max:cpu', 'p50:vsz', 'p95:vsz'])
+        apache = [e for e in report if e['user'] == 'apache'][0]
+        self.assertEqual(apache['max_cpu'], 30.0)
+        self.assertEqual(apache['p50_vsz'], 500000)
+        self.assertEqual(apache['p95_vsz'], 600000)
+
+    def test_state_groups_fold_flags(self):
+        report = self.aggregate('state', ['count'])
+        self.assertEqual(dict((e['state'], e['count']) for e in report),
+                         {'S': 4, 'R': 1, 'D': 1})
+
+    def test_filters(self):
+        report = self.aggregate('user', ['count'], ['rssmb>100'])
+        self.assertEqual([(e['user'], e['count']) for e in report],
+                         [('apache', 2), ('java', 1)])
+        report = self.aggregate('cmd', ['count'],
+                                ['user!=root', 'cmd~httpd'])
+        self.assertEqual([(e['cmd'], e['count']) for e in report],
+                         [('/usr/sbin/httpd', 2)])
+        self.assertEqual(self.aggregate('user', ['count'], ['pid<0']), [])
+
+    def test_bad_group(self):
+        self.assertRaises(ValueError, self.aggregate, 'cpu', ['count'])
+        self.assertRaises(ValueError, self.aggregate, 'nope', ['count'])
+
+
+if __name__ == '__main__':
+    unittest.main()
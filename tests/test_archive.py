@@ -0,0 +1,86 @@
+import os
+import shutil
+import tarfile
+import tempfile
+import unittest
+
+from pysosutils.utilities.archive import ArchiveError, ArchiveReport
+
+
+class ArchiveReportTest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        report = os.path.join(self.root, 'sosreport-bench')
+        self.files = {}
+        for i in range(30):
+            self.write(report, 'proc/net/f%02d' % i, 'file %d\n' % i)
+        self.write(report, 'etc/hostname', 'bench\n')
+        self.write(report, 'sos_commands/networking/ip_addr', 'addr\n')
+        os.symlink('sos_commands/networking/ip_addr',
+                   os.path.join(report, 'ip_addr'))
+        os.symlink('sos_commands', os.path.join(report, 'cmds'))
+        os.symlink('/etc/passwd', os.path.join(report, 'outside'))
+        self.report = report
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def write(self, report, rel, data):
+        path = os.path.join(report, rel)
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, 'w') as f:
+            f.write(data)
+        self.files[rel] = data
+
+    def tarball(self, mode, ext):
+        path = os.path.join(self.root, 'report' + ext)
+        tar = tarfile.open(path, mode)
+        tar.add(self.report, 'sosreport-bench')
+        tar.close()
+        return ArchiveReport(path)
+
+    def check(self, archive):
+        try:
+            self.assertEqual(archive.root, 'sosreport-bench/')
+            # out of order, which a compressed stream can't do cheaply
+            for rel in sorted(self.files, reverse=True):
+                self.assertEqual(archive.read(rel), self.files[rel])
+            self.assertTrue(archive.exists('etc/hostname'))
+            self.assertFalse(archive.exists('etc'))
+            self.assertTrue(archive.isdir('etc'))
+            self.assertEqual(archive.read('ip_addr'), 'addr\n')
+            self.assertEqual(archive.read('cmds/networking/ip_addr'),
+                             'addr\n')
+            self.assertEqual(archive.read('outside'), None)
+            self.assertEqual(archive.read('missing'), None)
+            self.assertEqual(archive.find('ip_addr'),
+                             ['ip_addr', 'sos_commands/networking/ip_addr'])
+        finally:
+            archive.close()
+
+    def test_plain(self):
+        self.check(self.tarball('w', '.tar'))
+
+    def test_gzip(self):
+        archive = self.tarball('w:gz', '.tar.gz')
+        self.assertNotEqual(archive._spool, None)
+        self.check(archive)
+
+    def test_bz2(self):
+        self.check(self.tarball('w:bz2', '.tar.bz2'))
+
+    def test_gzip_misnamed(self):
+        # compression is detected from the contents, not the name
+        self.check(self.tarball('w:gz', '.tar'))
+
+    def test_corrupt(self):
+        path = os.path.join(self.root, 'report.tar.gz')
+        with open(path, 'wb') as f:
+            f.write('\x1f\x8b' + 'x' * 100)
+        self.assertRaises(ArchiveError, ArchiveReport, path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from pysosutils.utilities.cache import FileCache, PARSED_WEIGHT
+
+
+class FileCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.target = tempfile.mkdtemp() + '/'
+        for name in ('a', 'b', 'c'):
+            with open(os.path.join(self.target, name), 'w') as f:
+                f.write(name * 100)
+        self.cache = FileCache(self.target, max_bytes=250)
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.target)
+
+    def test_raw_budget(self):
+        for name in ('a', 'b'):
+            self.cache.read(self.target + name)
+        self.assertEqual(self.cache.size, 200)
+        self.cache.read(self.target + 'c')
+        self.assertEqual(self.cache.size, 200)
+        self.assertEqual(self.cache.evictions, 1)
+
+    def test_parsed_counted(self):
+        self.cache.read(self.target + 'a')
+        self.cache.lines(self.target + 'b')
+        # b and its lines come to more than the budget, so a has to go
+        self.assertEqual(self.cache.stats()['files'], 1)
+        self.assertEqual(self.cache.size, 100 * (1 + PARSED_WEIGHT))
+        # parsing the same kind again is a hit and charges nothing
+        self.cache.lines(self.target + 'b')
+        self.assertEqual(self.cache.size, 100 * (1 + PARSED_WEIGHT))
+
+    def test_missing_costs_nothing(self):
+        self.assertEqual(self.cache.lines(self.target + 'nope'), None)
+        self.assertEqual(self.cache.size, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import unittest
+
+from pysosutils.utilities.ethstats import EthtoolMatrix, counter_kind
+
+
+class CounterKindTest(unittest.TestCase):
+
+    def test_whole_words(self):
+        self.assertEqual(counter_kind('rx_crc_errors'), 'errors')
+        self.assertEqual(counter_kind('tx_dropped'), 'drops')
+        self.assertEqual(counter_kind('port.rx_discards'), 'discards')
+        self.assertEqual(counter_kind('rx_queue_0_drops'), 'drops')
+
+    def test_deferred_is_not_an_error(self):
+        self.assertEqual(counter_kind('tx_deferred'), None)
+        self.assertEqual(counter_kind('tx_deferred_ok'), None)
+
+
+class EthtoolMatrixTest(unittest.TestCase):
+
+    def setUp(self):
+        self.matrix = EthtoolMatrix([
+            ('eth0', [('rx_packets', 10), ('rx_errors', 3),
+                      ('tx_deferred', 50)]),
+            ('eth1', [('rx_dropped', 7)]),
+        ])
+
+    def test_counts(self):
+        self.assertEqual(self.matrix.parsed, 4)
+        self.assertEqual(self.matrix.size, 8)
+
+    def test_ranked(self):
+        ranked = self.matrix.ranked()
+        self.assertEqual([e['name'] for e in ranked], ['eth1', 'eth0'])
+        self.assertEqual(ranked[1]['errors'], 3)
+        self.assertEqual(ranked[1]['counters'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
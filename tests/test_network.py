@@ -0,0 +1,66 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from pysosutils.plugins.network import network
+from pysosutils.utilities.cache import drop_cache
+
+NET_DEV = '''Inter-|   Receive                            |  Transmit
+ face |bytes    packets errs drop fifo frame compressed multicast|bytes    packets errs drop fifo colls carrier compressed
+    lo: 100 1 0 0 0 0 0 0 100 1 0 0 0 0 0 0
+  eth0: 2000 20 0 0 0 0 0 0 3000 30 0 0 0 0 0 0
+ vnet0: 4000 40 0 0 0 0 0 0 5000 50 0 0 0 0 0 0
+'''
+
+ETHTOOL = '''Settings for eth0:
+\tSpeed: 1000Mb/s
+\tAuto-negotiation: on
+\tLink detected: yes
+'''
+
+OPTIONS = {'netdev': True, 'ethtool': True, 'bonding': True, 'ip': True,
+           'vnet': True, 'ethstats': False, 'netns': False, 'route': None,
+           'route_src': None}
+
+
+class NetworkTest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.target = self.root + '/'
+        self.write('proc/net/dev', NET_DEV)
+        self.write('sos_commands/networking/ethtool_eth0', ETHTOOL)
+
+    def tearDown(self):
+        drop_cache(self.target)
+        shutil.rmtree(self.root)
+
+    def write(self, rel, data):
+        path = os.path.join(self.root, rel)
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, 'w') as f:
+            f.write(data)
+
+    def test_device_without_ethtool_file(self):
+        plugin = network(self.target, OPTIONS)
+        plugin.get_all_int_info()
+        devs = dict((dev['name'], dev) for dev in plugin.devs)
+        self.assertEqual(sorted(devs), ['eth0', 'vnet0'])
+        self.assertEqual(devs['eth0']['linkdetected'], 'UP')
+        self.assertEqual(devs['vnet0']['linkdetected'], '')
+        self.assertEqual(devs['vnet0']['driver'], '')
+
+    def test_ethtool_table_with_vnet(self):
+        plugin = network(self.target, OPTIONS)
+        plugin.get_all_int_info()
+        keys = ['name', 'linkdetected', 'autonegotiation', 'currentrx',
+                'currenttx', 'driver', 'driverversion']
+        lines = plugin.format_as_table(plugin.devs, keys).splitlines()
+        self.assertEqual([line.split()[0] for line in lines],
+                         ['eth0', 'vnet0'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+from StringIO import StringIO
+
+from pysosutils.utilities.output import OutputWriter, use_color
+
+
+class Stream(StringIO):
+
+    def __init__(self, tty=False):
+        StringIO.__init__(self)
+        self.tty = tty
+        self.writes = 0
+
+    def isatty(self):
+        return self.tty
+
+    def write(self, data):
+        self.writes += 1
+        StringIO.write(self, data)
+
+
+class UseColorTest(unittest.TestCase):
+
+    def test_modes(self):
+        self.assertTrue(use_color('auto', Stream(tty=True)))
+        self.assertFalse(use_color('auto', Stream()))
+        self.assertFalse(use_color('auto', object()))
+        self.assertTrue(use_color('always', Stream()))
+        self.assertFalse(use_color('never', Stream(tty=True)))
+
+
+class OutputWriterTest(unittest.TestCase):
+
+    def test_pipe_is_written_in_chunks(self):
+        stream = Stream()
+        out = OutputWriter(stream, chunk=20)
+        for i in range(10):
+            out.write('line %d\n' % i)
+        self.assertEqual(stream.writes, 3)
+        out.flush()
+        self.assertEqual(stream.getvalue(),
+                         ''.join('line %d\n' % i for i in range(10)))
+
+    def test_terminal_is_written_by_line(self):
+        stream = Stream(tty=True)
+        out = OutputWriter(stream)
+        out.write('no newline')
+        self.assertEqual(stream.getvalue(), '')
+        out.write(' yet\n')
+        self.assertEqual(stream.getvalue(), 'no newline yet\n')
+        self.assertTrue(out.isatty())
+
+    def test_unicode_as_utf8(self):
+        stream = Stream()
+        out = OutputWriter(stream)
+        out.write(u'caf\xe9\n')
+        out.flush()
+        self.assertEqual(stream.getvalue(), 'caf\xc3\xa9\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
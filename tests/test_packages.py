@@ -0,0 +1,69 @@
+import unittest
+
+from pysosutils.utilities.packages import PackageDB, parse_nevra
+
+RPMS = '''kernel-3.10.0-1160.el7.x86_64                  Mon 01 Jan 2024
+kernel-3.10.0-957.el7.x86_64                   Mon 01 Jan 2024
+kernel-tools-3.10.0-1160.el7.x86_64            Mon 01 Jan 2024
+glibc-2.17-317.el7.i686                        Mon 01 Jan 2024
+glibc-2.17-317.el7.x86_64                      Mon 01 Jan 2024
+docker-1:1.13.1-209.git7d71120.el7.x86_64      Mon 01 Jan 2024
+gpg-pubkey-f4a80eb5-53a7ff4b
+'''
+
+
+class ParseNevraTest(unittest.TestCase):
+
+    def test_fields(self):
+        pkg = parse_nevra('docker-1:1.13.1-209.git7d71120.el7.x86_64')
+        self.assertEqual((pkg['name'], pkg['epoch'], pkg['version'],
+                          pkg['release'], pkg['arch']),
+                         ('docker', '1', '1.13.1', '209.git7d71120.el7',
+                          'x86_64'))
+
+    def test_no_arch(self):
+        pkg = parse_nevra('gpg-pubkey-f4a80eb5-53a7ff4b')
+        self.assertEqual((pkg['name'], pkg['version'], pkg['arch']),
+                         ('gpg-pubkey', 'f4a80eb5', ''))
+
+
+class PackageDBTest(unittest.TestCase):
+
+    def setUp(self):
+        self.db = PackageDB.from_data(RPMS)
+
+    def nvras(self, pkgs):
+        return [pkg['nvra'] for pkg in pkgs]
+
+    def test_get(self):
+        self.assertEqual(self.nvras(self.db.get('kernel')),
+                         ['kernel-3.10.0-1160.el7.x86_64',
+                          'kernel-3.10.0-957.el7.x86_64'])
+        self.assertEqual(self.db.get('kern'), [])
+
+    def test_with_prefix_in_file_order(self):
+        self.assertEqual(self.nvras(self.db.with_prefix('kernel-3')),
+                         ['kernel-3.10.0-1160.el7.x86_64',
+                          'kernel-3.10.0-957.el7.x86_64'])
+        self.assertEqual(len(self.db.with_prefix('kernel')), 3)
+        self.assertEqual(self.db.with_prefix('zzz'), [])
+
+    def test_search(self):
+        self.assertEqual(self.nvras(self.db.search('317.el7')),
+                         ['glibc-2.17-317.el7.i686',
+                          'glibc-2.17-317.el7.x86_64'])
+        # a match is only counted once per package
+        self.assertEqual(len(self.db.search('1')), 6)
+        self.assertEqual(self.db.search('x86_64\nglibc'), [])
+        self.assertEqual(len(self.db.search('')), 7)
+        # cached results are the same
+        self.assertEqual(self.db.search('317.el7'), self.db.search('317.el7'))
+
+    def test_search_names(self):
+        self.assertEqual(self.nvras(self.db.search_names('tools')),
+                         ['kernel-tools-3.10.0-1160.el7.x86_64'])
+        self.assertEqual(self.db.search_names('el7'), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+
+from pysosutils.utilities.proctable import ProcessTable
+
+PS = '''USER       PID %CPU %MEM    VSZ   RSS TTY      STAT START   TIME COMMAND
+root         1  0.0  0.1 193700  6800 ?        Ss   Jan01   1:02 /usr/lib/systemd/systemd --system
+root         2  0.0  0.0      0     0 ?        S    Jan01   0:00 [kthreadd]
+apache    1001 12.5  2.0 500000 204800 ?       S    Jan01  10:00 /usr/sbin/httpd -DFOREGROUND
+apache    1002 30.0  3.0 600000 307200 ?       R    Jan01  20:00 /usr/sbin/httpd -DFOREGROUND
+java      2001 75.5 20.0 9000000 2097152 ?     Sl   Jan01 900:00 java -Xmx4g -jar app.jar
+bad line
+root      3001  0.0  0.0 110000  1024 pts/0    D+   10:00   0:00 cat /dev/sda
+'''
+
+
+class ProcessTableTest(unittest.TestCase):
+
+    def setUp(self):
+        self.table = ProcessTable.from_data(PS)
+
+    def test_parse(self):
+        self.assertEqual(len(self.table), 6)
+        self.assertEqual(list(self.table.column('pid')),
+                         [1, 2, 1001, 1002, 2001, 3001])
+        row = self.table.row(4)
+        self.assertEqual(row['user'], 'java')
+        self.assertEqual(row['rssmb'], 2048)
+        self.assertEqual(row['command'], 'java -Xmx4g -jar app.jar')
+        self.assertEqual(row['shortcmd'], 'java')
+
+    def test_coded_columns(self):
+        self.assertEqual(self.table.values['user'], ['root', 'apache', 'java'])
+        self.assertEqual(self.table.column('user'),
+                         ['root', 'root', 'apache', 'apache', 'java', 'root'])
+
+    def test_top(self):
+        self.assertEqual(self.table.top('cpu', 2), [4, 3])
+        # ties keep table order
+        self.assertEqual(self.table.top('cpu'), [4, 3, 2, 0, 1, 5])
+        self.assertEqual(self.table.top('cpu', 0), [])
+
+    def test_search(self):
+        self.assertEqual(self.table.search('command', 'httpd'), [2, 3])
+        self.assertEqual(self.table.matching('stat', lambda s: 'D' in s), [5])
+
+    def test_group_sums(self):
+        groups = dict((g['user'], g) for g in
+                      self.table.group_sums('user', ['cpu', 'rssmb']))
+        self.assertEqual(groups['apache']['cpu'], 42.5)
+        self.assertEqual(groups['apache']['rssmb'], 500.0)
+        self.assertEqual(groups['root']['rssmb'], 7.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
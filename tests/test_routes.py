@@ -0,0 +1,194 @@
+import unittest
+
+from pysosutils.utilities.routes import (PrefixTrie, RoutingTables,
+                                         parse_address, parse_prefix,
+                                         parse_routes, parse_rules)
+
+MAIN = '''default via 10.0.0.1 dev eth0 proto static metric 100
+default via 10.0.0.254 dev eth1 proto static metric 50
+10.0.0.0/8 dev eth0 proto kernel scope link src 10.0.0.5
+10.1.0.0/16 via 10.0.0.2 dev eth0
+10.1.2.0/24 via 10.0.0.3 dev eth0
+10.1.2.3 via 10.0.0.4 dev eth0
+blackhole 192.0.2.0/24
+'''
+
+MAIN6 = '''default via fe80::1 dev eth0 metric 1024
+2001:db8::/32 via fe80::2 dev eth0 metric 1024
+2001:db8:1::/48 via fe80::3 dev eth1 metric 1024
+'''
+
+
+def tables(rules=None):
+    tbl = RoutingTables()
+    tbl.add_routes(parse_routes(MAIN), 'inet')
+    tbl.add_routes(parse_routes(MAIN6), 'inet6')
+    tbl.add_routes(parse_routes(
+        'default via 172.16.0.1 dev eth2 table 100\n'
+        'throw 10.9.0.0/16 table 100\n'), 'inet')
+    if rules:
+        tbl.set_rules(parse_rules(rules), 'inet')
+    return tbl
+
+
+class ParseTest(unittest.TestCase):
+
+    def test_parse_address(self):
+        self.assertEqual(parse_address('10.0.0.1'), ('inet', 0x0a000001, 32))
+        self.assertEqual(parse_address('::1'), ('inet6', 1, 128))
+        self.assertRaises(ValueError, parse_address, '10.0.0')
+        self.assertRaises(ValueError, parse_address, 'eth0')
+
+    def test_parse_prefix(self):
+        self.assertEqual(parse_prefix('default', 'inet'), (0, 0))
+        self.assertEqual(parse_prefix('10.1.2.3/16', 'inet'),
+                         (0x0a010000, 16))
+        self.assertEqual(parse_prefix('10.1.2.3', 'inet'), (0x0a010203, 32))
+        self.assertRaises(ValueError, parse_prefix, '10.0.0.0/33', 'inet')
+        self.assertRaises(ValueError, parse_prefix, '::/0', 'inet')
+
+    def test_parse_routes(self):
+        routes = parse_routes('unreachable 10.5.0.0/16 metric 5\n'
+                              '10.6.0.0/16 proto static\n'
+                              '\tnexthop via 10.0.0.1 dev eth0 weight 1\n'
+                              '\tnexthop via 10.0.0.2 dev eth1 weight 1\n')
+        self.assertEqual(routes[0]['type'], 'unreachable')
+        self.assertEqual(routes[0]['metric'], '5')
+        self.assertEqual([n['dev'] for n in routes[1]['nexthops']],
+                         ['eth0', 'eth1'])
+
+    def test_parse_rules(self):
+        rules = parse_rules('32766:\tfrom all lookup main\n'
+                            '0:\tfrom all lookup local\n'
+                            '100:\tfrom 10.0.0.0/8 blackhole\n')
+        self.assertEqual([r['priority'] for r in rules], [0, 100, 32766])
+        self.assertEqual(rules[1]['action'], 'blackhole')
+        self.assertEqual(rules[2]['table'], 'main')
+
+
+class LookupTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tables = tables()
+
+    def via(self, address, table='main'):
+        route = self.tables.lookup(address, table)
+        return route and route.get('via', route['type'])
+
+    def test_default_route_lowest_metric(self):
+        self.assertEqual(self.via('8.8.8.8'), '10.0.0.254')
+
+    def test_host_route(self):
+        self.assertEqual(self.via('10.1.2.3'), '10.0.0.4')
+
+    def test_longest_of_overlapping_prefixes(self):
+        self.assertEqual(self.via('10.1.2.4'), '10.0.0.3')
+        self.assertEqual(self.via('10.1.3.1'), '10.0.0.2')
+        self.assertEqual(self.tables.lookup('10.2.0.1')['dev'], 'eth0')
+        self.assertEqual(self.via('192.0.2.7'), 'blackhole')
+
+    def test_ipv6(self):
+        self.assertEqual(self.via('2001:db8:1::5'), 'fe80::3')
+        self.assertEqual(self.via('2001:db8:2::5'), 'fe80::2')
+        self.assertEqual(self.via('2001:4860::8888'), 'fe80::1')
+
+    def test_no_route(self):
+        tbl = RoutingTables()
+        tbl.add_routes(parse_routes('10.0.0.0/8 dev eth0\n'), 'inet')
+        self.assertEqual(tbl.lookup('11.0.0.1'), None)
+        self.assertEqual(tbl.lookup('10.0.0.1', 'other'), None)
+
+    def test_trie_matches_linear_scan(self):
+        trie = PrefixTrie(32)
+        prefixes = [(0x0a000000, 8), (0x0a800000, 9), (0x0a010000, 16),
+                    (0x0a010100, 24), (0x0a010180, 25), (0xc0a80000, 16),
+                    (0, 1), (0x80000000, 1)]
+        for prefix, length in prefixes:
+            trie.insert(prefix, length, {'dest': (prefix, length)})
+        self.assertEqual(len(trie), len(prefixes))
+        for address in [0x0a0101ff, 0x0a010101, 0x0a800001, 0x0a7fffff,
+                        0xc0a80101, 0x01020304, 0xffffffff]:
+            best = max((length, prefix) for prefix, length in prefixes
+                       if address >> (32 - length) ==
+                       prefix >> (32 - length))
+            found = trie.lookup(address)[0]['dest']
+            self.assertEqual(found, (best[1], best[0]))
+
+
+class ResolveTest(unittest.TestCase):
+
+    def resolve(self, rules, address, source=None):
+        found = tables(rules).resolve(address, source)
+        route = found['route']
+        return found['table'], route.get('via', route['type'])
+
+    def test_default_rules(self):
+        self.assertEqual(self.resolve(None, '10.1.2.3'),
+                         ('main', '10.0.0.4'))
+
+    def test_rules_in_priority_order(self):
+        rules = ('0:\tfrom all lookup local\n'
+                 '200:\tfrom all lookup main\n'
+                 '100:\tfrom all to 8.8.8.0/24 lookup 100\n')
+        self.assertEqual(self.resolve(rules, '8.8.8.8'),
+                         ('100', '172.16.0.1'))
+        self.assertEqual(self.resolve(rules, '9.9.9.9'),
+                         ('main', '10.0.0.254'))
+
+    def test_source_selector(self):
+        rules = ('100:\tfrom 10.0.0.5 lookup 100\n'
+                 '200:\tfrom all lookup main\n')
+        self.assertEqual(self.resolve(rules, '9.9.9.9', '10.0.0.5'),
+                         ('100', '172.16.0.1'))
+        self.assertEqual(self.resolve(rules, '9.9.9.9', '10.0.0.6'),
+                         ('main', '10.0.0.254'))
+        self.assertEqual(self.resolve(rules, '9.9.9.9'),
+                         ('main', '10.0.0.254'))
+
+    def test_throw_falls_through(self):
+        rules = ('100:\tfrom all lookup 100\n'
+                 '200:\tfrom all lookup main\n')
+        found = tables(rules).resolve('10.9.1.1')
+        self.assertEqual(found['table'], 'main')
+        self.assertEqual(found['route']['dest'], '10.0.0.0/8')
+
+    def test_suppress_prefixlength(self):
+        rules = ('100:\tfrom all lookup main suppress_prefixlength 0\n'
+                 '200:\tfrom all lookup 100\n')
+        self.assertEqual(self.resolve(rules, '9.9.9.9'),
+                         ('100', '172.16.0.1'))
+        self.assertEqual(self.resolve(rules, '10.1.2.3'),
+                         ('main', '10.0.0.4'))
+
+    def test_action_rule(self):
+        rules = ('100:\tfrom all to 9.9.9.0/24 unreachable\n'
+                 '200:\tfrom all lookup main\n')
+        self.assertEqual(self.resolve(rules, '9.9.9.9'),
+                         ('', 'unreachable'))
+
+    def test_goto_skips_rules(self):
+        rules = ('100:\tfrom all goto 300\n'
+                 '200:\tfrom all lookup 100\n'
+                 '300:\tfrom all lookup main\n')
+        self.assertEqual(self.resolve(rules, '9.9.9.9'),
+                         ('main', '10.0.0.254'))
+
+    def test_goto_missing_rule_does_nothing(self):
+        rules = ('100:\tfrom all goto 250\n'
+                 '200:\tfrom all lookup 100\n'
+                 '300:\tfrom all lookup main\n')
+        self.assertEqual(self.resolve(rules, '9.9.9.9'),
+                         ('100', '172.16.0.1'))
+
+    def test_unknown_selector_never_taken(self):
+        rules = ('100:\tfrom all fwmark 0x1 lookup 100\n'
+                 '200:\tfrom all lookup main\n')
+        self.assertEqual(self.resolve(rules, '9.9.9.9'),
+                         ('main', '10.0.0.254'))
+
+    def test_mixed_families(self):
+        self.assertRaises(ValueError, tables().resolve, '10.0.0.1', '::1')
+
+
+if __name__ == '__main__':
+    unittest.main()
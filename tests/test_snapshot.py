@@ -0,0 +1,26 @@
+import unittest
+
+from pysosutils.utilities.snapshot import TreeSnapshot
+
+
+class KnownTest(unittest.TestCase):
+
+    def setUp(self):
+        self.snap = TreeSnapshot(linked=['sys/class/net', 'lib'])
+
+    def test_under_link(self):
+        self.assertFalse(self.snap.known('sys/class/net/eth0/mtu'))
+        self.assertFalse(self.snap.known('lib/modules'))
+
+    def test_not_under_link(self):
+        self.assertTrue(self.snap.known('sys/class/net'))
+        self.assertTrue(self.snap.known('sys/class/network/x'))
+        self.assertTrue(self.snap.known('usr/lib/x'))
+        self.assertTrue(self.snap.known('etc/hostname'))
+
+    def test_outside_report(self):
+        self.assertFalse(self.snap.known('../etc/hostname'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from pysosutils.utilities.cache import drop_cache
+from pysosutils.utilities.plugin import Plugin
+from pysosutils.utilities.store import ResultStore
+
+
+class counter(Plugin):
+    '''Collects from one file, a glob and a file that may be missing'''
+
+    cache_options = ('mode',)
+    collected = 0
+
+    def collect(self):
+        counter.collected += 1
+        return {'hostname': self.read_file('etc/hostname'),
+                'ethtool': self.find_files('sos_commands/ethtool_*'),
+                'extra': self.file_exists('etc/extra')}
+
+
+class ResultStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.target = os.path.join(self.root, 'report') + '/'
+        self.store = ResultStore(os.path.join(self.root, 'store'))
+        self.write('etc/hostname', 'bench\n')
+        self.write('sos_commands/ethtool_eth0', 'Settings for eth0:\n')
+        counter.collected = 0
+
+    def tearDown(self):
+        drop_cache(self.target)
+        shutil.rmtree(self.root)
+
+    def write(self, rel, data):
+        path = os.path.join(self.target, rel)
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, 'w') as f:
+            f.write(data)
+
+    def fetch(self, **options):
+        # every run starts with a fresh file cache, as a new process would
+        drop_cache(self.target)
+        return self.store.fetch(counter(self.target, options))
+
+    def test_unchanged_report_hits(self):
+        first = self.fetch()
+        self.assertEqual(self.fetch(), first)
+        self.assertEqual((self.store.misses, self.store.hits), (1, 1))
+        self.assertEqual(counter.collected, 1)
+
+    def test_changed_file_misses(self):
+        self.fetch()
+        self.write('etc/hostname', 'renamed\n')
+        self.assertEqual(self.fetch()['hostname'], 'renamed\n')
+        self.assertEqual(counter.collected, 2)
+
+    def test_new_glob_match_misses(self):
+        self.fetch()
+        self.write('sos_commands/ethtool_eth1', 'Settings for eth1:\n')
+        self.assertEqual(self.fetch()['ethtool'],
+                         ['sos_commands/ethtool_eth0',
+                          'sos_commands/ethtool_eth1'])
+        self.assertEqual(counter.collected, 2)
+
+    def test_file_that_appears_misses(self):
+        self.assertFalse(self.fetch()['extra'])
+        self.write('etc/extra', 'x\n')
+        self.assertTrue(self.fetch()['extra'])
+
+    def test_options_are_part_of_the_key(self):
+        self.fetch(mode='a')
+        self.fetch(mode='b')
+        self.fetch(mode='a')
+        self.assertEqual(counter.collected, 2)
+
+    def test_not_persistent(self):
+        plugin = counter(self.target, {})
+        plugin.persistent = False
+        self.store.fetch(plugin)
+        self.store.fetch(plugin)
+        self.assertEqual(counter.collected, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
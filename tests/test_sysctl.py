@@ -0,0 +1,64 @@
+import unittest
+
+from pysosutils.utilities.sysctl import SysctlIndex
+
+SYSCTL = '''kernel.hostname = bench
+net.ipv4.conf.all.rp_filter = 1
+net.ipv4.conf.eth0.rp_filter = 2
+net.ipv4.conf.eth0.forwarding = 0
+net.ipv4.tcp_keepalive_time = 7200
+net.ipv4.tcp_rmem = 4096\t87380\t6291456
+net.ipv6.conf.all.forwarding = 0
+net.core.somaxconn =
+sysctl: permission denied on key 'fs.protected_regular'
+vm.swappiness = 30
+'''
+
+
+class SysctlIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.index = SysctlIndex.from_data(SYSCTL)
+
+    def test_parse(self):
+        self.assertEqual(len(self.index), 9)
+        self.assertEqual(self.index.get('vm.swappiness'), '30')
+        self.assertEqual(self.index.get('net.ipv4.tcp_rmem'),
+                         '4096 87380 6291456')
+        self.assertEqual(self.index.get('net.core.somaxconn'), '')
+        self.assertFalse('fs.protected_regular' in self.index)
+        self.assertEqual(self.index.get('nope', '-'), '-')
+
+    def test_prefix(self):
+        names = list(self.index.prefix('net.ipv4.conf'))
+        self.assertEqual(names, ['net.ipv4.conf.all.rp_filter',
+                                 'net.ipv4.conf.eth0.rp_filter',
+                                 'net.ipv4.conf.eth0.forwarding'])
+        self.assertEqual(list(self.index.prefix('net.ipv4.conf.')), names)
+        self.assertEqual(list(self.index.prefix('net.ipv4.conf.*')), names)
+        self.assertEqual(list(self.index.prefix('net.ipv4.tcp_')),
+                         ['net.ipv4.tcp_keepalive_time', 'net.ipv4.tcp_rmem'])
+        self.assertEqual(list(self.index.prefix('net.ipx')), [])
+
+    def test_glob(self):
+        self.assertEqual(list(self.index.glob('net.ipv4.conf.*.rp_filter')),
+                         ['net.ipv4.conf.all.rp_filter',
+                          'net.ipv4.conf.eth0.rp_filter'])
+        self.assertEqual(list(self.index.glob('net.*.conf.all.*')),
+                         ['net.ipv4.conf.all.rp_filter',
+                          'net.ipv6.conf.all.forwarding'])
+        self.assertEqual(list(self.index.glob('vm.swappiness')),
+                         ['vm.swappiness'])
+
+    def test_search_and_query(self):
+        self.assertEqual(list(self.index.search('forwarding')),
+                         ['net.ipv4.conf.eth0.forwarding',
+                          'net.ipv6.conf.all.forwarding'])
+        self.assertEqual(list(self.index.query('kernel.host*')),
+                         ['kernel.hostname'])
+        self.assertEqual(list(self.index.query('somax')),
+                         ['net.core.somaxconn'])
+
+
+if __name__ == '__main__':
+    unittest.main()